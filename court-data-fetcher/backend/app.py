@@ -1,16 +1,30 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, g
 import os
-import time
-import re
+import requests
 from scraper import CourtScraper
 from database import DatabaseManager
 from config import Config
-import requests
+from validation import validate_search_input, validate_case_type, validate_export_filters
+from courts import get_court_adapter, same_site
+from catalog import start_catalog
+from resilience import CircuitOpenError
+from http_cache import cached_json_response, parse_sqlite_timestamp
+from retention import RetentionManager
+from shared_state import get_shared_store
+from jobs import get_job_queue
+from worker import run_search, TransientJobError
+from cause_list import CauseListIndex, CauseListIngester
+from exporter import EXPORT_FORMATS, available_formats, iter_csv, iter_ndjson, iter_parquet
+from logging_setup import setup_logging, new_request_id, request_id_var
+from profiler import SamplingProfiler, ProfileStore, should_profile, render_flamegraph
 from io import BytesIO
+from datetime import date
+import hmac
 import logging
+import threading
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Set up logging: records are queued and written as JSON by a background thread
+setup_logging(Config.LOG_LEVEL, Config.LOG_FORMAT, Config.LOG_DEBUG_SAMPLE_RATE)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__, 
@@ -20,6 +34,60 @@ app.config.from_object(Config)
 
 # Initialize components
 db_manager = DatabaseManager(app.config['DATABASE_PATH'])
+retention = RetentionManager(
+    db_manager,
+    failed_days=app.config['RETENTION_FAILED_DAYS'],
+    superseded_days=app.config['RETENTION_SUPERSEDED_DAYS'],
+    archive_dir=app.config['RETENTION_ARCHIVE_DIR'],
+    batch_size=app.config['RETENTION_BATCH_SIZE'],
+)
+if app.config['RETENTION_INTERVAL'] > 0:
+    retention.start(app.config['RETENTION_INTERVAL'])
+
+@app.before_request
+def assign_request_id():
+    """Correlation ID for every log line of this request (honours X-Request-ID)"""
+    g.request_id = new_request_id(request.headers.get('X-Request-ID'))
+    g.request_id_token = request_id_var.set(g.request_id)
+
+@app.after_request
+def echo_request_id(response):
+    response.headers['X-Request-ID'] = g.get('request_id', '')
+    return response
+
+# Opt-in statistical profiling; requests that are not profiled only pay for should_profile()
+profiles = ProfileStore(db_manager, keep=app.config['PROFILE_KEEP'])
+
+@app.before_request
+def start_profiler():
+    """Sample this request's stack if asked for (X-Profile: <ADMIN_TOKEN>) or picked at random"""
+    if request.path.startswith('/admin/'):
+        return
+    if should_profile(request.headers.get('X-Profile'), app.config['ADMIN_TOKEN'],
+                      app.config['PROFILE_SAMPLE_RATE']):
+        g.profiler = SamplingProfiler(interval=app.config['PROFILE_INTERVAL_MS'] / 1000).start()
+
+@app.after_request
+def save_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return response
+    try:
+        profile_id = profiles.save(profiler.stop(), query_id=g.get('query_id'), request_id=g.get('request_id'),
+                                   method=request.method, path=request.full_path.rstrip('?'),
+                                   status_code=response.status_code)
+        response.headers['X-Profile-Id'] = str(profile_id)
+        logger.info("Profiled %s %s: %s samples over %.2fs (profile %s)", request.method, request.path,
+                    profiler.samples, profiler.duration, profile_id)
+    except Exception as e:
+        logger.error("Saving profile failed: %s", e)
+    return response
+
+@app.teardown_request
+def clear_request_id(error=None):
+    token = g.pop('request_id_token', None)
+    if token is not None:
+        request_id_var.reset(token)
 
 # Global scraper instance
 scraper = None
@@ -29,9 +97,27 @@ def get_scraper():
     global scraper
     if scraper is None:
         # Use demo mode until we get the real scraper working
-        scraper = CourtScraper(demo_mode=True)
+        scraper = CourtScraper(target_court=app.config['TARGET_COURT'], demo_mode=True)
     return scraper
 
+# Case-type options for the typeahead, kept locally so lookups never wait on the court
+catalog = start_catalog(app.config['TARGET_COURT'], app.config['CATALOG_PATH'],
+                        ttl=app.config['CATALOG_TTL'], demo_mode=get_scraper().demo_mode)
+
+# Listings from the daily cause lists, so next-hearing lookups rarely need a scrape
+cause_lists = CauseListIndex(db_manager)
+
+def init_cause_lists():
+    court = get_court_adapter(app.config['TARGET_COURT'])
+    url = court.cause_list_url or app.config['CAUSE_LIST_URL']
+    if get_scraper().demo_mode or not url or app.config['CAUSE_LIST_INTERVAL'] <= 0:
+        return
+    CauseListIngester(cause_lists, court, url, catalog,
+                      days_ahead=app.config['CAUSE_LIST_DAYS_AHEAD'],
+                      keep_days=app.config['CAUSE_LIST_KEEP_DAYS']).start(app.config['CAUSE_LIST_INTERVAL'])
+
+init_cause_lists()
+
 @app.route('/')
 def index():
     """Render the main search form"""
@@ -39,7 +125,7 @@ def index():
         recent_queries = db_manager.get_recent_queries(5)
         return render_template('index.html', recent_queries=recent_queries)
     except Exception as e:
-        logger.error(f"Index page error: {str(e)}")
+        logger.error("Index page error: %s", e)
         return render_template('index.html', recent_queries=[])
 
 @app.route('/search', methods=['POST'])
@@ -49,34 +135,68 @@ def search_case():
     
     try:
         # Get and validate form data
-        case_type = request.form.get('case_type', '').strip()
-        case_number = request.form.get('case_number', '').strip()
-        filing_year = request.form.get('filing_year', '').strip()
-        
-        # Input validation
-        if not all([case_type, case_number, filing_year]):
-            return jsonify({"error": "All fields are required"}), 400
-        
-        try:
-            filing_year = int(filing_year)
-            current_year = time.gmtime().tm_year
-            if filing_year < 1950 or filing_year > current_year:
-                return jsonify({"error": "Invalid filing year"}), 400
-        except ValueError:
-            return jsonify({"error": "Filing year must be a number"}), 400
+        search, error = validate_search_input(
+            request.form.get('case_type'),
+            request.form.get('case_number'),
+            request.form.get('filing_year')
+        )
+        if error:
+            return jsonify({"error": error}), 400
+        case_type, case_number, filing_year = search
         
-        # Sanitize case number
-        if not re.match(r'^[0-9A-Za-z/-]+$', case_number):
-            return jsonify({"error": "Invalid case number format"}), 400
+        # Reject types the court does not list before spending a scrape on them
+        case_type, error = validate_case_type(case_type, catalog)
+        if error:
+            return jsonify({"error": error}), 400
         
-        logger.info(f"Processing search: {case_type} {case_number}/{filing_year}")
+        logger.info("Processing search: %s %s/%s", case_type, case_number, filing_year)
         
         # Log the query
         query_id = db_manager.log_query(case_type, case_number, filing_year)
+        g.query_id = query_id
+        
+        if app.config['SCRAPE_MODE'] == 'queue':
+            # A worker process does the scrape; the client polls the job
+            job_id = get_job_queue().enqueue(case_type, case_number, filing_year,
+                                             query_id=query_id, request_id=g.get('request_id'))
+            response = jsonify({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"})
+            response.headers['Location'] = f"/jobs/{job_id}"
+            return response, 202
         
         # Perform search
         court_scraper = get_scraper()
-        result = court_scraper.search_case(case_type, case_number, filing_year)
+        search = lambda: court_scraper.search_case(case_type, case_number, filing_year)
+        store = get_shared_store()
+        if store is not None:
+            # Identical searches from any worker share one upstream lookup and its result
+            result = store.single_flight(
+                f"search:{app.config['TARGET_COURT']}:{case_type}:{case_number}:{filing_year}",
+                search, ttl=app.config['RESULT_CACHE_TTL'],
+                cacheable=lambda result: "error" not in result
+            )
+        else:
+            result = search()
+        
+        if result.get("upstream_unavailable"):
+            # Court site is unhealthy: serve the last stored result if there is one
+            cached = db_manager.get_latest_case_details(case_type, case_number, filing_year)
+            if cached:
+                db_manager.update_query_status(query_id, 'cached', error_message=result["error"])
+                return jsonify({
+                    "success": True,
+                    "cached": True,
+                    "cached_at": cached["searched_at"],
+                    "data": {
+                        "parties_names": cached["parties_names"],
+                        "filing_date": cached["filing_date"],
+                        "next_hearing_date": cached["next_hearing_date"],
+                        "case_status": cached["case_status"],
+                        "pdf_links": cached["pdf_links"],
+                        "search_duration": 0
+                    }
+                })
+            db_manager.update_query_status(query_id, 'failed', error_message=result["error"])
+            return jsonify({"error": result["error"]}), 503
         
         if "error" in result:
             db_manager.update_query_status(query_id, 'failed', error_message=result["error"])
@@ -108,11 +228,218 @@ def search_case():
         })
         
     except Exception as e:
-        logger.error(f"Search error: {str(e)}")
+        logger.error("Search error: %s", e)
         if query_id:
             db_manager.update_query_status(query_id, 'failed', error_message=str(e))
         return jsonify({"error": "Server error. Please try again."}), 500
 
+@app.route('/jobs/<int:job_id>')
+def get_job(job_id):
+    """Progress of a queued search; the result once a worker has finished it"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    payload = {"job_id": job_id, "status": job['status'], "attempts": job['attempts']}
+    if job['status'] == 'done':
+        if "error" in job['result']:
+            payload["error"] = job['result']["error"]
+        else:
+            payload["success"] = True
+            payload["data"] = job['result']
+    elif job['status'] == 'dead':
+        payload["error"] = "The search could not be completed. Please try again later."
+    
+    response = jsonify(payload)
+    if job['status'] in ('queued', 'running'):
+        response.headers['Retry-After'] = '1'
+    return response
+
+@app.route('/cases/<case_type>/<case_number>/<int:filing_year>')
+def get_case(case_type, case_number, filing_year):
+    """Latest stored result for a case, cacheable by browsers and proxies"""
+    cached = db_manager.get_latest_case_details(case_type, case_number, filing_year)
+    if not cached:
+        return jsonify({"error": "No stored result for this case"}), 404
+    
+    # Last-Modified follows searched_at, which unchanged lookups move on, so it dates the body
+    return cached_json_response({
+        "case_type": case_type,
+        "case_number": case_number,
+        "filing_year": filing_year,
+        "searched_at": cached["searched_at"],
+        "data": {
+            "parties_names": cached["parties_names"],
+            "filing_date": cached["filing_date"],
+            "next_hearing_date": cached["next_hearing_date"],
+            "case_status": cached["case_status"],
+            "pdf_links": cached["pdf_links"],
+            "additional_info": cached["additional_info"]
+        }
+    }, last_modified=parse_sqlite_timestamp(cached["searched_at"] or cached["created_at"]),
+        max_age=app.config['CASE_CACHE_MAX_AGE'])
+
+@app.route('/cases/<case_type>/<case_number>/<int:filing_year>/timeline')
+def get_case_timeline(case_type, case_number, filing_year):
+    """Every stored version of a case with the fields that changed in each"""
+    timeline, current = db_manager.get_case_timeline(case_type, case_number, filing_year)
+    if not timeline:
+        return jsonify({"error": "No stored history for this case"}), 404
+    
+    return cached_json_response({
+        "case_type": case_type,
+        "case_number": case_number,
+        "filing_year": filing_year,
+        "current": current,
+        "versions": timeline
+    }, last_modified=parse_sqlite_timestamp(timeline[-1]["last_seen_at"]),
+        max_age=app.config['CASE_CACHE_MAX_AGE'])
+
+@app.route('/cases/<case_type>/<case_number>/<int:filing_year>/next-hearing')
+def get_next_hearing(case_type, case_number, filing_year):
+    """Next hearing from the ingested cause lists, scraping the case only if it is not listed"""
+    search, error = validate_search_input(case_type, case_number, str(filing_year))
+    if error:
+        return jsonify({"error": error}), 400
+    case_type, case_number, filing_year = search
+    case_type, error = validate_case_type(case_type, catalog)
+    if error:
+        return jsonify({"error": error}), 400
+    
+    listing = cause_lists.next_hearing(app.config['TARGET_COURT'], case_type, case_number, filing_year)
+    if listing:
+        return jsonify({
+            "source": "cause_list",
+            "next_hearing_date": date.fromisoformat(listing["list_date"]).strftime("%d/%m/%Y"),
+            "court_room": listing["court_room"],
+            "item_number": listing["item_number"]
+        })
+    
+    # Not in any ingested list (e.g. listed beyond the lists published so far)
+    query_id = db_manager.log_query(case_type, case_number, filing_year)
+    g.query_id = query_id
+    if app.config['SCRAPE_MODE'] == 'queue':
+        job_id = get_job_queue().enqueue(case_type, case_number, filing_year,
+                                         query_id=query_id, request_id=g.get('request_id'))
+        response = jsonify({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"})
+        response.headers['Location'] = f"/jobs/{job_id}"
+        return response, 202
+    
+    try:
+        result = run_search(db_manager, get_scraper(), {
+            "query_id": query_id, "case_type": case_type,
+            "case_number": case_number, "filing_year": filing_year
+        })
+    except TransientJobError as e:
+        db_manager.update_query_status(query_id, 'failed', error_message=str(e))
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        logger.error("Next-hearing lookup error: %s", e)
+        db_manager.update_query_status(query_id, 'failed', error_message=str(e))
+        return jsonify({"error": "Server error. Please try again."}), 500
+    if "error" in result:
+        return jsonify(result), 400
+    return jsonify({"source": "scrape", "next_hearing_date": result["next_hearing_date"]})
+
+@app.route('/api/case-types')
+def case_types():
+    """Case-type typeahead; without ?q= returns every case type and year"""
+    query = request.args.get('q', '').strip()
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+    except ValueError:
+        return jsonify({"error": "limit must be a number"}), 400
+    
+    payload = {"court": app.config['TARGET_COURT'], "fetched_at": catalog.fetched_at}
+    if query:
+        options = catalog.suggest(query, limit)
+    else:
+        options = catalog.case_types
+        payload["years"] = [label for _, label in catalog.years]
+    payload["case_types"] = [{"value": value, "label": label} for value, label in options]
+    
+    return cached_json_response(payload, max_age=app.config['CATALOG_CACHE_MAX_AGE'])
+
+def is_admin():
+    """Admin endpoints need ADMIN_TOKEN in X-Admin-Token (or ?token=); disabled without one"""
+    token = request.headers.get('X-Admin-Token') or request.args.get('token') or ''
+    return bool(app.config['ADMIN_TOKEN']) and hmac.compare_digest(token, app.config['ADMIN_TOKEN'])
+
+# Each export holds a database read cursor until the client has the last byte
+export_slots = threading.BoundedSemaphore(app.config['EXPORT_MAX_CONCURRENT'])
+
+@app.route('/export')
+def export_history():
+    """Stream query history with case details as CSV, NDJSON or Parquet (admin only)"""
+    if not is_admin():
+        return jsonify({"error": "Forbidden"}), 403
+    
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in available_formats():
+        return jsonify({"error": f"Unsupported format. Use one of: {', '.join(available_formats())}"}), 400
+    
+    filters, error = validate_export_filters(
+        request.args.get('from'), request.args.get('to'), request.args.get('status')
+    )
+    if error:
+        return jsonify({"error": error}), 400
+    
+    if not export_slots.acquire(blocking=False):
+        return jsonify({"error": "Too many exports in progress. Please try again shortly."}), 429
+    try:
+        response = export_response(fmt, filters)
+    except Exception:
+        export_slots.release()
+        raise
+    # The slot is held while the body streams, and freed even if the client disconnects
+    response.call_on_close(export_slots.release)
+    return response
+
+def export_response(fmt, filters):
+    rows = db_manager.export_rows(*filters)
+    headers = {'Content-Disposition': f'attachment; filename=court_data_export.{fmt}'}
+    
+    if fmt == 'parquet':
+        chunks = iter_parquet(rows)
+    elif fmt == 'csv':
+        chunks = iter_csv(rows)
+    else:
+        chunks = iter_ndjson(rows)
+    return Response(chunks, mimetype=EXPORT_FORMATS[fmt], headers=headers)
+
+@app.route('/admin/profiles')
+def list_profiles():
+    """Recent request profiles, optionally for one query"""
+    if not is_admin():
+        return jsonify({"error": "Forbidden"}), 403
+    query_id = request.args.get('query_id', type=int)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    return jsonify({"profiles": [
+        {**profile, "flamegraph_url": f"/admin/profiles/{profile['id']}/flamegraph.svg"}
+        for profile in profiles.recent(limit, query_id=query_id)
+    ]})
+
+@app.route('/admin/profiles/<int:profile_id>/flamegraph.svg')
+def profile_flamegraph(profile_id):
+    if not is_admin():
+        return jsonify({"error": "Forbidden"}), 403
+    profile = profiles.get(profile_id)
+    if profile is None:
+        return jsonify({"error": "Profile not found"}), 404
+    title = (f"{profile['method']} {profile['path']} ({profile['status_code']}) - "
+             f"{profile['duration']:.3f}s, {profile['samples']} samples every {profile['interval'] * 1000:g} ms")
+    return Response(render_flamegraph(profile['folded'], title), mimetype='image/svg+xml')
+
+@app.route('/admin/profiles/<int:profile_id>/folded')
+def profile_folded(profile_id):
+    """Raw folded stacks, for flamegraph.pl or speedscope"""
+    if not is_admin():
+        return jsonify({"error": "Forbidden"}), 403
+    profile = profiles.get(profile_id)
+    if profile is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return Response(profile['folded'], mimetype='text/plain')
+
 @app.route('/health')
 def health_check():
     """Health check endpoint"""
@@ -132,23 +459,33 @@ def download_pdf():
             "demo_url": pdf_url
         }), 200
     
+    court = get_court_adapter(app.config['TARGET_COURT'])
+    demo_document = same_site(pdf_url, app.config['DEMO_PDF_BASE_URL'])
+    if not court.owns_url(pdf_url) and not demo_document:
+        return jsonify({"error": f"Only documents from {court.display_name} can be downloaded"}), 400
+    
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        response = requests.get(pdf_url, headers=headers, timeout=30)
-        response.raise_for_status()
+        if demo_document:
+            # Synthetic demo documents: a plain fetch, nothing to protect
+            response = requests.get(pdf_url, timeout=30)
+            response.raise_for_status()
+            content = response.content
+        else:
+            # Court pool with adaptive timeout, hedging, retries and circuit breaker
+            content = court.download(pdf_url)
         
         return send_file(
-            BytesIO(response.content),
+            BytesIO(content),
             mimetype='application/pdf',
             as_attachment=True,
             download_name='court_document.pdf'
         )
         
+    except CircuitOpenError as e:
+        logger.warning("PDF download skipped: %s", e)
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
-        logger.error(f"PDF download failed: {str(e)}")
+        logger.error("PDF download failed: %s", e)
         return jsonify({"error": f"Download failed: {str(e)}"}), 500
 
 
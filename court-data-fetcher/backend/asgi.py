@@ -0,0 +1,233 @@
+"""ASGI entry point serving searches through AsyncCourtScraper.
+
+Run with an ASGI server, e.g.:  uvicorn asgi:app --port 8000
+One process keeps many lookups in flight on a handful of threads; the
+Flask app in app.py remains the WSGI entry point for the dashboard.
+"""
+import asyncio
+import json
+import logging
+from urllib.parse import parse_qs
+
+from async_scraper import AsyncCourtScraper
+from resilience import CircuitOpenError
+from config import Config
+from courts import get_court_adapter, same_site
+from database import DatabaseManager
+from validation import validate_search_input, validate_case_type
+from catalog import start_catalog
+from logging_setup import setup_logging, new_request_id, request_id_var
+
+setup_logging(Config.LOG_LEVEL, Config.LOG_FORMAT, Config.LOG_DEBUG_SAMPLE_RATE)
+logger = logging.getLogger(__name__)
+
+db_manager = DatabaseManager(Config.DATABASE_PATH)
+scraper = None
+
+
+def get_scraper():
+    """Get async scraper instance (with demo mode for now)"""
+    global scraper
+    if scraper is None:
+        scraper = AsyncCourtScraper(target_court=Config.TARGET_COURT, demo_mode=True)
+    return scraper
+
+
+# Same case-type options as the Flask app, so both reject unknown types before scraping
+catalog = start_catalog(Config.TARGET_COURT, Config.CATALOG_PATH, ttl=Config.CATALOG_TTL,
+                        demo_mode=get_scraper().demo_mode)
+
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def send_response(send, status, body, content_type='application/json', headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type.encode()), *headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_json(send, status, payload):
+    await send_response(send, status, json.dumps(payload).encode())
+
+
+def parse_form(scope, body):
+    """Form fields from a urlencoded or JSON request body"""
+    headers = dict(scope['headers'])
+    content_type = headers.get(b'content-type', b'').decode()
+    if content_type.startswith('application/json'):
+        return json.loads(body or b'{}')
+    return {key: values[0] for key, values in parse_qs(body.decode()).items()}
+
+
+async def search_case(scope, receive, send):
+    """Handle case search requests"""
+    query_id = None
+    
+    try:
+        form = parse_form(scope, await read_body(receive))
+        search, error = validate_search_input(
+            form.get('case_type'), form.get('case_number'), form.get('filing_year')
+        )
+        if error:
+            return await send_json(send, 400, {"error": error})
+        case_type, case_number, filing_year = search
+        
+        # Reject types the court does not list before spending a scrape on them
+        case_type, error = validate_case_type(case_type, catalog)
+        if error:
+            return await send_json(send, 400, {"error": error})
+        
+        logger.info("Processing async search: %s %s/%s", case_type, case_number, filing_year)
+        
+        # SQLite calls are short but blocking, so they run on the default executor
+        query_id = await asyncio.to_thread(db_manager.log_query, case_type, case_number, filing_year)
+        
+        result = await get_scraper().search_case(case_type, case_number, filing_year)
+        
+        if result.get("upstream_unavailable"):
+            # Court site is unhealthy: serve the last stored result if there is one
+            cached = await asyncio.to_thread(db_manager.get_latest_case_details,
+                                             case_type, case_number, filing_year)
+            if cached:
+                await asyncio.to_thread(db_manager.update_query_status, query_id, 'cached',
+                                        error_message=result["error"])
+                return await send_json(send, 200, {
+                    "success": True,
+                    "cached": True,
+                    "cached_at": cached["searched_at"],
+                    "data": {
+                        "parties_names": cached["parties_names"],
+                        "filing_date": cached["filing_date"],
+                        "next_hearing_date": cached["next_hearing_date"],
+                        "case_status": cached["case_status"],
+                        "pdf_links": cached["pdf_links"],
+                        "search_duration": 0
+                    }
+                })
+            await asyncio.to_thread(db_manager.update_query_status, query_id, 'failed',
+                                    error_message=result["error"])
+            return await send_json(send, 503, {"error": result["error"]})
+        
+        if "error" in result:
+            await asyncio.to_thread(db_manager.update_query_status, query_id, 'failed',
+                                    error_message=result["error"])
+            return await send_json(send, 400, result)
+        
+        await asyncio.to_thread(
+            db_manager.save_case_details,
+            query_id,
+            result.get("parties_names"),
+            result.get("filing_date"),
+            result.get("next_hearing_date"),
+            result.get("case_status"),
+            result.get("pdf_links", []),
+            result.get("additional_info", {})
+        )
+        await asyncio.to_thread(db_manager.update_query_status, query_id, 'success')
+        
+        await send_json(send, 200, {
+            "success": True,
+            "data": {
+                "parties_names": result.get("parties_names"),
+                "filing_date": result.get("filing_date"),
+                "next_hearing_date": result.get("next_hearing_date"),
+                "case_status": result.get("case_status"),
+                "pdf_links": result.get("pdf_links", []),
+                "search_duration": result.get("search_duration", 0)
+            }
+        })
+        
+    except Exception as e:
+        logger.error("Async search error: %s", e)
+        if query_id:
+            await asyncio.to_thread(db_manager.update_query_status, query_id, 'failed',
+                                    error_message=str(e))
+        await send_json(send, 500, {"error": "Server error. Please try again."})
+
+
+async def download_pdf(scope, receive, send):
+    """Proxy PDF downloads without tying up a thread per download"""
+    params = parse_qs(scope.get('query_string', b'').decode())
+    pdf_url = params.get('url', [None])[0]
+    if not pdf_url:
+        return await send_json(send, 400, {"error": "No URL provided"})
+    
+    # For demo mode, return a message since these are example URLs
+    if 'example.com' in pdf_url:
+        return await send_json(send, 200, {
+            "message": "This is a demo PDF link. In production, this would download the actual court document.",
+            "demo_url": pdf_url
+        })
+    
+    court = get_court_adapter(Config.TARGET_COURT)
+    if not court.owns_url(pdf_url) and not same_site(pdf_url, Config.DEMO_PDF_BASE_URL):
+        return await send_json(send, 400, {"error": f"Only documents from {court.display_name} can be downloaded"})
+    
+    try:
+        content = await get_scraper().download_pdf(pdf_url)
+        await send_response(send, 200, content, content_type='application/pdf', headers=[
+            (b'content-disposition', b'attachment; filename="court_document.pdf"'),
+        ])
+    except CircuitOpenError as e:
+        logger.warning("PDF download skipped: %s", e)
+        await send_json(send, 503, {"error": str(e)})
+    except Exception as e:
+        logger.error("PDF download failed: %s", e)
+        await send_json(send, 500, {"error": f"Download failed: {str(e)}"})
+
+
+async def health_check(scope, receive, send):
+    """Health check endpoint"""
+    await send_json(send, 200, {"status": "healthy", "mode": "demo", "server": "asgi"})
+
+
+ROUTES = {
+    ('POST', '/search'): search_case,
+    ('GET', '/download_pdf'): download_pdf,
+    ('GET', '/health'): health_check,
+}
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            get_scraper()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if scraper is not None:
+                await scraper.aclose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    
+    # Correlation ID for every log line of this request, echoed back to the client
+    request_id = new_request_id(dict(scope['headers']).get(b'x-request-id', b'').decode())
+    request_id_var.set(request_id)
+    
+    async def send_with_request_id(message):
+        if message['type'] == 'http.response.start':
+            message['headers'] = [*message.get('headers', []), (b'x-request-id', request_id.encode())]
+        await send(message)
+    
+    handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        return await send_json(send_with_request_id, 404, {"error": "Not found"})
+    await handler(scope, receive, send_with_request_id)
@@ -0,0 +1,223 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import httpx
+from bs4 import BeautifulSoup
+
+from config import Config
+from courts import get_court_adapter, CourtBusyError
+from catalog import get_catalog
+from case_parser import get_parser
+from resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+class AsyncCourtScraper:
+    """asyncio counterpart of CourtScraper for high fan-out lookups.
+    
+    HTTP courts and PDF downloads run on a shared non-blocking httpx client.
+    Browser courts run the regular CourtScraper in a small executor sized to
+    the browser capacity, so the event loop never waits on Selenium.
+    """
+    
+    def __init__(self, target_court="delhi_high_court", demo_mode=False):
+        self.demo_mode = demo_mode
+        
+        if self.demo_mode:
+            from demo_scraper import AsyncDemoCourtScraper
+            self.demo_scraper = AsyncDemoCourtScraper()
+            self.client = httpx.AsyncClient(timeout=30, headers={'User-Agent': USER_AGENT})
+            logger.info("🎭 Running async scraper in DEMO MODE - using simulated data")
+            return
+        
+        self.target_court = target_court
+        self.court = get_court_adapter(target_court)
+        self.catalog = get_catalog(target_court, ttl=Config.CATALOG_TTL)
+        self.client = httpx.AsyncClient(
+            timeout=30,
+            headers={'User-Agent': USER_AGENT},
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.court.pool_maxsize,
+                                max_keepalive_connections=self.court.pool_connections),
+        )
+        
+        # One thread per browser search that can actually run at once
+        if Config.BROWSER_MODE == 'multiplexed':
+            browser_workers = Config.BROWSER_PROCESSES * Config.TABS_PER_BROWSER
+        else:
+            browser_workers = 1
+        self.executor = ThreadPoolExecutor(max_workers=browser_workers,
+                                           thread_name_prefix='browser-search')
+        self._sync_scraper = None
+        self._sync_scraper_lock = threading.Lock()
+    
+    def _get_sync_scraper(self):
+        """Blocking CourtScraper, created on first use (HTTP courts start no browser)"""
+        with self._sync_scraper_lock:
+            if self._sync_scraper is None:
+                from scraper import CourtScraper
+                self._sync_scraper = CourtScraper(target_court=self.target_court)
+            return self._sync_scraper
+    
+    async def search_case(self, case_type, case_number, filing_year):
+        """Main method to search for case details"""
+        
+        if self.demo_mode:
+            return await self.demo_scraper.search_case(case_type, case_number, filing_year)
+        
+        if self.court.fetch_strategy == 'browser':
+            # CourtScraper takes the court slot itself, inside the worker thread
+            loop = asyncio.get_running_loop()
+            # Carry the request's context (correlation ID) into the worker thread
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                self.executor,
+                lambda: context.run(self._get_sync_scraper().search_case, case_type, case_number, filing_year)
+            )
+        
+        health = self.court.health
+        if not health.breaker.allow():
+            logger.warning("Circuit open for %s, skipping upstream", self.court.display_name)
+            return {"error": f"{self.court.display_name} is temporarily unavailable",
+                    "upstream_unavailable": True}
+        
+        result = None
+        try:
+            for attempt in range(Config.UPSTREAM_RETRIES + 1):
+                if attempt:
+                    await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+                # Every attempt is a full search, so each takes a slot
+                async with self.court.async_slot():
+                    result = await self.search_case_http(case_type, case_number, filing_year)
+                if not result.get('transient'):
+                    break
+        except CourtBusyError as e:
+            logger.warning("Search rejected: %s", e)
+            result = None
+            return {"error": f"{str(e)}. Please try again shortly."}
+        finally:
+            if result is None:
+                # Rejected before the court answered: no verdict on its health
+                health.breaker.release()
+        
+        if result.pop('transient', False):
+            health.breaker.record_failure()
+        else:
+            health.breaker.record_success()
+        return result
+    
+    async def search_case_http(self, case_type, case_number, filing_year):
+        """Non-blocking version of CourtScraper.search_case_http"""
+        start_time = time.time()
+        selectors = self.court.form_selectors
+        
+        try:
+            logger.info("Searching case over async HTTP: %s %s/%s", case_type, case_number, filing_year)
+            
+            health = self.court.health
+            timeout = health.stage_timeout('http_search')
+            with health.measure('http_search'):
+                response = await self.client.get(self.court.case_search_url, timeout=timeout)
+            response.raise_for_status()
+            soup = BeautifulSoup(response.text, 'html.parser')
+            
+            form = soup.find('form', id=selectors['form_id'])
+            if not form:
+                return {"error": "Search form not found"}
+            
+            if not self.catalog.is_fresh():
+                self.catalog.load_from_html(response.text, selectors)
+            case_type_value = self.catalog.match_case_type(case_type)
+            if case_type_value is None:
+                return {"error": f"Unknown case type '{case_type}' for {self.court.display_name}"}
+            year_value = self.catalog.match_year(filing_year)
+            if year_value is None:
+                return {"error": f"Filing year {filing_year} is not available for {self.court.display_name}"}
+            
+            # Carry over hidden fields such as _token and randomid
+            form_data = {
+                field['name']: field.get('value', '')
+                for field in form.find_all('input', type='hidden') if field.get('name')
+            }
+            
+            field_values = {
+                'case_type': case_type_value,
+                'case_number': case_number,
+                'year': year_value,
+            }
+            
+            # Text captchas can be read straight from the page
+            captcha_code = soup.select_one(selectors.get('captcha_code', '#captcha-code'))
+            if captcha_code:
+                field_values['captcha_input'] = captcha_code.get_text(strip=True)
+            
+            for key, value in field_values.items():
+                field = soup.select_one(selectors[key])
+                if field is None or not field.get('name'):
+                    return {"error": f"Form field '{key}' not found"}
+                form_data[field['name']] = value
+            
+            action = urljoin(self.court.case_search_url, form.get('action') or self.court.case_search_url)
+            with health.measure('http_search'):
+                response = await self.client.post(action, data=form_data, timeout=timeout)
+            response.raise_for_status()
+            
+            # Parsing is CPU-bound; keep it off the event loop
+            parser = get_parser(self.court.parser)
+            result = await asyncio.to_thread(parser, response.text, self.court.base_url)
+            result['search_duration'] = time.time() - start_time
+            
+            return result
+            
+        except Exception as e:
+            logger.error("Async HTTP search failed: %s", e)
+            transient = isinstance(e, httpx.TransportError) or (
+                isinstance(e, httpx.HTTPStatusError) and e.response.status_code >= 500)
+            return {"error": f"Search failed: {str(e)}", "transient": transient}
+    
+    async def download_pdf(self, pdf_url):
+        """Fetch a court document without blocking, returning its bytes"""
+        if self.demo_mode:
+            response = await self.client.get(pdf_url, follow_redirects=True)
+            response.raise_for_status()
+            return response.content
+        
+        if not self.court.owns_url(pdf_url):
+            raise ValueError(f"Not a {self.court.display_name} URL: {pdf_url}")
+        health = self.court.health
+        if not health.breaker.allow():
+            raise CircuitOpenError(f"{self.court.display_name} is temporarily unavailable")
+        
+        try:
+            with health.measure('pdf'):
+                response = await self.client.get(pdf_url, timeout=health.stage_timeout('pdf'))
+                response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= 500:
+                health.breaker.record_failure()
+            else:
+                health.breaker.release()
+            raise
+        except httpx.TransportError:
+            health.breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled, or a bad URL: says nothing about the court's health
+            health.breaker.release()
+            raise
+        health.breaker.record_success()
+        return response.content
+    
+    async def aclose(self):
+        """Close the HTTP client and browser executor"""
+        await self.client.aclose()
+        if not self.demo_mode:
+            self.executor.shutdown(wait=False)
@@ -0,0 +1,377 @@
+import atexit
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from config import Config
+from shared_state import get_shared_store, SharedSemaphore
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPoolBusyError(RuntimeError):
+    """Raised when no browser tab frees up before the acquire timeout"""
+
+
+# Requests the lean profile refuses. Captcha images are served from
+# extension-less endpoints such as /app/getCaptcha, so they still load for OCR.
+LEAN_BLOCKED_URL_PATTERNS = [
+    # Images and icons
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.webp', '*.ico',
+    # Stylesheets and fonts
+    '*.css', '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    # Analytics
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    # Decorative or export-only scripts the search flow never uses
+    '*owl.carousel*', '*wow.min.js*', '*easy-ticker*', '*pdfmake*', '*vfs_fonts*',
+    '*jszip*', '*tesseract.js*',
+]
+
+
+def create_chrome_driver(page_load_strategy='normal', profile='full'):
+    """Start a Chrome WebDriver with the project's standard options.
+    
+    The 'lean' profile runs headless and blocks images, fonts, CSS and
+    analytics; 'full' loads the page as a user would see it (for debugging).
+    """
+    chrome_options = Options()
+
+    # Essential options for stability
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+    chrome_options.page_load_strategy = page_load_strategy
+
+    if profile == 'lean':
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1280,900")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-background-networking")
+        chrome_options.add_argument("--disable-default-apps")
+        chrome_options.add_argument("--disable-sync")
+        chrome_options.add_argument("--mute-audio")
+        chrome_options.add_argument("--no-first-run")
+    else:
+        chrome_options.add_argument("--window-size=1920,1080")
+
+    service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    if profile == 'lean':
+        block_resources(driver)
+    return driver
+
+
+def block_resources(driver):
+    """Block lean-profile resources in the driver's current tab via CDP"""
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URL_PATTERNS})
+
+
+class TabDriver:
+    """WebDriver stand-in bound to one tab of a shared browser.
+
+    Every command first switches the browser to this tab while holding the
+    browser lock, so searches in other tabs can interleave between commands.
+    """
+
+    def __init__(self, tab):
+        self._tab = tab
+
+    def focus(self):
+        """Hold the browser on this tab for a sequence of element commands"""
+        return self._tab.focus()
+
+    def __getattr__(self, name):
+        with self._tab.focus() as driver:
+            attr = getattr(driver, name)
+
+        if not callable(attr):
+            return attr
+
+        def command(*args, **kwargs):
+            with self._tab.focus():
+                return attr(*args, **kwargs)
+        return command
+
+
+class BrowserTab:
+    """One tab in its own browser context, so cookies and _token stay separate"""
+
+    def __init__(self, process, handle, context_id=None):
+        self.process = process
+        self.handle = handle
+        self.context_id = context_id
+        self.driver = TabDriver(self)
+        # The shared tab-budget slot held by the search using this tab
+        self.budget_slot = None
+
+    @contextmanager
+    def focus(self):
+        with self.process.lock:
+            self.process.switch_to(self.handle)
+            yield self.process.driver
+
+
+class BrowserProcess:
+    """A Chrome process serving several tabs, one WebDriver command at a time"""
+
+    def __init__(self, driver, profile='full'):
+        self.driver = driver
+        self.profile = profile
+        self.lock = threading.RLock()
+        self.current_handle = driver.current_window_handle
+        self.busy_tabs = 0
+        self.idle_tabs = []
+        self.idle_since = time.monotonic()
+        # The shared launch-budget slot this process holds, if any
+        self.launch_slot = None
+
+    @property
+    def open_tabs(self):
+        return self.busy_tabs + len(self.idle_tabs)
+
+    def switch_to(self, handle):
+        if self.current_handle != handle:
+            self.driver.switch_to.window(handle)
+            self.current_handle = handle
+
+    def open_tab(self):
+        """Open a tab in a fresh browser context (falls back to a shared-context tab)"""
+        with self.lock:
+            tab = self._create_tab()
+            if self.profile == 'lean':
+                # Request blocking is per tab, so every new tab needs it
+                self.switch_to(tab.handle)
+                block_resources(self.driver)
+            return tab
+
+    def _create_tab(self):
+        with self.lock:
+            try:
+                context = self.driver.execute_cdp_cmd('Target.createBrowserContext', {})
+                target = self.driver.execute_cdp_cmd('Target.createTarget', {
+                    'url': 'about:blank',
+                    'browserContextId': context['browserContextId'],
+                })
+                if target['targetId'] not in self.driver.window_handles:
+                    raise WebDriverException("new target is not visible to chromedriver")
+                return BrowserTab(self, target['targetId'], context['browserContextId'])
+            except WebDriverException as e:
+                logger.warning("Isolated browser context unavailable, using a plain tab: %s", e)
+                self.driver.switch_to.new_window('tab')
+                self.current_handle = self.driver.current_window_handle
+                return BrowserTab(self, self.current_handle)
+
+    def close_tab(self, tab):
+        with self.lock:
+            try:
+                self.driver.execute_cdp_cmd('Target.closeTarget', {'targetId': tab.handle})
+                if tab.context_id:
+                    self.driver.execute_cdp_cmd('Target.disposeBrowserContext',
+                                                {'browserContextId': tab.context_id})
+            except WebDriverException as e:
+                logger.warning("Closing browser tab failed: %s", e)
+            if self.current_handle == tab.handle:
+                self.current_handle = None
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """Schedules concurrent searches onto tabs spread over a few Chrome processes"""
+
+    def __init__(self, max_processes=2, tabs_per_browser=6, profile='full', driver_factory=None,
+                 tab_budget=None, launch_budget=None, idle_timeout=300):
+        self.max_processes = max_processes
+        self.tabs_per_browser = tabs_per_browser
+        self.profile = profile
+        # Optional host-wide semaphores shared with other worker processes:
+        # open tabs, and Chrome processes (idle ones are closed to free theirs)
+        self.tab_budget = tab_budget
+        self.launch_budget = launch_budget
+        self.idle_timeout = idle_timeout
+        # Page loads must not hold a browser lock, so commands return before load completes
+        self.driver_factory = driver_factory or (
+            lambda: create_chrome_driver(page_load_strategy='none', profile=profile)
+        )
+        self.processes = []
+        self._starting = 0
+        self._cond = threading.Condition()
+
+    def _reserve(self):
+        """Pick work for the caller under the pool lock: an idle tab, a process or a launch"""
+        idle = [process for process in self.processes if process.idle_tabs]
+        if idle:
+            process = min(idle, key=lambda p: p.busy_tabs)
+            process.busy_tabs += 1
+            return 'tab', process.idle_tabs.pop()
+
+        available = [process for process in self.processes
+                     if process.open_tabs < self.tabs_per_browser]
+        if available:
+            process = min(available, key=lambda p: p.open_tabs)
+            process.busy_tabs += 1
+            return 'open', process
+
+        if len(self.processes) + self._starting < self.max_processes:
+            launch_slot = None
+            if self.launch_budget is not None:
+                launch_slot = self.launch_budget.acquire(blocking=False)
+                if not launch_slot:
+                    return None, None
+            self._starting += 1
+            return 'launch', launch_slot
+
+        return None, None
+
+    def acquire(self, timeout=60):
+        """Reserve a tab for one search"""
+        deadline = time.monotonic() + timeout
+        budget_slot = None
+        if self.tab_budget is not None:
+            budget_slot = self.tab_budget.acquire(timeout=timeout)
+            if not budget_slot:
+                raise BrowserPoolBusyError("All browser tabs on this host are busy")
+        try:
+            tab = self._acquire_tab(deadline)
+        except Exception:
+            if self.tab_budget is not None:
+                self.tab_budget.release(budget_slot)
+            raise
+        tab.budget_slot = budget_slot
+        return tab
+
+    def _acquire_tab(self, deadline):
+        with self._cond:
+            while True:
+                action, target = self._reserve()
+                if action:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise BrowserPoolBusyError("All browser tabs are busy")
+                # Launch permits are freed by other processes, which cannot notify us
+                self._cond.wait(remaining if self.launch_budget is None else min(remaining, 0.25))
+
+        if action == 'tab':
+            return target
+
+        if action == 'launch':
+            try:
+                process = BrowserProcess(self.driver_factory(), self.profile)
+                process.launch_slot = target
+                logger.info("✓ Started browser process %s/%s", len(self.processes) + 1, self.max_processes)
+            except Exception:
+                if self.launch_budget is not None:
+                    self.launch_budget.release(target)
+                raise
+            finally:
+                with self._cond:
+                    self._starting -= 1
+                    self._cond.notify_all()
+            with self._cond:
+                self.processes.append(process)
+                process.busy_tabs += 1
+            target = process
+
+        try:
+            return target.open_tab()
+        except Exception:
+            self._release_slot(target)
+            raise
+
+    def _release_slot(self, process):
+        with self._cond:
+            process.busy_tabs -= 1
+            self._cond.notify_all()
+        self._schedule_idle_check(process)
+
+    def release(self, tab, discard=False):
+        """Return a tab to the pool; discarded tabs are closed instead of reused"""
+        if self.tab_budget is not None:
+            self.tab_budget.release(tab.budget_slot)
+            tab.budget_slot = None
+        if discard:
+            tab.process.close_tab(tab)
+            self._release_slot(tab.process)
+            return
+        with self._cond:
+            tab.process.busy_tabs -= 1
+            tab.process.idle_tabs.append(tab)
+            self._cond.notify_all()
+        self._schedule_idle_check(tab.process)
+
+    def _schedule_idle_check(self, process):
+        """With a shared launch budget, close a browser that stays idle so another worker can start one"""
+        if self.launch_budget is None or process.busy_tabs:
+            return
+        process.idle_since = time.monotonic()
+        timer = threading.Timer(self.idle_timeout, self._close_if_idle, (process,))
+        timer.daemon = True
+        timer.start()
+
+    def _close_if_idle(self, process):
+        with self._cond:
+            idle_for = time.monotonic() - process.idle_since
+            if process not in self.processes or process.busy_tabs or idle_for < self.idle_timeout:
+                return
+            self.processes.remove(process)
+        process.quit()
+        self.launch_budget.release(process.launch_slot)
+        logger.info("Closed browser process idle for %.0fs", idle_for)
+
+    @contextmanager
+    def tab(self, timeout=60):
+        tab = self.acquire(timeout)
+        completed = False
+        try:
+            yield tab
+            completed = True
+        finally:
+            self.release(tab, discard=not completed)
+
+    def close(self):
+        with self._cond:
+            processes, self.processes = self.processes, []
+        for process in processes:
+            process.quit()
+            if self.launch_budget is not None:
+                self.launch_budget.release(process.launch_slot)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool(max_processes=2, tabs_per_browser=6, profile='full'):
+    """Process-wide browser pool shared by every scraper instance.
+    
+    With a shared store, the process and tab limits apply to the whole host
+    rather than to each worker process.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            store = get_shared_store()
+            budgets = {}
+            if store is not None:
+                budgets = {
+                    'tab_budget': SharedSemaphore(store, 'browser:tabs', max_processes * tabs_per_browser),
+                    'launch_budget': SharedSemaphore(store, 'browser:processes', max_processes, lease=None),
+                    'idle_timeout': Config.BROWSER_IDLE_SECONDS,
+                }
+            _pool = BrowserPool(max_processes, tabs_per_browser, profile, **budgets)
+            atexit.register(_pool.close)
+        return _pool
@@ -0,0 +1,156 @@
+# JavaScript run through driver.execute_script so that each step of the
+# search flow costs one WebDriver round trip instead of one per element.
+
+# arguments: [form_selectors]
+FORM_STATE_SCRIPT = """
+const selectors = arguments[0];
+const form = document.getElementById(selectors.form_id);
+const code = selectors.captcha_code ? document.querySelector(selectors.captcha_code) : null;
+return {
+    form_ready: !!form && document.readyState !== 'loading',
+    captcha_input: !!document.querySelector(selectors.captcha_input),
+    captcha_image: !!document.querySelector(selectors.captcha_image),
+    captcha_code: code ? code.textContent.trim() : null
+};
+"""
+
+# arguments: [form_selectors, {case_type, case_number, year, captcha}]
+FILL_AND_SUBMIT_SCRIPT = """
+const selectors = arguments[0];
+const values = arguments[1];
+const errors = [];
+
+const setField = (key, value) => {
+    if (value === null || value === undefined || value === '') {
+        return;
+    }
+    const field = document.querySelector(selectors[key]);
+    if (!field) {
+        errors.push(key + ': field not found');
+        return;
+    }
+    field.value = value;
+    field.dispatchEvent(new Event('input', {bubbles: true}));
+    field.dispatchEvent(new Event('change', {bubbles: true}));
+    if (field.value !== String(value)) {
+        errors.push(key + ': value ' + value + ' not accepted');
+    }
+};
+
+setField('case_type', values.case_type);
+setField('case_number', values.case_number);
+setField('year', values.year);
+setField('captcha_input', values.captcha);
+
+const submit = document.querySelector(selectors.submit);
+if (!submit) {
+    errors.push('submit: button not found');
+} else if (submit.disabled) {
+    errors.push('submit: button disabled');
+}
+
+if (errors.length) {
+    return {submitted: false, errors: errors};
+}
+
+// Marks this document so the results check can tell it from the next page
+window.__courtFetcherSubmitted = true;
+submit.click();
+return {submitted: true, errors: errors};
+"""
+
+# Async; arguments: [form_selectors, search_url, captcha_refresh_url, callback].
+# Resets an already-loaded form in place and fetches a fresh captcha code,
+# answering with the FORM_STATE_SCRIPT shape (form_ready false + reason on failure).
+RESET_FORM_SCRIPT = """
+const selectors = arguments[0];
+const searchUrl = arguments[1];
+const captchaRefreshUrl = arguments[2];
+const done = arguments[arguments.length - 1];
+const fail = (reason) => done({form_ready: false, reason: reason});
+
+if (location.href.split(/[?#]/)[0] !== searchUrl) {
+    fail('tab is on a different page');
+    return;
+}
+const form = document.getElementById(selectors.form_id);
+const token = document.querySelector(selectors._token);
+if (!form || !token || !token.value) {
+    fail('form or CSRF token missing');
+    return;
+}
+
+form.reset();
+window.__courtFetcherSubmitted = false;
+document.querySelectorAll('.swal2-container').forEach((element) => element.remove());
+
+const state = {
+    form_ready: true,
+    captcha_input: !!document.querySelector(selectors.captcha_input),
+    captcha_image: !!document.querySelector(selectors.captcha_image),
+    captcha_code: null
+};
+
+if (!state.captcha_input) {
+    done(state);
+    return;
+}
+if (!captchaRefreshUrl) {
+    fail('captcha can only be renewed by reloading');
+    return;
+}
+
+fetch(captchaRefreshUrl, {
+    credentials: 'same-origin',
+    headers: {'Accept': 'application/json', 'X-Requested-With': 'XMLHttpRequest'}
+})
+    .then((response) => response.ok ? response.json() : Promise.reject('captcha refresh HTTP ' + response.status))
+    .then((data) => {
+        const code = String(data.captcha_code || '');
+        if (!code) {
+            fail('captcha refresh returned no code');
+            return;
+        }
+        const label = selectors.captcha_code ? document.querySelector(selectors.captcha_code) : null;
+        const randomid = selectors.randomid ? document.querySelector(selectors.randomid) : null;
+        if (label) {
+            label.textContent = code;
+            state.captcha_code = code;
+        }
+        if (randomid) {
+            randomid.value = code;
+        }
+        done(state);
+    })
+    .catch((error) => fail(String(error)));
+"""
+
+# No arguments. Returns null until the submission has an outcome.
+RESULTS_STATE_SCRIPT = """
+if (/page expired/i.test(document.title)) {
+    return {state: 'expired'};
+}
+if (window.__courtFetcherSubmitted) {
+    const popup = document.querySelector('.swal2-popup.swal2-show');
+    if (popup) {
+        const message = popup.innerText.trim();
+        // The CSRF token behind the captcha check has expired
+        if (/validation failed|expired/i.test(message)) {
+            return {state: 'expired', message: message};
+        }
+        return {state: 'alert', message: message};
+    }
+    return null;
+}
+if (document.readyState !== 'complete') {
+    return null;
+}
+const text = document.body ? document.body.innerText : '';
+if (/no record/i.test(text)) {
+    return {state: 'no_records'};
+}
+if (document.querySelector('table, .result')) {
+    return {state: 'results'};
+}
+return null;
+"""
@@ -0,0 +1,260 @@
+import argparse
+import glob
+import io
+import os
+import re
+import time
+import logging
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Every segmented digit is resampled to this many rows x columns
+GLYPH_SHAPE = (16, 12)
+
+# Accepted answer lengths, as in the Tesseract path
+MIN_DIGITS = 3
+MAX_DIGITS = 8
+
+
+def load_grayscale(png_bytes):
+    """Decode image bytes into a 2-D uint8 array"""
+    return np.asarray(Image.open(io.BytesIO(png_bytes)).convert('L'))
+
+
+def binarize(gray):
+    """Ink mask using Otsu's threshold; dark-on-light and light-on-dark both work"""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    omega = np.cumsum(hist) / gray.size
+    mu = np.cumsum(hist * np.arange(256)) / gray.size
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (mu[-1] * omega - mu) ** 2 / (omega * (1 - omega))
+    threshold = int(np.nanargmax(between)) if np.isfinite(between).any() else 127
+
+    ink = gray <= threshold
+    if ink.mean() > 0.5:
+        ink = ~ink
+    return despeckle(ink)
+
+
+def despeckle(ink):
+    """Drop ink pixels with no inked neighbour (the dots sprinkled over captchas)"""
+    padded = np.pad(ink, 1).view(np.uint8)
+    # 3x3 box sum as two separable passes; the pixel itself counts once
+    rows = padded[:, :-2] + padded[:, 1:-1] + padded[:, 2:]
+    box = rows[:-2] + rows[1:-1] + rows[2:]
+    return ink & (box > 1)
+
+
+def segment(ink, expected=None):
+    """Split an ink mask into per-digit boxes (left to right) using the column profile"""
+    profile = ink.sum(axis=0)
+    if not profile.any():
+        return []
+    # Ignore columns holding only specks of noise
+    inked = profile > max(1, 0.1 * profile.max())
+
+    # A one-column gap is a thin stroke (the flag of a 1), not a new digit
+    runs = [run for run in _runs(inked, max_gap=1) if run[1] - run[0] >= 2]
+
+    # Touching digits come out as one wide run: split the widest until the count fits
+    while expected and runs and len(runs) < expected:
+        widest = max(range(len(runs)), key=lambda i: runs[i][1] - runs[i][0])
+        start, stop = runs[widest]
+        if stop - start < 4:
+            break
+        middle = (start + stop) // 2
+        runs[widest:widest + 1] = [[start, middle], [middle, stop]]
+
+    if not runs:
+        return []
+    # Row profiles of every run in one pass, as differences of running column sums.
+    # A run may end at the image's right edge, so the sums get a leading zero column.
+    cumulative = np.pad(ink.cumsum(axis=1, dtype=np.int32), ((0, 0), (1, 0)))
+    starts, stops = np.asarray(runs).T
+    row_profiles = cumulative[:, stops] - cumulative[:, starts]
+
+    boxes = []
+    for (start, stop), row_profile in zip(runs, row_profiles.T):
+        # The digit is the inkiest band of rows; stray dots above or below are dropped
+        top, bottom = max(_runs(row_profile > 0, max_gap=1),
+                          key=lambda run: row_profile[run[0]:run[1]].sum())
+        boxes.append((top, bottom, start, stop))
+    return boxes
+
+
+def _runs(mask, max_gap=0):
+    """[start, stop) index ranges of True values, bridging gaps of up to max_gap"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    runs = []
+    for start, stop in zip(edges[::2], edges[1::2]):
+        if runs and start - runs[-1][1] <= max_gap:
+            runs[-1][1] = stop
+        else:
+            runs.append([start, stop])
+    return runs
+
+
+def glyph_features(ink, boxes):
+    """Resample each box to GLYPH_SHAPE; returns an (n, rows*cols) float32 matrix.
+    
+    Narrow glyphs are centred rather than stretched, so a 1 keeps its shape.
+    """
+    height, width = GLYPH_SHAPE
+    top, bottom, left, right = np.asarray(boxes, dtype=np.float64).T[:, :, None]
+    rows = (top + (np.arange(height) + 0.5) * (bottom - top) / height).astype(int)
+    span = np.maximum(right - left, (bottom - top) * width / height)
+    cols = np.floor((left + right) / 2 - span / 2 + (np.arange(width) + 0.5) * span / width).astype(int)
+    inside = (cols >= left) & (cols < right)
+
+    # One gather for all glyphs; columns outside a glyph's box read as blank
+    glyphs = ink[rows[:, :, None], np.clip(cols, 0, ink.shape[1] - 1)[:, None, :]] & inside[:, None, :]
+    return glyphs.reshape(len(boxes), height * width).astype(np.float32)
+
+
+class DigitTemplates:
+    """Nearest-centroid classifier over resampled digit glyphs"""
+
+    def __init__(self, labels, centroids):
+        self.labels = np.asarray(labels)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self._unit_centroids = _unit_rows(self.centroids)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data['labels'], data['centroids'])
+
+    def save(self, path):
+        np.savez_compressed(path, labels=self.labels, centroids=self.centroids)
+
+    @classmethod
+    def build(cls, samples):
+        """Average the glyphs of labelled samples, given as (label, png_bytes) pairs"""
+        glyphs = {}
+        skipped = 0
+        for label, png_bytes in samples:
+            ink = binarize(load_grayscale(png_bytes))
+            boxes = segment(ink, expected=len(label))
+            if len(boxes) != len(label):
+                skipped += 1
+                continue
+            for digit, feature in zip(label, glyph_features(ink, boxes)):
+                glyphs.setdefault(digit, []).append(feature)
+
+        if skipped:
+            logger.warning("⚠ Skipped %s samples that did not segment into their label's length", skipped)
+        labels = sorted(glyphs)
+        return cls(labels, [np.mean(glyphs[label], axis=0) for label in labels])
+
+    def classify(self, features):
+        """Label of the nearest centroid (by cosine similarity) for every row of `features`.
+        
+        Comparing directions rather than raw distances keeps thin glyphs such
+        as 1, whose centroid is close to empty, from matching everything.
+        """
+        return self.labels[(_unit_rows(features) @ self._unit_centroids.T).argmax(axis=1)]
+
+
+def _unit_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-6)
+
+
+class CaptchaSolver:
+    """Reads numeric captchas with digit templates instead of an OCR engine"""
+
+    def __init__(self, templates, expected_length=None):
+        self.templates = templates
+        self.expected_length = expected_length
+
+    def solve(self, png_bytes):
+        """Digits in the captcha image, or None if it could not be read"""
+        ink = binarize(load_grayscale(png_bytes))
+        boxes = segment(ink, expected=self.expected_length)
+        if not MIN_DIGITS <= len(boxes) <= MAX_DIGITS:
+            return None
+        return ''.join(self.templates.classify(glyph_features(ink, boxes)))
+
+
+_solver = None
+
+
+def get_captcha_solver(templates_path, expected_length=None):
+    """Shared template solver, or None when no templates have been built yet"""
+    global _solver
+    if _solver is None:
+        if not os.path.exists(templates_path):
+            return None
+        _solver = CaptchaSolver(DigitTemplates.load(templates_path), expected_length)
+        logger.info("✓ Loaded captcha templates from %s", templates_path)
+    return _solver
+
+
+def load_samples(directory):
+    """Labelled samples from image files named '<digits>.png' or '<digits>_<anything>.png'"""
+    samples = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.png'))):
+        match = re.match(r'^(\d+)', os.path.basename(path))
+        if match:
+            with open(path, 'rb') as f:
+                samples.append((match.group(1), f.read()))
+    return samples
+
+
+def tesseract_solve(png_bytes):
+    """The scraper's previous OCR path, for benchmarking"""
+    import pytesseract
+    from PIL import ImageEnhance
+
+    image = Image.open(io.BytesIO(png_bytes)).convert('L')
+    image = ImageEnhance.Contrast(image).enhance(2.5)
+    image = ImageEnhance.Sharpness(image).enhance(2.0)
+    text = pytesseract.image_to_string(image, config=r'--oem 3 --psm 8 -c tessedit_char_whitelist=0123456789')
+    return re.sub(r'[^0-9]', '', text)
+
+
+def benchmark(name, solve, samples, repeat=1):
+    """Accuracy and median per-image latency of `solve` over labelled samples"""
+    correct = 0
+    timings = []
+    for label, png_bytes in samples:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            answer = solve(png_bytes)
+            timings.append(time.perf_counter() - start)
+        correct += answer == label
+    median_ms = float(np.median(timings)) * 1000
+    print(f"{name:<10} accuracy {correct}/{len(samples)} ({correct / len(samples):.1%}), "
+          f"median {median_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Build and benchmark digit templates for numeric captchas")
+    parser.add_argument("command", choices=["build", "benchmark"])
+    parser.add_argument("--samples", required=True,
+                        help="directory of labelled captcha images named <digits>.png or <digits>_<n>.png")
+    parser.add_argument("--templates", default=Config.CAPTCHA_TEMPLATES)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    samples = load_samples(args.samples)
+    if not samples:
+        parser.error(f"No labelled .png samples in {args.samples}")
+
+    if args.command == "build":
+        templates = DigitTemplates.build(samples)
+        templates.save(args.templates)
+        print(f"✓ Built templates for digits {''.join(templates.labels)} from {len(samples)} samples "
+              f"-> {args.templates}")
+    else:
+        solver = CaptchaSolver(DigitTemplates.load(args.templates))
+        benchmark("templates", solver.solve, samples, repeat=20)
+        try:
+            benchmark("tesseract", tesseract_solve, samples)
+        except Exception as e:
+            print(f"tesseract  unavailable: {str(e)}")
@@ -0,0 +1,207 @@
+"""Parsers turning a court's case-details page into a result dict.
+
+They are plain functions of the page HTML, so the sync and async scrapers
+(and anything else holding a page) share them without a browser.
+"""
+import re
+import logging
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+
+def parse_case_details(page_source, base_url):
+    """Enhanced parsing for Delhi High Court structure; relative PDF links resolve against base_url"""
+    try:
+        soup = BeautifulSoup(page_source, 'html.parser')
+
+        # Save HTML for analysis
+        with open('delhi_court_response.html', 'w', encoding='utf-8') as f:
+            f.write(page_source)
+
+        # Check for SweetAlert popup (common in court websites)
+        sweetalert = soup.find('div', class_='swal2-popup')
+        if sweetalert:
+            alert_text = sweetalert.get_text(strip=True)
+            if 'no record' in alert_text.lower() or 'not found' in alert_text.lower():
+                return {"error": "No records found for the given case details"}
+
+        # Enhanced extraction strategies...
+        case_details = {
+            "parties_names": extract_parties_names(soup),
+            "filing_date": extract_filing_date(soup),
+            "next_hearing_date": extract_next_hearing_date(soup),
+            "case_status": extract_case_status(soup),
+            "pdf_links": extract_pdf_links(soup, base_url),
+            "additional_info": extract_additional_info(soup)
+        }
+
+        return case_details
+
+    except Exception as e:
+        logger.error("Enhanced parsing failed: %s", e)
+        return {"error": f"Parsing failed: {str(e)}"}
+
+
+def check_no_results(soup):
+    """Check if no results were found"""
+    no_result_indicators = [
+        "no record found", "no records found", "no data found",
+        "record not found", "case not found", "not available",
+        "no results", "invalid case"
+    ]
+
+    page_text = soup.get_text().lower()
+    return any(indicator in page_text for indicator in no_result_indicators)
+
+
+def extract_parties_names(soup):
+    """Extract parties' names"""
+    strategies = [
+        lambda: extract_by_label(soup, ["parties", "petitioner", "appellant", "vs", "respondent"]),
+        lambda: extract_from_table_header(soup, "parties"),
+        lambda: extract_by_pattern(soup, r"([A-Z][a-zA-Z\s]+)\s+(?:vs?\.?|v\.?)\s+([A-Z][a-zA-Z\s]+)")
+    ]
+
+    for strategy in strategies:
+        try:
+            result = strategy()
+            if result and result != "Not found" and len(result) > 5:
+                return result
+        except:
+            continue
+
+    return "Not found"
+
+
+def extract_filing_date(soup):
+    """Extract filing date"""
+    return extract_by_label(soup, ["filing date", "date of filing", "registered on", "filed on"])
+
+
+def extract_next_hearing_date(soup):
+    """Extract next hearing date"""
+    return extract_by_label(soup, ["next hearing", "next date", "hearing date", "next listing"])
+
+
+def extract_case_status(soup):
+    """Extract case status"""
+    return extract_by_label(soup, ["status", "case status", "stage", "current status"])
+
+
+def extract_by_label(soup, labels):
+    """Generic extraction by label text"""
+    for label in labels:
+        # Try table-based extraction
+        label_cell = soup.find("td", string=re.compile(label, re.I))
+        if label_cell:
+            next_cell = label_cell.find_next_sibling("td")
+            if next_cell:
+                text = next_cell.get_text(strip=True)
+                if text and len(text) > 1:
+                    return text
+
+        # Try other HTML structures
+        for tag in ["span", "div", "p", "strong"]:
+            element = soup.find(tag, string=re.compile(label, re.I))
+            if element:
+                next_element = element.find_next_sibling()
+                if next_element:
+                    text = next_element.get_text(strip=True)
+                    if text and len(text) > 1:
+                        return text
+
+    return "Not found"
+
+
+def extract_from_table_header(soup, header_text):
+    """Extract data from table with specific header"""
+    try:
+        header = soup.find("th", string=re.compile(header_text, re.I))
+        if header:
+            headers = header.parent.find_all("th")
+            col_index = headers.index(header)
+
+            table = header.find_parent("table")
+            data_rows = table.find_all("tr")[1:]
+            if data_rows:
+                data_cells = data_rows[0].find_all("td")
+                if len(data_cells) > col_index:
+                    return data_cells[col_index].get_text(strip=True)
+    except:
+        pass
+
+    return "Not found"
+
+
+def extract_by_pattern(soup, pattern):
+    """Extract using regex pattern"""
+    try:
+        text = soup.get_text()
+        match = re.search(pattern, text)
+        if match:
+            return match.group(0)
+    except:
+        pass
+
+    return "Not found"
+
+
+def extract_pdf_links(soup, base_url):
+    """Extract PDF download links"""
+    pdf_links = []
+    try:
+        # Find all PDF links
+        pdf_anchors = soup.find_all("a", href=re.compile(r"\.pdf", re.I))
+
+        for anchor in pdf_anchors:
+            pdf_url = anchor.get("href")
+            if pdf_url:
+                if not pdf_url.startswith("http"):
+                    pdf_url = urljoin(base_url, pdf_url)
+
+                pdf_links.append({
+                    "title": anchor.get_text(strip=True) or "Court Document",
+                    "url": pdf_url
+                })
+
+    except Exception as e:
+        logger.error("PDF extraction failed: %s", e)
+
+    return pdf_links
+
+
+def extract_additional_info(soup):
+    """Extract additional case information"""
+    additional_info = {}
+    try:
+        tables = soup.find_all("table")
+        for table in tables:
+            rows = table.find_all("tr")
+            for row in rows:
+                cells = row.find_all(["td", "th"])
+                if len(cells) >= 2:
+                    key = cells[0].get_text(strip=True)
+                    value = cells[1].get_text(strip=True)
+                    if key and value and len(key) < 50 and len(value) > 1:
+                        additional_info[key.lower().replace(" ", "_")] = value
+    except:
+        pass
+
+    return additional_info
+
+
+# CourtAdapter.parser name -> parser(page_source, base_url)
+PARSERS = {
+    'parse_case_details': parse_case_details,
+}
+
+
+def get_parser(name):
+    """The parser a court adapter names"""
+    try:
+        return PARSERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown parser: {name}") from None
@@ -0,0 +1,264 @@
+import os
+import re
+import json
+import time
+import threading
+import logging
+from bisect import bisect_left
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Full words users type, mapped to the abbreviations the court uses in its
+# case-type labels ("arbitration appeal" -> "ARB A" -> matches "ARB.A.")
+WORD_ABBREVIATIONS = {
+    'ARBITRATION': 'ARB',
+    'APPEAL': 'A',
+    'APPEALS': 'A',
+    'PETITION': 'P',
+    'APPLICATION': 'APPLN',
+    'CIVIL': 'C',
+    'CRIMINAL': 'CRL',
+    'COMMERCIAL': 'COMM',
+    'COMPANY': 'CO',
+    'CONTEMPT': 'CONT',
+    'WRIT': 'W',
+    'MISCELLANEOUS': 'M',
+    'REVISION': 'REV',
+    'REFERENCE': 'REF',
+    'ORIGINAL': 'O',
+    'SUIT': 'S',
+    'EXECUTION': 'EX',
+}
+
+# Script that reads every option of the case-type and year selects in one call
+READ_OPTIONS_SCRIPT = """
+const read = (selector) => Array.from(document.querySelectorAll(selector + ' option'))
+    .filter((option) => option.value)
+    .map((option) => [option.value, option.text.trim()]);
+return {case_types: read(arguments[0]), years: read(arguments[1])};
+"""
+
+
+def normalize_label(text):
+    """Uppercase and strip punctuation/spaces: "ARB. A. (COMM.)" -> "ARBACOMM" """
+    return re.sub(r'[^0-9A-Z]', '', str(text).upper())
+
+
+def abbreviate_label(text):
+    """Collapse full words to court abbreviations before normalizing"""
+    words = re.findall(r'[0-9A-Z]+', str(text).upper())
+    return ''.join(WORD_ABBREVIATIONS.get(word, word) for word in words)
+
+
+class CaseTypeCatalog:
+    """Case-type and year options of one court's search form, cached with a TTL"""
+
+    def __init__(self, court_name, ttl=86400):
+        self.court_name = court_name
+        self.ttl = ttl
+        self.case_types = []
+        self.years = []
+        self.fetched_at = None
+        self._case_type_index = {}
+        self._year_values = {}
+        self._prefix_keys = []
+        self._prefix_positions = []
+        self._lock = threading.Lock()
+
+    def is_fresh(self):
+        """True while the cached options are younger than the TTL"""
+        return self.fetched_at is not None and time.time() - self.fetched_at < self.ttl
+
+    def load(self, case_types, years, fetched_at=None):
+        """Replace the cached options and rebuild the lookup index"""
+        index = {}
+        prefixes = []
+        for position, (value, label) in enumerate(case_types):
+            # Earlier options win when two labels normalize to the same key
+            for key in (value.upper(), normalize_label(label), abbreviate_label(label)):
+                if key:
+                    index.setdefault(key, value)
+            # Typeahead keys: the whole label and each of its words ("COMM" finds "ARB. A. (COMM.)")
+            words = re.findall(r'[0-9A-Za-z]+', label)
+            for key in {normalize_label(label), abbreviate_label(label), *map(normalize_label, words)}:
+                if key:
+                    prefixes.append((key, position))
+        prefixes.sort()
+
+        with self._lock:
+            self.case_types = [(value, label) for value, label in case_types]
+            self.years = [(value, label) for value, label in years]
+            self._case_type_index = index
+            self._prefix_keys = [key for key, _ in prefixes]
+            self._prefix_positions = [position for _, position in prefixes]
+            self._year_values = {label: value for value, label in years}
+            self.fetched_at = fetched_at or time.time()
+
+        logger.info("✓ Cached %s case types and %s years for %s",
+                    len(self.case_types), len(self.years), self.court_name)
+
+    def load_from_driver(self, driver, form_selectors):
+        """Fetch both option lists with a single WebDriver round trip"""
+        options = driver.execute_script(
+            READ_OPTIONS_SCRIPT, form_selectors['case_type'], form_selectors['year']
+        )
+        self.load(options['case_types'], options['years'])
+
+    def load_from_html(self, html, form_selectors):
+        """Build the catalog from a fetched copy of the search page"""
+        soup = BeautifulSoup(html, 'html.parser')
+
+        def read(selector):
+            select = soup.select_one(selector)
+            if select is None:
+                return []
+            return [
+                (option['value'], option.get_text(strip=True))
+                for option in select.find_all('option') if option.get('value')
+            ]
+
+        self.load(read(form_selectors['case_type']), read(form_selectors['year']))
+
+    def match_case_type(self, user_input):
+        """Map user input such as "ARB.A." or "arbitration appeal" to an option value"""
+        with self._lock:
+            index = self._case_type_index
+        for key in (str(user_input).strip().upper(),
+                    normalize_label(user_input),
+                    abbreviate_label(user_input)):
+            if key in index:
+                return index[key]
+        return None
+
+    def match_year(self, filing_year):
+        """Option value for a filing year, or None if the court does not list it"""
+        with self._lock:
+            return self._year_values.get(str(filing_year))
+
+    def suggest(self, query, limit=10):
+        """Case-type options whose label, or a word in it, starts with `query`.
+        
+        Uses binary search over the sorted prefix keys, so the cost does not
+        grow with the number of options. Results keep the court's order.
+        """
+        with self._lock:
+            keys, positions, case_types = self._prefix_keys, self._prefix_positions, self.case_types
+
+        matches = set()
+        for prefix in {normalize_label(query), abbreviate_label(query)}:
+            if not prefix:
+                continue
+            i = bisect_left(keys, prefix)
+            while i < len(keys) and keys[i].startswith(prefix):
+                matches.add(positions[i])
+                i += 1
+        return [case_types[position] for position in sorted(matches)[:limit]]
+
+    def save(self, path):
+        """Persist the options so a restart does not need the court site"""
+        with self._lock:
+            data = {
+                'court': self.court_name,
+                'fetched_at': self.fetched_at,
+                'case_types': self.case_types,
+                'years': self.years,
+            }
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+    def load_file(self, path):
+        """Load options saved by save(); returns False if there is no usable file"""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not data.get('case_types'):
+            return False
+        self.load(data['case_types'], data.get('years', []), fetched_at=data.get('fetched_at'))
+        return True
+
+    def label_for(self, value):
+        """Display label for a case-type option value"""
+        for option_value, label in self.case_types:
+            if option_value == value:
+                return label
+        return value
+
+
+class CatalogRefresher:
+    """Keeps a court's catalog fresh from its search page and persisted on disk"""
+
+    def __init__(self, catalog, court, path, check_interval=3600):
+        self.catalog = catalog
+        self.court = court
+        self.path = path
+        self.check_interval = check_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """Fetch the search page over HTTP and reload the options from its HTML"""
+        response = self.court.get_session().get(self.court.case_search_url, timeout=30)
+        response.raise_for_status()
+        self.catalog.load_from_html(response.text, self.court.form_selectors)
+        if not self.catalog.case_types:
+            raise ValueError("No case-type options found on the search page")
+        self.catalog.save(self.path)
+
+    def start(self):
+        """Load the saved copy, then refresh it in the background whenever it goes stale"""
+        if self._thread is not None:
+            return
+        self.catalog.load_file(self.path)
+
+        def loop():
+            while True:
+                if not self.catalog.is_fresh():
+                    try:
+                        self.refresh()
+                    except Exception as e:
+                        logger.warning("⚠ Catalog refresh for %s failed: %s", self.catalog.court_name, e)
+                if self._stop.wait(self.check_interval):
+                    return
+
+        self._thread = threading.Thread(target=loop, name='catalog-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def start_catalog(court_name, path, ttl=86400, demo_mode=False):
+    """Catalog for a web process: the demo's case types, or the court's kept fresh in the background"""
+    catalog = get_catalog(court_name, ttl=ttl)
+    if demo_mode:
+        from demo_scraper import DEMO_CASE_TYPES
+        current_year = time.gmtime().tm_year
+        catalog.load([(case_type, case_type) for case_type in DEMO_CASE_TYPES],
+                     [(str(year), str(year)) for year in range(current_year, 1949, -1)])
+        return catalog
+    
+    from courts import get_court_adapter
+    CatalogRefresher(catalog, get_court_adapter(court_name), path).start()
+    return catalog
+
+
+def get_catalog(court_name, ttl=86400):
+    """Shared catalog for a court, created empty on first use"""
+    with _catalogs_lock:
+        catalog = _catalogs.get(court_name)
+        if catalog is None:
+            catalog = CaseTypeCatalog(court_name, ttl=ttl)
+            _catalogs[court_name] = catalog
+        return catalog
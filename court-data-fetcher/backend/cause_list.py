@@ -0,0 +1,341 @@
+import argparse
+import hashlib
+import io
+import re
+import threading
+import time
+import logging
+from datetime import date, datetime, timedelta
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from catalog import normalize_label
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # In requirements.txt; PDF lists are skipped without it
+    PdfReader = None
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cause_lists (
+    court VARCHAR(100) NOT NULL,
+    list_date DATE NOT NULL,
+    content_hash TEXT NOT NULL,
+    entries INTEGER NOT NULL,
+    fetched_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (court, list_date)
+);
+
+CREATE TABLE IF NOT EXISTS cause_list_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    court VARCHAR(100) NOT NULL,
+    list_date DATE NOT NULL,
+    case_type VARCHAR(100) NOT NULL,
+    type_key VARCHAR(100) NOT NULL,
+    case_number VARCHAR(100) NOT NULL,
+    filing_year INTEGER NOT NULL,
+    court_room TEXT,
+    item_number TEXT,
+    parties TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_cause_list_case
+    ON cause_list_entries(type_key, case_number, filing_year, list_date);
+CREATE INDEX IF NOT EXISTS idx_cause_list_day ON cause_list_entries(court, list_date);
+"""
+
+# "COURT NO. 05", "Court Room No: 12"
+COURT_ROOM_PATTERN = re.compile(r'\bCOURT\s*(?:ROOM\s*)?NO\.?\s*[:.-]?\s*([0-9A-Z-]+)', re.IGNORECASE)
+# Leading serial number of a listed item: "12.", "12)", "12 "
+ITEM_PATTERN = re.compile(r'^\s*(\d{1,4}(?:\.\d+)?)[.)]?\s+')
+# Case type when no labels are known: up to three upper-case words such as
+# "W.P.(C)", "BAIL APPLN." or "ARB. A. (COMM.)"
+_TYPE_WORD = r'[A-Z][A-Z.&-]*(?:\s?\([A-Z. ]+\))*'
+GENERIC_CASE_TYPE = rf'{_TYPE_WORD}(?:\s{_TYPE_WORD}){{0,2}}'
+CASE_NUMBER = r'\s*(?:NO\.?\s*)?(\d{1,7})\s*/\s*((?:19|20)\d{2})\b'
+
+
+def case_reference_pattern(case_types=None):
+    """Regex for '<type> <number>/<year>'; known labels are matched exactly, longest first"""
+    if not case_types:
+        # Case-sensitive, so lower-case party names are never taken for a type
+        return re.compile(rf'(?<![0-9A-Za-z])({GENERIC_CASE_TYPE}){CASE_NUMBER}')
+    labels = sorted({label for _, label in case_types}, key=len, reverse=True)
+    # Tolerate spacing differences inside labels: "W.P. (C)" matches "W.P.(C)"
+    type_pattern = '|'.join(r'\s*'.join(map(re.escape, label.replace(' ', ''))) for label in labels)
+    return re.compile(rf'(?<![0-9A-Z])({type_pattern}){CASE_NUMBER}', re.IGNORECASE)
+
+
+def document_text(content, content_type='', url=''):
+    """Plain text of a cause-list document, one listed item per line where possible"""
+    if 'pdf' in content_type or url.lower().endswith('.pdf') or content[:5] == b'%PDF-':
+        if PdfReader is None:
+            logger.warning("⚠ pypdf not installed, skipping PDF cause list %s", url)
+            return ''
+        reader = PdfReader(io.BytesIO(content))
+        return '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+    text = content.decode('utf-8', errors='replace') if isinstance(content, bytes) else content
+    if 'html' not in content_type and '<' not in text[:1000]:
+        return text
+
+    soup = BeautifulSoup(text, 'html.parser')
+    for script in soup(['script', 'style']):
+        script.decompose()
+    # Keep each table row on one line so its item number, case and parties stay together
+    for row in soup.find_all('tr'):
+        row.replace_with(' '.join(cell.get_text(' ', strip=True) for cell in row.find_all(['td', 'th'])) + '\n')
+    return soup.get_text('\n')
+
+
+def parse_cause_list(text, case_types=None):
+    """Listed matters in a cause list's text, as dicts with the case key and listing details"""
+    reference = case_reference_pattern(case_types)
+    labels = {normalize_label(label): label for _, label in case_types or ()}
+    entries = []
+    court_room = None
+    item_number = None
+
+    for line in text.splitlines():
+        line = ' '.join(line.split())
+        if not line:
+            continue
+        room = COURT_ROOM_PATTERN.search(line)
+        if room:
+            court_room = room.group(1).lstrip('0') or '0'
+
+        matches = list(reference.finditer(line))
+        if not matches:
+            continue
+        item = ITEM_PATTERN.match(line)
+        if item:
+            item_number = item.group(1)
+        # Connected matters share a line; the parties follow the last reference
+        parties = line[matches[-1].end():].strip(' -:|') or None
+
+        for match in matches:
+            type_key = normalize_label(match.group(1))
+            entries.append({
+                'case_type': labels.get(type_key) or ' '.join(match.group(1).split()).upper(),
+                'type_key': type_key,
+                'case_number': match.group(2).lstrip('0') or '0',
+                'filing_year': int(match.group(3)),
+                'court_room': court_room,
+                'item_number': item_number,
+                'parties': parties[:300] if parties else None,
+            })
+    return entries
+
+
+class CauseListIndex:
+    """Listings from ingested cause lists, indexed by case for next-hearing lookups"""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        with db_manager.get_connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def content_hash(self, court, list_date):
+        with self.db_manager.get_connection() as conn:
+            row = conn.execute("SELECT content_hash FROM cause_lists WHERE court = ? AND list_date = ?",
+                               (court, list_date)).fetchone()
+            return row[0] if row else None
+
+    def replace_day(self, court, list_date, content_hash, entries):
+        """Swap in one day's listings in a single transaction"""
+        with self.db_manager.get_connection() as conn:
+            conn.execute("DELETE FROM cause_list_entries WHERE court = ? AND list_date = ?", (court, list_date))
+            conn.executemany("""
+                INSERT INTO cause_list_entries (court, list_date, case_type, type_key, case_number,
+                                                filing_year, court_room, item_number, parties)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(court, list_date, e['case_type'], e['type_key'], e['case_number'], e['filing_year'],
+                   e['court_room'], e['item_number'], e['parties']) for e in entries])
+            conn.execute("""
+                INSERT OR REPLACE INTO cause_lists (court, list_date, content_hash, entries, fetched_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, (court, list_date, content_hash, len(entries)))
+            conn.commit()
+
+    def next_hearing(self, court, case_type, case_number, filing_year, today=None):
+        """Earliest listing of a case on or after `today`, or None if no ingested list has it"""
+        today = (today or date.today()).isoformat()
+        with self.db_manager.get_connection() as conn:
+            row = conn.execute("""
+                SELECT list_date, case_type, court_room, item_number, parties
+                FROM cause_list_entries
+                WHERE type_key = ? AND case_number = ? AND filing_year = ? AND list_date >= ?
+                  AND court = ?
+                ORDER BY list_date, id
+                LIMIT 1
+            """, (normalize_label(case_type), str(case_number).lstrip('0') or '0', int(filing_year),
+                  today, court)).fetchone()
+            return dict(row) if row else None
+
+    def covered_until(self, court):
+        """Latest list date ingested for a court, or None"""
+        with self.db_manager.get_connection() as conn:
+            return conn.execute("SELECT MAX(list_date) FROM cause_lists WHERE court = ?",
+                                (court,)).fetchone()[0]
+
+    def prune(self, before):
+        """Drop listings dated before `before` (a date); returns how many"""
+        with self.db_manager.get_connection() as conn:
+            deleted = conn.execute("DELETE FROM cause_list_entries WHERE list_date < ?",
+                                   (before.isoformat(),)).rowcount
+            conn.execute("DELETE FROM cause_lists WHERE list_date < ?", (before.isoformat(),))
+            conn.commit()
+            return deleted
+
+
+class CauseListIngester:
+    """Fetches each day's cause list once and loads it into a CauseListIndex.
+
+    `url` is formatted with the day (e.g. '...?date={date:%d-%m-%Y}'); the
+    page and any PDF lists it links to make up that day's list. Unchanged
+    content is detected by hash and not re-indexed.
+    """
+
+    def __init__(self, index, court, url=None, catalog=None, days_ahead=2, keep_days=30):
+        self.index = index
+        self.court = court
+        self.url = url
+        self.catalog = catalog
+        self.days_ahead = days_ahead
+        self.keep_days = keep_days
+        self._stop = threading.Event()
+        self._thread = None
+
+    def fetch(self, day):
+        """[(url, content, content_type)] of the documents making up a day's list"""
+        if not self.url:
+            raise ValueError(f"No cause list URL configured for {self.court.display_name}")
+        # Through the court's pool: rate budget, retries and circuit breaker like any scrape
+        url = self.url.format(date=day)
+        response = self.court.get(url, stage='cause_list', rate_limited=True)
+        documents = [(url, response.content, response.headers.get('Content-Type', ''))]
+
+        if 'html' in documents[0][2]:
+            soup = BeautifulSoup(response.text, 'html.parser')
+            pdf_urls = dict.fromkeys(urljoin(url, a['href']) for a in soup.find_all('a', href=True)
+                                     if a['href'].lower().split('?')[0].endswith('.pdf'))
+            for pdf_url in pdf_urls:
+                if not self.court.owns_url(pdf_url):
+                    logger.warning("⚠ Skipping cause list PDF outside %s: %s", self.court.display_name, pdf_url)
+                    continue
+                pdf = self.court.get(pdf_url, stage='cause_list', rate_limited=True)
+                documents.append((pdf_url, pdf.content, pdf.headers.get('Content-Type', '')))
+        return documents
+
+    def ingest_documents(self, day, documents):
+        """Parse and index a day's documents unless they are unchanged; returns entries indexed"""
+        digest = hashlib.sha256()
+        for _, content, _ in documents:
+            digest.update(hashlib.sha256(content).digest())
+        content_hash = digest.hexdigest()
+        list_date = day.isoformat()
+        if self.index.content_hash(self.court.name, list_date) == content_hash:
+            logger.info("Cause list for %s unchanged", list_date)
+            return 0
+
+        case_types = self.catalog.case_types if self.catalog is not None else None
+        entries = []
+        for url, content, content_type in documents:
+            entries.extend(parse_cause_list(document_text(content, content_type, url), case_types))
+        self.index.replace_day(self.court.name, list_date, content_hash, entries)
+        logger.info("✓ Indexed %s listings from the %s cause list", len(entries), list_date)
+        return len(entries)
+
+    def ingest(self, day):
+        return self.ingest_documents(day, self.fetch(day))
+
+    def ingest_upcoming(self, today=None):
+        """Ingest today's and the next days' lists, one process per day across workers"""
+        from shared_state import get_shared_store
+        store = get_shared_store()
+        today = today or date.today()
+        total = 0
+        for offset in range(self.days_ahead + 1):
+            day = today + timedelta(days=offset)
+            key = f"cause_list:{self.court.name}:{day.isoformat()}"
+            owner = store.claim(key, lease=600) if store is not None else True
+            if owner is None:
+                continue
+            try:
+                total += self.ingest(day)
+            except Exception as e:
+                logger.warning("⚠ Cause list for %s not ingested: %s", day.isoformat(), e)
+            finally:
+                if store is not None:
+                    store.unclaim(key, owner)
+        self.index.prune(today - timedelta(days=self.keep_days))
+        return total
+
+    def start(self, interval):
+        """Re-check the upcoming lists every `interval` seconds in a daemon thread"""
+        if self._thread is not None:
+            return
+        if PdfReader is None:
+            logger.error("❌ pypdf is not installed: PDF cause lists will be skipped (pip install -r requirements.txt)")
+
+        def loop():
+            while True:
+                try:
+                    self.ingest_upcoming()
+                except Exception as e:
+                    logger.error("Cause list ingestion failed: %s", e)
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=loop, name='cause-list', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def parse_day(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+if __name__ == "__main__":
+    from config import Config
+    from courts import get_court_adapter
+    from catalog import get_catalog
+    from database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Ingest daily cause lists and look up next hearings")
+    parser.add_argument("command", choices=["ingest", "lookup"])
+    parser.add_argument("case", nargs="*", metavar="CASE_TYPE CASE_NUMBER YEAR",
+                        help="case to look up")
+    parser.add_argument("--date", type=parse_day, default=date.today(),
+                        help="list date (YYYY-MM-DD), default today")
+    parser.add_argument("--file", help="ingest a downloaded cause list (HTML, text or PDF) for --date")
+    parser.add_argument("--db", default=Config.DATABASE_PATH)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    court = get_court_adapter(Config.TARGET_COURT)
+    catalog = get_catalog(Config.TARGET_COURT, ttl=Config.CATALOG_TTL)
+    catalog.load_file(Config.CATALOG_PATH)
+    index = CauseListIndex(DatabaseManager(args.db))
+
+    if args.command == "ingest":
+        ingester = CauseListIngester(index, court, court.cause_list_url or Config.CAUSE_LIST_URL,
+                                     catalog, days_ahead=Config.CAUSE_LIST_DAYS_AHEAD,
+                                     keep_days=Config.CAUSE_LIST_KEEP_DAYS)
+        start = time.time()
+        if args.file:
+            with open(args.file, 'rb') as f:
+                count = ingester.ingest_documents(args.date, [(args.file, f.read(), '')])
+        else:
+            count = ingester.ingest_upcoming(args.date)
+        print(f"✓ Indexed {count} listings in {time.time() - start:.1f}s "
+              f"(lists ingested up to {index.covered_until(court.name)})")
+    else:
+        if len(args.case) != 3:
+            parser.error("lookup needs CASE_TYPE CASE_NUMBER YEAR")
+        listing = index.next_hearing(court.name, *args.case, today=args.date)
+        print(listing or "Not listed in any ingested cause list")
@@ -15,3 +15,96 @@ class Config:
     
     # Rate limiting
     MAX_REQUESTS_PER_HOUR = int(os.getenv('MAX_REQUESTS_PER_HOUR', '10'))
+    
+    # Case-type / year option catalog cache (seconds) and where it is persisted
+    CATALOG_TTL = int(os.getenv('CATALOG_TTL', '86400'))
+    CATALOG_PATH = os.getenv('CATALOG_PATH', 'database/case_types.json')
+    CATALOG_CACHE_MAX_AGE = int(os.getenv('CATALOG_CACHE_MAX_AGE', '3600'))
+    
+    # Browser usage: 'dedicated' (one Chrome per scraper) or 'multiplexed'
+    # (concurrent searches share a few Chrome processes, one isolated tab each)
+    BROWSER_MODE = os.getenv('BROWSER_MODE', 'dedicated')
+    BROWSER_PROCESSES = int(os.getenv('BROWSER_PROCESSES', '2'))
+    TABS_PER_BROWSER = int(os.getenv('TABS_PER_BROWSER', '6'))
+    
+    # Browser profile: 'lean' (headless, blocks images/fonts/CSS/analytics)
+    # or 'full' (visible browser loading everything, for debugging)
+    BROWSER_PROFILE = os.getenv('BROWSER_PROFILE', 'lean')
+    
+    # Upstream resilience: retries per stage, adaptive timeout bounds (seconds)
+    # and the circuit breaker that fails fast while the court site is unhealthy
+    UPSTREAM_RETRIES = int(os.getenv('UPSTREAM_RETRIES', '2'))
+    STAGE_TIMEOUT_MIN = float(os.getenv('STAGE_TIMEOUT_MIN', '3'))
+    STAGE_TIMEOUT_MAX = float(os.getenv('STAGE_TIMEOUT_MAX', '45'))
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+    BREAKER_RESET_SECONDS = int(os.getenv('BREAKER_RESET_SECONDS', '60'))
+    
+    # Demo engine: synthetic mode serves a deterministic universe of
+    # DEMO_CASE_COUNT cases from DEMO_SEED with log-normal latency and errors
+    DEMO_SYNTHETIC = os.getenv('DEMO_SYNTHETIC', 'False').lower() == 'true'
+    DEMO_SEED = int(os.getenv('DEMO_SEED', '42'))
+    DEMO_CASE_COUNT = int(os.getenv('DEMO_CASE_COUNT', '1000000'))
+    DEMO_LATENCY_MEDIAN = float(os.getenv('DEMO_LATENCY_MEDIAN', '1.5'))
+    DEMO_LATENCY_SIGMA = float(os.getenv('DEMO_LATENCY_SIGMA', '0.5'))
+    DEMO_ERROR_RATE = float(os.getenv('DEMO_ERROR_RATE', '0.02'))
+    DEMO_PDF_BASE_URL = os.getenv('DEMO_PDF_BASE_URL', 'https://example.com/documents')
+    
+    # Cache lifetime (seconds) for GET /cases/... responses
+    CASE_CACHE_MAX_AGE = int(os.getenv('CASE_CACHE_MAX_AGE', '300'))
+    
+    # Retention: failed lookups and superseded successes older than these many
+    # days are archived (gzip NDJSON per day) and deleted; the latest success
+    # per case is always kept. RETENTION_INTERVAL=0 disables the background run.
+    RETENTION_FAILED_DAYS = int(os.getenv('RETENTION_FAILED_DAYS', '30'))
+    RETENTION_SUPERSEDED_DAYS = int(os.getenv('RETENTION_SUPERSEDED_DAYS', '90'))
+    RETENTION_ARCHIVE_DIR = os.getenv('RETENTION_ARCHIVE_DIR', 'database/archive')
+    RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', '500'))
+    RETENTION_INTERVAL = int(os.getenv('RETENTION_INTERVAL', '3600'))
+    
+    # Coordination shared by all worker processes on this host (result cache,
+    # rate budget, in-flight dedupe, browser capacity). Empty disables it.
+    SHARED_STATE_PATH = os.getenv('SHARED_STATE_PATH', 'database/shared_state.db')
+    RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', '600'))
+    BROWSER_IDLE_SECONDS = int(os.getenv('BROWSER_IDLE_SECONDS', '300'))
+    
+    # Image captcha reader: 'template' (NumPy digit templates built with
+    # captcha_solver.py, falling back to Tesseract) or 'tesseract'
+    CAPTCHA_SOLVER = os.getenv('CAPTCHA_SOLVER', 'template')
+    CAPTCHA_TEMPLATES = os.getenv('CAPTCHA_TEMPLATES', 'captcha_templates.npz')
+    
+    # Logging: 'json' or 'text' lines, written by a background thread; only
+    # LOG_DEBUG_SAMPLE_RATE of DEBUG records are kept
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '0.1'))
+    
+    # Where searches run: 'inline' (in the web process) or 'queue' (the web
+    # tier enqueues jobs and returns 202; worker.py processes claim them)
+    SCRAPE_MODE = os.getenv('SCRAPE_MODE', 'inline')
+    JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '120'))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '4'))
+    JOB_RETRY_BASE_SECONDS = float(os.getenv('JOB_RETRY_BASE_SECONDS', '5'))
+    JOB_POLL_SECONDS = float(os.getenv('JOB_POLL_SECONDS', '1'))
+    JOB_RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', '7'))
+    WORKER_CONCURRENCY = int(os.getenv('WORKER_CONCURRENCY', '2'))
+    
+    # Daily cause lists answer next-hearing lookups without a scrape. The URL
+    # (used when the court adapter has none) is formatted with the list date,
+    # e.g. https://court.example/cause-list?date={date:%d-%m-%Y}; lists for
+    # today and CAUSE_LIST_DAYS_AHEAD more days are re-checked every
+    # CAUSE_LIST_INTERVAL seconds (0 disables).
+    CAUSE_LIST_URL = os.getenv('CAUSE_LIST_URL', '')
+    CAUSE_LIST_INTERVAL = int(os.getenv('CAUSE_LIST_INTERVAL', '21600'))
+    CAUSE_LIST_DAYS_AHEAD = int(os.getenv('CAUSE_LIST_DAYS_AHEAD', '2'))
+    CAUSE_LIST_KEEP_DAYS = int(os.getenv('CAUSE_LIST_KEEP_DAYS', '30'))
+    
+    # Request profiling: a request is sampled when it sends X-Profile with
+    # ADMIN_TOKEN, or at random for PROFILE_SAMPLE_RATE of requests. Admin
+    # endpoints (/admin/... and /export) are disabled while ADMIN_TOKEN is empty.
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+    PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', '1000'))
+    
+    # Exports scan the whole history, so only this many run at once
+    EXPORT_MAX_CONCURRENT = int(os.getenv('EXPORT_MAX_CONCURRENT', '2'))
@@ -0,0 +1,300 @@
+import asyncio
+import importlib
+import threading
+import time
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+from resilience import UpstreamHealth, CircuitOpenError, hedged_call, retry_with_backoff
+
+logger = logging.getLogger(__name__)
+
+
+class CourtBusyError(RuntimeError):
+    """Raised when a court has no free concurrency slot or rate-limit budget"""
+
+
+def is_transient_error(error):
+    """Network failures and 5xx responses are worth retrying; other errors are not"""
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def same_site(url, base_url):
+    """Whether `url` is an http(s) URL on `base_url`'s host or one of its subdomains"""
+    parsed = urlparse(url)
+    host = (parsed.hostname or '').lower()
+    site = (urlparse(base_url).hostname or '').lower()
+    if site.startswith('www.'):
+        site = site[4:]
+    return parsed.scheme in ('http', 'https') and bool(site) and (host == site or host.endswith('.' + site))
+
+
+class RateLimiter:
+    """Token bucket limiting how many searches per minute hit one court"""
+
+    def __init__(self, requests_per_minute, burst=None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(burst or max(1, requests_per_minute // 6))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self):
+        """Take one token if available; otherwise return the seconds until one is"""
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, timeout=None):
+        """Take one token, waiting up to `timeout` seconds for the bucket to refill"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                return True
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class LocalSemaphore:
+    """In-process concurrency cap with SharedSemaphore's acquire/release(slot) API"""
+
+    def __init__(self, limit):
+        self._semaphore = threading.BoundedSemaphore(limit)
+
+    def acquire(self, blocking=True, timeout=None):
+        return self._semaphore.acquire(blocking, timeout if blocking else None)
+
+    def release(self, slot):
+        self._semaphore.release()
+
+
+class CourtAdapter:
+    """Everything the scraper needs to know about one court website.
+
+    Each adapter owns its own HTTP connection pool, rate limiter and
+    concurrency cap, so a slow or throttled court cannot use up the
+    capacity reserved for another one. With a shared store configured the
+    rate limit and cap hold across all worker processes on the host.
+    """
+
+    def __init__(self, name, display_name, base_url, case_search_url, form_selectors,
+                 fetch_strategy='browser', parser='parse_case_details',
+                 captcha_refresh_url=None, cause_list_url=None, session_ttl=1800,
+                 pool_connections=2, pool_maxsize=4,
+                 requests_per_minute=30, max_concurrency=2, slot_timeout=60):
+        if fetch_strategy not in ('browser', 'http'):
+            raise ValueError(f"Unsupported fetch strategy: {fetch_strategy}")
+
+        self.name = name
+        self.display_name = display_name
+        self.base_url = base_url
+        self.case_search_url = case_search_url
+        self.form_selectors = form_selectors
+        self.fetch_strategy = fetch_strategy
+        # Name of the case_parser.PARSERS function that reads the results page
+        self.parser = parser
+        self.captcha_refresh_url = captcha_refresh_url
+        # Daily cause list, formatted with the list date (see cause_list.py)
+        self.cause_list_url = cause_list_url
+        self.session_ttl = session_ttl
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_concurrency = max_concurrency
+        self.slot_timeout = slot_timeout
+
+        from shared_state import get_shared_store, SharedRateLimiter, SharedSemaphore
+        store = get_shared_store()
+        if store is not None:
+            # Every worker process on the host draws on the same budget
+            self.rate_limiter = SharedRateLimiter(store, f"{name}:searches", requests_per_minute)
+            self._slots = SharedSemaphore(store, f"{name}:searches", max_concurrency)
+        else:
+            self.rate_limiter = RateLimiter(requests_per_minute)
+            self._slots = LocalSemaphore(max_concurrency)
+        # Default timeouts per stage until enough latencies have been observed
+        self.health = UpstreamHealth(name, {
+            'page_load': 15,
+            'results': 15,
+            'http_search': 30,
+            'pdf': 30,
+            'cause_list': 60,
+        }, failure_threshold=Config.BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=Config.BREAKER_RESET_SECONDS,
+            min_timeout=Config.STAGE_TIMEOUT_MIN, max_timeout=Config.STAGE_TIMEOUT_MAX)
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def get_session(self):
+        """Shared requests session with a connection pool sized for this court"""
+        with self._session_lock:
+            if self._session is None:
+                session = requests.Session()
+                pool = HTTPAdapter(pool_connections=self.pool_connections,
+                                   pool_maxsize=self.pool_maxsize)
+                session.mount('http://', pool)
+                session.mount('https://', pool)
+                session.headers['User-Agent'] = (
+                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                )
+                self._session = session
+            return self._session
+
+    def owns_url(self, url):
+        """Whether `url` is on this court's website; only those go through its pool and breaker"""
+        return same_site(url, self.base_url)
+
+    def get(self, url, stage='pdf', rate_limited=False):
+        """GET a page or document from this court's website through its pool; returns the response.
+        
+        GETs are idempotent, so a slow request is hedged with a duplicate,
+        transient failures are retried with backoff, and the call fails fast
+        while the court's circuit breaker is open. Only URLs on the court's
+        own website are accepted, so foreign hosts never count against its
+        breaker. With rate_limited every attempt spends a token of the
+        court's rate budget, as searches do.
+        """
+        if not self.owns_url(url):
+            raise ValueError(f"Not a {self.display_name} URL: {url}")
+        if not self.health.breaker.allow():
+            raise CircuitOpenError(f"{self.display_name} is temporarily unavailable")
+        
+        session = self.get_session()
+        timeout = self.health.stage_timeout(stage)
+        
+        def fetch():
+            if rate_limited and not self.rate_limiter.acquire(timeout=self.slot_timeout):
+                raise CourtBusyError(f"{self.display_name} rate limit reached")
+            with self.health.measure(stage):
+                response = session.get(url, timeout=timeout)
+                response.raise_for_status()
+                return response
+        
+        try:
+            response = retry_with_backoff(
+                lambda: hedged_call(fetch, self.health.hedge_delay(stage)),
+                attempts=Config.UPSTREAM_RETRIES + 1,
+                should_retry_error=is_transient_error,
+            )
+        except Exception as e:
+            if is_transient_error(e):
+                self.health.breaker.record_failure()
+            else:
+                # A 4xx, a bad URL or our own rate limit says nothing about the court's health
+                self.health.breaker.release()
+            raise
+        self.health.breaker.record_success()
+        return response
+
+    def download(self, url):
+        """Fetch a document (e.g. a PDF) through this court's pool, returning its bytes"""
+        return self.get(url).content
+
+    @contextmanager
+    def slot(self, timeout=None):
+        """Reserve one concurrent search against this court"""
+        timeout = self.slot_timeout if timeout is None else timeout
+        start = time.monotonic()
+
+        slot = self._slots.acquire(timeout=timeout)
+        if not slot:
+            raise CourtBusyError(f"{self.display_name} is at its concurrency limit")
+        try:
+            remaining = max(0.0, timeout - (time.monotonic() - start))
+            if not self.rate_limiter.acquire(timeout=remaining):
+                raise CourtBusyError(f"{self.display_name} rate limit reached")
+            yield self
+        finally:
+            self._slots.release(slot)
+
+    @asynccontextmanager
+    async def async_slot(self, timeout=None):
+        """slot() for asyncio callers: waits without blocking the event loop.
+        
+        With a shared store every take and give is a SQLite transaction that
+        can wait on another process's lock, so those run in a worker thread.
+        """
+        timeout = self.slot_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            slot = await asyncio.to_thread(self._slots.acquire, False)
+            if slot:
+                break
+            if time.monotonic() >= deadline:
+                raise CourtBusyError(f"{self.display_name} is at its concurrency limit")
+            await asyncio.sleep(0.05)
+        try:
+            while True:
+                wait = await asyncio.to_thread(self.rate_limiter.try_acquire)
+                if wait == 0:
+                    break
+                if time.monotonic() + wait > deadline:
+                    raise CourtBusyError(f"{self.display_name} rate limit reached")
+                await asyncio.sleep(wait)
+            yield self
+        finally:
+            # Shielded so a cancelled request still gives its slot back
+            await asyncio.shield(asyncio.to_thread(self._slots.release, slot))
+
+
+# Court name -> "module:factory". Modules are only imported on first use.
+_COURT_LOADERS = {
+    'delhi_high_court': 'delhi_high_court:create_adapter',
+}
+
+_adapters = {}
+_registry_lock = threading.Lock()
+
+
+def register_court(name, loader):
+    """Register a court adapter factory, given as a callable or "module:factory" path"""
+    with _registry_lock:
+        _COURT_LOADERS[name] = loader
+        _adapters.pop(name, None)
+
+
+def available_courts():
+    """Names of all registered courts"""
+    return sorted(_COURT_LOADERS)
+
+
+def get_court_adapter(name):
+    """Return the adapter for `name`, loading it on first use"""
+    with _registry_lock:
+        adapter = _adapters.get(name)
+        if adapter is not None:
+            return adapter
+
+        loader = _COURT_LOADERS.get(name)
+        if loader is None:
+            raise ValueError(f"Unsupported court: {name}")
+
+        if isinstance(loader, str):
+            module_name, factory_name = loader.split(':')
+            loader = getattr(importlib.import_module(module_name), factory_name)
+
+        adapter = loader()
+        _adapters[name] = adapter
+        logger.info("✓ Loaded court adapter: %s", adapter.display_name)
+        return adapter
@@ -1,18 +1,78 @@
 import sqlite3
+import hashlib
 import json
 import os
+import re
+import logging
 from datetime import datetime
+from itertools import islice
 from contextlib import contextmanager
 
+logger = logging.getLogger(__name__)
+
+# Column order of export_rows(): queries joined with their case's current case_details
+EXPORT_COLUMNS = [
+    'query_id', 'case_type', 'case_number', 'filing_year', 'searched_at', 'status',
+    'error_message', 'search_duration', 'parties_names', 'filing_date',
+    'next_hearing_date', 'case_status', 'pdf_links', 'additional_info'
+]
+
+# Current details row of lookup `q`'s case. case_details holds one row per
+# case, updated in place; earlier states live in case_versions. MAX() also
+# picks the newest row of databases written before that.
+CURRENT_DETAILS_SQL = """
+    SELECT MAX(cd2.id) FROM queries pq
+    JOIN case_details cd2 ON cd2.query_id = pq.id
+    WHERE q.status = 'success' AND pq.case_type = q.case_type AND pq.case_number = q.case_number
+      AND pq.filing_year = q.filing_year
+"""
+
+# Fields of a case's state that are versioned; additional_info is tracked per key
+CASE_FIELDS = ['parties_names', 'filing_date', 'next_hearing_date', 'case_status', 'pdf_links']
+
+# Every SNAPSHOT_INTERVAL-th version of a case stores its full state, so
+# rebuilding any version replays fewer than this many deltas
+SNAPSHOT_INTERVAL = 20
+
+
+def case_state(parties_names, filing_date, next_hearing_date, case_status, pdf_links, additional_info=None):
+    """Flat {field: value} state of a case, with additional_info keys as 'additional_info.<key>'"""
+    state = dict(zip(CASE_FIELDS, (parties_names, filing_date, next_hearing_date, case_status, pdf_links or [])))
+    for key, value in (additional_info or {}).items():
+        state[f'additional_info.{key}'] = value
+    return state
+
+
+def state_hash(state):
+    return hashlib.sha256(json.dumps(state, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def state_delta(old, new):
+    """Field-level difference turning `old` into `new`"""
+    delta = {'set': {key: value for key, value in new.items() if old.get(key) != value or key not in old}}
+    removed = [key for key in old if key not in new]
+    if removed:
+        delta['unset'] = removed
+    return delta
+
+
+def apply_delta(state, delta):
+    state = {**state, **delta['set']}
+    for key in delta.get('unset', ()):
+        state.pop(key, None)
+    return state
+
+
 class DatabaseManager:
     def __init__(self, db_path='database/court_data.db'):
-        self.db_path = db_path.replace('/', '\\')  # Windows path fix
+        self.db_path = os.path.normpath(db_path)  # Native separators on Windows and POSIX
         self.init_database()
     
     def init_database(self):
         """Initialize database with schema"""
         # Create database directory if it doesn't exist
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        if os.path.dirname(self.db_path):
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         
         # Execute schema
         schema_path = os.path.join('database', 'init.sql')
@@ -45,12 +105,35 @@ class DatabaseManager:
                 additional_info TEXT,
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP
             );
+            
+            CREATE TABLE IF NOT EXISTS case_versions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                case_type VARCHAR(100) NOT NULL,
+                case_number VARCHAR(100) NOT NULL,
+                filing_year INTEGER NOT NULL,
+                version INTEGER NOT NULL,
+                query_id INTEGER,
+                content_hash TEXT NOT NULL,
+                snapshot TEXT,
+                delta TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                last_seen_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                seen_count INTEGER NOT NULL DEFAULT 1,
+                UNIQUE (case_type, case_number, filing_year, version)
+            );
+            
+            CREATE INDEX IF NOT EXISTS idx_queries_case ON queries(case_type, case_number, filing_year);
+            CREATE INDEX IF NOT EXISTS idx_case_details_query ON case_details(query_id);
             """
         
         conn = sqlite3.connect(self.db_path)
+        # Only takes effect on a new file; existing ones need retention.py --convert
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        # Readers don't block the writer (and retention's batched deletes)
+        conn.execute("PRAGMA journal_mode=WAL")
         conn.executescript(schema)
         conn.close()
-        print(f"✓ Database initialized at: {self.db_path}")
+        logger.info("✓ Database initialized at: %s", self.db_path)
     
     @contextmanager
     def get_connection(self):
@@ -92,25 +175,340 @@ class DatabaseManager:
     
     def save_case_details(self, query_id, parties_names, filing_date, 
                          next_hearing_date, case_status, pdf_links, additional_info=None):
-        """Save parsed case details"""
+        """Save parsed case details if they differ from the case's latest version.
+        
+        A change appends a version (snapshot or delta) to case_versions and
+        overwrites the case's single case_details row with the new current
+        state. An unchanged result only bumps the latest version's
+        last_seen_at, so storage grows with the number of changes rather
+        than lookups. Returns whether anything changed.
+        """
+        state = case_state(parties_names, filing_date, next_hearing_date, case_status,
+                           pdf_links, additional_info)
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
+            # Serializes concurrent writers of the same case's next version
+            conn.execute("BEGIN IMMEDIATE")
+            case_key = tuple(conn.execute(
+                "SELECT case_type, case_number, filing_year FROM queries WHERE id = ?", (query_id,)
+            ).fetchone())
+            changed = self.record_case_version(conn, case_key, query_id, state)
+            if changed:
+                self.write_current_details(conn, case_key, (
+                    query_id, parties_names, filing_date, next_hearing_date,
+                    case_status, json.dumps(pdf_links), json.dumps(additional_info)
+                ))
+            conn.commit()
+            return changed
+    
+    def write_current_details(self, conn, case_key, values, created_at=None):
+        """Overwrite the case's case_details row with `values`, inserting it for a new case"""
+        current_id = conn.execute("""
+            SELECT MAX(cd.id) FROM queries q JOIN case_details cd ON cd.query_id = q.id
+            WHERE q.case_type = ? AND q.case_number = ? AND q.filing_year = ?
+        """, case_key).fetchone()[0]
+        if current_id is None:
+            conn.execute("""
                 INSERT INTO case_details (query_id, parties_names, filing_date, 
-                                        next_hearing_date, case_status, pdf_links, additional_info)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (query_id, parties_names, filing_date, next_hearing_date, 
-                  case_status, json.dumps(pdf_links), json.dumps(additional_info)))
+                                        next_hearing_date, case_status, pdf_links, additional_info,
+                                        created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            """, (*values, created_at))
+        else:
+            conn.execute("""
+                UPDATE case_details
+                SET query_id = ?, parties_names = ?, filing_date = ?, next_hearing_date = ?,
+                    case_status = ?, pdf_links = ?, additional_info = ?,
+                    created_at = COALESCE(?, CURRENT_TIMESTAMP)
+                WHERE id = ?
+            """, (*values, created_at, current_id))
+    
+    def record_case_version(self, conn, case_key, query_id, state, seen_at=None):
+        """Append a version (full snapshot or delta) unless `state` matches the latest one"""
+        content_hash = state_hash(state)
+        latest = conn.execute("""
+            SELECT id, version, content_hash FROM case_versions
+            WHERE case_type = ? AND case_number = ? AND filing_year = ?
+            ORDER BY version DESC LIMIT 1
+        """, case_key).fetchone()
+        
+        if latest is not None and latest['content_hash'] == content_hash:
+            conn.execute("""
+                UPDATE case_versions SET last_seen_at = COALESCE(?, CURRENT_TIMESTAMP),
+                       seen_count = seen_count + 1
+                WHERE id = ?
+            """, (seen_at, latest['id']))
+            return False
+        
+        version = 1 if latest is None else latest['version'] + 1
+        snapshot = delta = None
+        if version % SNAPSHOT_INTERVAL == 1:
+            snapshot = json.dumps(state, ensure_ascii=False)
+        else:
+            previous = self.rebuild_case_state(conn, case_key, latest['version'])
+            delta = json.dumps(state_delta(previous, state), ensure_ascii=False)
+        conn.execute("""
+            INSERT INTO case_versions (case_type, case_number, filing_year, version, query_id,
+                                       content_hash, snapshot, delta, created_at, last_seen_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), COALESCE(?, CURRENT_TIMESTAMP))
+        """, (*case_key, version, query_id, content_hash, snapshot, delta, seen_at, seen_at))
+        return True
+    
+    def rebuild_case_state(self, conn, case_key, version):
+        """State of a case at `version`: its nearest full snapshot with later deltas applied"""
+        rows = conn.execute("""
+            SELECT snapshot, delta FROM case_versions
+            WHERE case_type = ? AND case_number = ? AND filing_year = ? AND version <= ?
+              AND version >= (
+                SELECT MAX(version) FROM case_versions
+                WHERE case_type = ? AND case_number = ? AND filing_year = ?
+                  AND version <= ? AND snapshot IS NOT NULL
+              )
+            ORDER BY version
+        """, (*case_key, version, *case_key, version)).fetchall()
+        state = {}
+        for row in rows:
+            state = json.loads(row['snapshot']) if row['snapshot'] else apply_delta(state, json.loads(row['delta']))
+        return state
+    
+    def get_case_timeline(self, case_type, case_number, filing_year):
+        """Every version of a case, oldest first, with the fields that changed in each"""
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT version, query_id, snapshot, delta, created_at, last_seen_at, seen_count
+                FROM case_versions
+                WHERE case_type = ? AND case_number = ? AND filing_year = ?
+                ORDER BY version
+            """, (case_type, case_number, filing_year)).fetchall()
+        
+        timeline = []
+        state = {}
+        for row in rows:
+            new_state = json.loads(row['snapshot']) if row['snapshot'] else apply_delta(state, json.loads(row['delta']))
+            changes = {
+                key: {'from': state.get(key), 'to': new_state.get(key)}
+                for key in sorted(set(state) | set(new_state)) if state.get(key) != new_state.get(key)
+            }
+            timeline.append({
+                'version': row['version'],
+                'query_id': row['query_id'],
+                'first_seen_at': row['created_at'],
+                'last_seen_at': row['last_seen_at'],
+                'seen_count': row['seen_count'],
+                'changes': changes,
+            })
+            state = new_state
+        return timeline, state
+    
+    def backfill_case_versions(self):
+        """Build version history from existing case_details rows (one-off, for older databases).
+        
+        Afterwards only each case's newest case_details row is kept, as the
+        versions now hold the earlier states.
+        """
+        added = 0
+        with self.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM case_versions LIMIT 1").fetchone():
+                conn.rollback()
+                return 0
+            for row in conn.execute("""
+                SELECT q.case_type, q.case_number, q.filing_year, cd.*
+                FROM case_details cd JOIN queries q ON q.id = cd.query_id
+                ORDER BY cd.id
+            """).fetchall():
+                state = case_state(row['parties_names'], row['filing_date'], row['next_hearing_date'],
+                                   row['case_status'], json.loads(row['pdf_links'] or '[]'),
+                                   json.loads(row['additional_info'] or 'null'))
+                case_key = (row['case_type'], row['case_number'], row['filing_year'])
+                added += self.record_case_version(conn, case_key, row['query_id'], state,
+                                                  seen_at=row['created_at'])
+            conn.execute("""
+                DELETE FROM case_details WHERE id NOT IN (
+                    SELECT MAX(cd.id) FROM case_details cd JOIN queries q ON q.id = cd.query_id
+                    GROUP BY q.case_type, q.case_number, q.filing_year
+                )
+            """)
             conn.commit()
+        return added
+    
+    def bulk_load_cases(self, cases, batch_size=20000):
+        """Insert successful lookups with parsed details in large batches.
+        
+        Used to load synthetic data for load testing. Each case gets its
+        version 1 snapshot in case_versions, as a first lookup would. Each
+        batch is a single transaction. Only when the database is still empty
+        (so nothing else can be reading it) are indexes dropped during the
+        load and rebuilt once at the end, and syncing disabled.
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        indexes = []
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-200000")
+            
+            fresh = conn.execute("SELECT 1 FROM queries LIMIT 1").fetchone() is None
+            if fresh:
+                conn.execute("PRAGMA synchronous=OFF")
+                indexes = conn.execute("""
+                    SELECT name, sql FROM sqlite_master
+                    WHERE type = 'index' AND tbl_name IN ('queries', 'case_details') AND sql IS NOT NULL
+                """).fetchall()
+                for name, _ in indexes:
+                    conn.execute(f"DROP INDEX IF EXISTS {name}")
+            
+            next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM queries").fetchone()[0]
+            total = 0
+            cases = iter(cases)
+            
+            while True:
+                batch = list(islice(cases, batch_size))
+                if not batch:
+                    break
+                
+                query_rows = []
+                version_rows = []
+                details = {}
+                for query_id, case in enumerate(batch, start=next_id):
+                    case_key = (case['case_type'], case['case_number'], case['filing_year'])
+                    state = case_state(case['parties_names'], case['filing_date'], case['next_hearing_date'],
+                                       case['case_status'], case['pdf_links'], case['additional_info'])
+                    query_rows.append((query_id, *case_key, case['searched_at'], case['search_duration']))
+                    version_rows.append((*case_key, query_id, state_hash(state),
+                                         json.dumps(state, ensure_ascii=False),
+                                         case['searched_at'], case['searched_at']))
+                    details[query_id] = (case_key, state, (
+                        query_id, case['parties_names'], case['filing_date'],
+                        case['next_hearing_date'], case['case_status'],
+                        json.dumps(case['pdf_links']), json.dumps(case['additional_info']),
+                        case['searched_at']
+                    ))
+                
+                conn.executemany("""
+                    INSERT INTO queries (id, case_type, case_number, filing_year, timestamp,
+                                         status, search_duration)
+                    VALUES (?, ?, ?, ?, ?, 'success', ?)
+                """, query_rows)
+                before = conn.total_changes
+                conn.executemany("""
+                    INSERT OR IGNORE INTO case_versions (case_type, case_number, filing_year, version,
+                                                         query_id, content_hash, snapshot,
+                                                         created_at, last_seen_at)
+                    VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?)
+                """, version_rows)
+                
+                repeats = set()
+                if conn.total_changes - before < len(batch):
+                    # Cases already in the database (or twice in this batch) take the regular path
+                    for query_id, (case_key, _, _) in details.items():
+                        first = conn.execute("""
+                            SELECT query_id FROM case_versions
+                            WHERE case_type = ? AND case_number = ? AND filing_year = ? AND version = 1
+                        """, case_key).fetchone()
+                        if first[0] != query_id:
+                            repeats.add(query_id)
+                
+                conn.executemany("""
+                    INSERT INTO case_details (query_id, parties_names, filing_date, next_hearing_date,
+                                              case_status, pdf_links, additional_info, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [values for query_id, (_, _, values) in details.items() if query_id not in repeats])
+                for query_id in sorted(repeats):
+                    case_key, state, values = details[query_id]
+                    if self.record_case_version(conn, case_key, query_id, state, seen_at=values[-1]):
+                        self.write_current_details(conn, case_key, values[:-1], created_at=values[-1])
+                conn.commit()
+                
+                next_id += len(batch)
+                total += len(batch)
+            
+            return total
+        finally:
+            # Rebuild the indexes even when a batch failed, or the database is left without them
+            try:
+                conn.rollback()
+                for _, sql in indexes:
+                    conn.execute(re.sub(r'^CREATE (UNIQUE )?INDEX (?!IF NOT EXISTS)',
+                                        r'CREATE \1INDEX IF NOT EXISTS ', sql))
+                conn.commit()
+            finally:
+                conn.close()
+    
+    def get_latest_case_details(self, case_type, case_number, filing_year):
+        """Most recent successfully parsed details for a case, or None"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT cd.*, (
+                    -- Unchanged lookups don't touch the details row but still confirm it
+                    SELECT MAX(latest.timestamp) FROM queries latest
+                    WHERE latest.case_type = q.case_type AND latest.case_number = q.case_number
+                      AND latest.filing_year = q.filing_year AND latest.status = 'success'
+                ) AS searched_at
+                FROM queries q
+                JOIN case_details cd ON q.id = cd.query_id
+                WHERE q.case_type = ? AND q.case_number = ? AND q.filing_year = ?
+                  AND q.status = 'success'
+                ORDER BY cd.id DESC
+                LIMIT 1
+            """, (case_type, case_number, filing_year))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            
+            details = dict(row)
+            details['pdf_links'] = json.loads(details['pdf_links'] or '[]')
+            details['additional_info'] = json.loads(details['additional_info'] or 'null') or {}
+            return details
+    
+    def export_rows(self, start_date=None, end_date=None, statuses=None, batch_size=5000):
+        """Stream query history joined with its case's current details as EXPORT_COLUMNS tuples.
+        
+        Rows are read in id order with fetchmany, so memory stays flat however
+        many rows match. Dates are inclusive 'YYYY-MM-DD' bounds on the query
+        timestamp; `statuses` limits the query statuses returned.
+        """
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append("q.timestamp >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("q.timestamp < date(?, '+1 day')")
+            params.append(end_date)
+        if statuses:
+            conditions.append(f"q.status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        with self.get_connection() as conn:
+            conn.row_factory = None
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT q.id, q.case_type, q.case_number, q.filing_year, q.timestamp, q.status,
+                       q.error_message, q.search_duration, cd.parties_names, cd.filing_date,
+                       cd.next_hearing_date, cd.case_status, cd.pdf_links, cd.additional_info
+                FROM queries q
+                LEFT JOIN case_details cd ON cd.id = ({CURRENT_DETAILS_SQL})
+                {where}
+                ORDER BY q.id
+            """, params)
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
     
     def get_recent_queries(self, limit=10):
         """Get recent successful queries for display"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT q.*, cd.parties_names, cd.case_status 
                 FROM queries q
-                LEFT JOIN case_details cd ON q.id = cd.query_id
+                LEFT JOIN case_details cd ON cd.id = ({CURRENT_DETAILS_SQL})
                 WHERE q.status = 'success'
                 ORDER BY q.timestamp DESC
                 LIMIT ?
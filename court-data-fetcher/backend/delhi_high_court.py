@@ -0,0 +1,32 @@
+from courts import CourtAdapter
+
+
+def create_adapter():
+    """Delhi High Court case-number search, using the EXACT discovered structure"""
+    return CourtAdapter(
+        name='delhi_high_court',
+        display_name='Delhi High Court',
+        base_url='https://delhihighcourt.nic.in',
+        case_search_url='https://delhihighcourt.nic.in/app/case-number',
+        form_selectors={
+            'form_id': 'search1',
+            'case_type': 'select[name="case_type"]',
+            'case_number': 'input[name="case_number"]',
+            'year': 'select[name="year"]',
+            'captcha_input': 'input[name="captchaInput"]',
+            'captcha_image': 'img[src*="captcha"]',
+            'captcha_code': '#captcha-code',
+            'submit': 'button[id="search"]',
+            '_token': 'input[name="_token"]',
+            'randomid': 'input[name="randomid"]'
+        },
+        fetch_strategy='browser',
+        parser='parse_case_details',
+        # New captcha codes without reloading the page (what the reload icon calls)
+        captcha_refresh_url='https://delhihighcourt.nic.in/app/generate-captcha',
+        session_ttl=1800,
+        pool_connections=2,
+        pool_maxsize=4,
+        requests_per_minute=20,
+        max_concurrency=2,
+    )
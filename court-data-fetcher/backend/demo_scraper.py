@@ -1,12 +1,183 @@
 import time
 import json
 import random
+import asyncio
+import argparse
+import logging
+import multiprocessing
 from datetime import datetime, timedelta
 
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Vocabulary for synthetic cases
+SYNTHETIC_CASE_TYPES = [
+    "ARB.A.", "ARB. A. (COMM.)", "ARB.P.", "BAIL APPLN.", "CS(COMM)", "CRL.A.",
+    "CRL.M.C.", "CRL.REV.P.", "FAO", "LPA", "RFA", "W.P.(C)", "W.P.(CRL)", "MAT.APP.",
+]
+# Case types the demo accepts: the hard-coded sample cases' types plus the synthetic ones
+DEMO_CASE_TYPES = ["Civil Appeal", "Criminal Appeal", "Writ Petition (Civil)"] + SYNTHETIC_CASE_TYPES
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Amit", "Anjali", "Arjun", "Deepak", "Divya", "Gaurav", "Kavita",
+    "Manish", "Meera", "Neha", "Pooja", "Rahul", "Rajesh", "Ritu", "Rohan", "Sanjay",
+    "Shreya", "Sunil", "Tanvi", "Vikram", "Vivek", "Yash",
+]
+SURNAMES = [
+    "Agarwal", "Bansal", "Chauhan", "Das", "Gupta", "Iyer", "Jain", "Kapoor", "Khan",
+    "Malhotra", "Mehta", "Nair", "Reddy", "Saxena", "Sharma", "Singh", "Verma", "Yadav",
+]
+COMPANY_WORDS = [
+    "Apex", "Bharat", "Crescent", "Delta", "Everest", "Ganga", "Horizon", "Indus",
+    "Lotus", "Meridian", "Orion", "Pinnacle", "Sapphire", "Trident", "Zenith",
+]
+COMPANY_SUFFIXES = ["Pvt. Ltd.", "Limited", "Infra Ltd.", "Industries", "Enterprises", "LLP"]
+STATE_PARTIES = [
+    "State of NCT of Delhi", "Union of India", "Delhi Development Authority",
+    "Municipal Corporation of Delhi", "Central Bureau of Investigation",
+]
+CASE_STATUSES = [
+    "Pending", "Pending Arguments", "Under Arguments", "Notice Issued", "Admitted",
+    "Reserved for Judgment", "Disposed", "Dismissed", "Allowed", "Withdrawn",
+]
+CLOSED_STATUSES = {"Disposed", "Dismissed", "Allowed", "Withdrawn"}
+DOCUMENT_TITLES = ["Petition", "Order", "Interim Order", "Reply", "Rejoinder", "Judgment"]
+JUDGE_NAMES = ["A. K. Mehra", "B. Kohli", "C. Hari Shankar", "D. Bhatia", "J. Singh", "P. Nair"]
+
+
+class SyntheticCaseGenerator:
+    """Deterministic synthetic case universe derived from a seed.
+    
+    Case i of the universe is fully determined by (seed, i), so any case can
+    be generated on its own, in any order, and the same seed always yields
+    the same data.
+    """
+    
+    FIRST_YEAR = 1990
+    YEARS = 36
+    
+    def __init__(self, seed=42, case_count=1_000_000, pdf_base_url='https://example.com/documents'):
+        self.seed = seed
+        self.case_count = case_count
+        self.pdf_base_url = pdf_base_url.rstrip('/')
+        self._type_index = {case_type: i for i, case_type in enumerate(SYNTHETIC_CASE_TYPES)}
+    
+    def case_key(self, index):
+        """(case_type, case_number, filing_year) of the index-th case"""
+        type_index = index % len(SYNTHETIC_CASE_TYPES)
+        rest = index // len(SYNTHETIC_CASE_TYPES)
+        filing_year = self.FIRST_YEAR + rest % self.YEARS
+        case_number = str(rest // self.YEARS + 1)
+        return SYNTHETIC_CASE_TYPES[type_index], case_number, filing_year
+    
+    def case_index(self, case_type, case_number, filing_year):
+        """Inverse of case_key, or None if the case is outside the universe"""
+        type_index = self._type_index.get(case_type)
+        year_offset = int(filing_year) - self.FIRST_YEAR
+        if type_index is None or not 0 <= year_offset < self.YEARS or not str(case_number).isdigit():
+            return None
+        number = int(case_number)
+        if number < 1:
+            return None
+        index = ((number - 1) * self.YEARS + year_offset) * len(SYNTHETIC_CASE_TYPES) + type_index
+        return index if index < self.case_count else None
+    
+    def _party(self, rng):
+        kind = rng.random()
+        if kind < 0.5:
+            return f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}"
+        if kind < 0.8:
+            return f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)}"
+        return rng.choice(STATE_PARTIES)
+    
+    def generate(self, index):
+        """Full synthetic record (search metadata plus parsed details) for one case"""
+        case_type, case_number, filing_year = self.case_key(index)
+        rng = random.Random(self.seed * 1_000_003 + index)
+        
+        filing_date = datetime(filing_year, 1, 1) + timedelta(days=rng.randrange(365))
+        status = rng.choice(CASE_STATUSES)
+        if status in CLOSED_STATUSES:
+            next_hearing = "NA"
+        else:
+            next_hearing = (filing_date + timedelta(days=rng.randrange(30, 3000))).strftime("%d/%m/%Y")
+        
+        pdf_links = [
+            {
+                "title": title,
+                "url": f"{self.pdf_base_url}/{filing_year}/{index}-{position}.pdf"
+            }
+            for position, title in enumerate(rng.sample(DOCUMENT_TITLES, rng.randrange(0, 4)))
+        ]
+        
+        searched_at = filing_date + timedelta(days=rng.randrange(1, 400), seconds=rng.randrange(86400))
+        
+        return {
+            "case_type": case_type,
+            "case_number": case_number,
+            "filing_year": filing_year,
+            "searched_at": searched_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "search_duration": round(rng.lognormvariate(1.0, 0.4), 3),
+            "parties_names": f"{self._party(rng)} vs {self._party(rng)}",
+            "filing_date": filing_date.strftime("%d/%m/%Y"),
+            "next_hearing_date": next_hearing,
+            "case_status": status,
+            "pdf_links": pdf_links,
+            "additional_info": {
+                "court_number": f"Court No. {rng.randrange(1, 60)}",
+                "judge": f"Hon'ble Justice {rng.choice(JUDGE_NAMES)}",
+                "case_type_full": case_type,
+            },
+        }
+    
+    def lookup(self, case_type, case_number, filing_year):
+        index = self.case_index(case_type, case_number, filing_year)
+        return None if index is None else self.generate(index)
+    
+    def iter_cases(self, count=None, start=0):
+        """Generate cases start .. start+count in index order"""
+        stop = self.case_count if count is None else min(self.case_count, start + count)
+        for index in range(start, stop):
+            yield self.generate(index)
+    
+    def iter_cases_parallel(self, count, workers=None, chunk_size=10000):
+        """iter_cases(count) with generation spread over worker processes, order preserved"""
+        stop = min(self.case_count, count)
+        chunks = [
+            (self.seed, self.case_count, self.pdf_base_url, start, min(start + chunk_size, stop))
+            for start in range(0, stop, chunk_size)
+        ]
+        with multiprocessing.Pool(workers) as pool:
+            for batch in pool.imap(_generate_range, chunks):
+                yield from batch
+
+
+def _generate_range(chunk):
+    """Worker entry point for SyntheticCaseGenerator.iter_cases_parallel"""
+    seed, case_count, pdf_base_url, start, stop = chunk
+    generator = SyntheticCaseGenerator(seed, case_count, pdf_base_url)
+    return [generator.generate(index) for index in range(start, stop)]
+
+
 class DemoCourtScraper:
     """Demo scraper that simulates court data fetching for testing"""
     
-    def __init__(self):
+    def __init__(self, synthetic=None, seed=None, case_count=None, latency_median=None,
+                 latency_sigma=None, error_rate=None):
+        self.synthetic = Config.DEMO_SYNTHETIC if synthetic is None else synthetic
+        self.latency_median = Config.DEMO_LATENCY_MEDIAN if latency_median is None else latency_median
+        self.latency_sigma = Config.DEMO_LATENCY_SIGMA if latency_sigma is None else latency_sigma
+        self.error_rate = Config.DEMO_ERROR_RATE if error_rate is None else error_rate
+        seed = Config.DEMO_SEED if seed is None else seed
+        
+        self.generator = SyntheticCaseGenerator(
+            seed=seed,
+            case_count=Config.DEMO_CASE_COUNT if case_count is None else case_count,
+            pdf_base_url=Config.DEMO_PDF_BASE_URL,
+        )
+        # Latency and failure draws are reproducible per process too
+        self.rng = random.Random(seed)
+        
         self.demo_cases = {
             ("Civil Appeal", "123", 2024): {
                 "parties_names": "John Doe vs State of Delhi",
@@ -39,14 +210,31 @@ class DemoCourtScraper:
             }
         }
     
+    def simulated_delay(self):
+        """Seconds the simulated court takes to answer"""
+        if not self.synthetic:
+            return random.uniform(1, 3)
+        # Log-normal: most lookups near the median with a long slow tail
+        return self.rng.lognormvariate(0, self.latency_sigma) * self.latency_median
+    
+    def simulated_failure(self):
+        """Error result for the configured share of lookups, else None"""
+        if self.synthetic and self.rng.random() < self.error_rate:
+            return {"error": "Search failed: simulated upstream error"}
+        return None
+    
     def search_case(self, case_type, case_number, filing_year):
         """Simulate case search with realistic delays"""
         
-        print(f"🔍 [DEMO] Searching for: {case_type} {case_number}/{filing_year}")
+        logger.info("🔍 [DEMO] Searching for: %s %s/%s", case_type, case_number, filing_year)
         
         # Simulate network delay
-        time.sleep(random.uniform(1, 3))
+        time.sleep(self.simulated_delay())
         
+        return self.simulated_failure() or self.lookup_case(case_type, case_number, filing_year)
+    
+    def lookup_case(self, case_type, case_number, filing_year):
+        """Return the demo result for a case, without any simulated delay"""
         case_key = (case_type, case_number, int(filing_year))
         
         if case_key in self.demo_cases:
@@ -54,8 +242,60 @@ class DemoCourtScraper:
             result['search_duration'] = random.uniform(2, 5)
             result['raw_html'] = f"<html><body>Demo data for {case_type} {case_number}/{filing_year}</body></html>"
             
-            print("✅ [DEMO] Case found in demo database")
+            logger.info("✅ [DEMO] Case found in demo database")
             return result
-        else:
-            print("❌ [DEMO] Case not found in demo database")
-            return {"error": "No records found for the given case details"}
+        
+        if self.synthetic:
+            case = self.generator.lookup(case_type, case_number, filing_year)
+            if case:
+                result = {key: case[key] for key in (
+                    "parties_names", "filing_date", "next_hearing_date", "case_status",
+                    "pdf_links", "additional_info", "search_duration"
+                )}
+                result['raw_html'] = f"<html><body>Synthetic data for {case_type} {case_number}/{filing_year}</body></html>"
+                return result
+        
+        logger.info("❌ [DEMO] Case not found in demo database")
+        return {"error": "No records found for the given case details"}
+
+
+class AsyncDemoCourtScraper(DemoCourtScraper):
+    """asyncio version of the demo scraper; the simulated delay does not block"""
+    
+    async def search_case(self, case_type, case_number, filing_year):
+        """Simulate case search with realistic delays"""
+        
+        logger.info("🔍 [DEMO] Searching for: %s %s/%s", case_type, case_number, filing_year)
+        
+        # Simulate network delay
+        await asyncio.sleep(self.simulated_delay())
+        
+        return self.simulated_failure() or self.lookup_case(case_type, case_number, filing_year)
+
+
+if __name__ == "__main__":
+    from database import DatabaseManager
+    
+    parser = argparse.ArgumentParser(description="Generate synthetic court cases")
+    parser.add_argument("--bulk-load", type=int, metavar="COUNT",
+                        help="insert COUNT synthetic successful lookups into the database")
+    parser.add_argument("--seed", type=int, default=Config.DEMO_SEED)
+    parser.add_argument("--db", default=Config.DATABASE_PATH)
+    parser.add_argument("--batch-size", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="generator processes (default: one per CPU)")
+    args = parser.parse_args()
+    
+    # Same document links as the web app's demo engine, so /download_pdf serves them
+    generator = SyntheticCaseGenerator(seed=args.seed, case_count=max(args.bulk_load or 0, 1),
+                                       pdf_base_url=Config.DEMO_PDF_BASE_URL)
+    if not args.bulk_load:
+        for case in generator.iter_cases(3):
+            print(json.dumps(case, indent=2))
+    else:
+        db = DatabaseManager(args.db)
+        start = time.time()
+        cases = generator.iter_cases_parallel(args.bulk_load, workers=args.workers)
+        inserted = db.bulk_load_cases(cases, batch_size=args.batch_size)
+        elapsed = time.time() - start
+        print(f"✓ Loaded {inserted} synthetic cases in {elapsed:.1f}s ({inserted / elapsed:.0f} rows/s)")
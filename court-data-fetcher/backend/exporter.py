@@ -0,0 +1,203 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import sys
+import logging
+
+from database import DatabaseManager, EXPORT_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Export format -> MIME type
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Text output is handed on in chunks of about this many bytes
+CHUNK_SIZE = 64 * 1024
+
+# Rows per Parquet row group
+PARQUET_ROW_GROUP = 50000
+
+
+def available_formats():
+    """Formats usable in this environment (Parquet needs pyarrow)"""
+    return [name for name in EXPORT_FORMATS if name != 'parquet' or pa is not None]
+
+
+def iter_csv(rows):
+    """CSV text chunks with a header row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(rows):
+    """Newline-delimited JSON chunks, one object per row.
+    
+    pdf_links and additional_info are already stored as JSON text, so they
+    are spliced in as-is rather than decoded and re-encoded.
+    """
+    scalar_columns = EXPORT_COLUMNS[:-2]
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    chunk = []
+    size = 0
+    for row in rows:
+        line = (f'{encode(dict(zip(scalar_columns, row)))[:-1]}'
+                f', "pdf_links": {row[-2] or "[]"}, "additional_info": {row[-1] or "null"}}}\n')
+        chunk.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+    yield ''.join(chunk)
+
+
+class ChunkSink:
+    """Write-only binary file object that holds written bytes until they are drained"""
+    
+    closed = False
+    
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+    
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self._position
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def write_row_groups(rows, output):
+    """Write rows as Parquet to `output`, yielding the running row count after each row group.
+    
+    The last value is yielded once the footer has been written.
+    """
+    if pa is None:
+        raise RuntimeError("Parquet export requires pyarrow")
+    
+    schema = pa.schema([
+        ('query_id', pa.int64()), ('case_type', pa.string()), ('case_number', pa.string()),
+        ('filing_year', pa.int32()), ('searched_at', pa.string()), ('status', pa.string()),
+        ('error_message', pa.string()), ('search_duration', pa.float64()),
+        ('parties_names', pa.string()), ('filing_date', pa.string()),
+        ('next_hearing_date', pa.string()), ('case_status', pa.string()),
+        ('pdf_links', pa.string()), ('additional_info', pa.string()),
+    ])
+    total = 0
+    with pq.ParquetWriter(output, schema, compression='zstd') as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= PARQUET_ROW_GROUP:
+                writer.write_table(pa.Table.from_pylist(
+                    [dict(zip(EXPORT_COLUMNS, r)) for r in batch], schema=schema))
+                total += len(batch)
+                batch = []
+                yield total
+        if batch or not total:
+            writer.write_table(pa.Table.from_pylist(
+                [dict(zip(EXPORT_COLUMNS, r)) for r in batch], schema=schema))
+            total += len(batch)
+    yield total
+
+
+def write_parquet(rows, output):
+    """Write rows to a Parquet file path or binary file object, one row group at a time"""
+    total = 0
+    for total in write_row_groups(rows, output):
+        pass
+    return total
+
+
+def iter_parquet(rows):
+    """Parquet bytes, handed on as each row group is written.
+    
+    Only one row group (PARQUET_ROW_GROUP rows) is held in memory; the
+    footer, which indexes the row groups, comes in the last chunk.
+    """
+    sink = ChunkSink()
+    for _ in write_row_groups(rows, sink):
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def export(db_manager, fmt, output, start_date=None, end_date=None, statuses=None):
+    """Export matching rows to a binary file object in the given format"""
+    rows = db_manager.export_rows(start_date, end_date, statuses)
+    if fmt == 'parquet':
+        write_parquet(rows, output)
+        return
+    
+    chunks = iter_csv(rows) if fmt == 'csv' else iter_ndjson(rows)
+    for chunk in chunks:
+        output.write(chunk.encode('utf-8'))
+    output.flush()
+
+
+if __name__ == "__main__":
+    from config import Config
+    
+    parser = argparse.ArgumentParser(description="Export query history and case details")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default='csv')
+    parser.add_argument("--from", dest="start_date", help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end_date", help="last day (YYYY-MM-DD)")
+    parser.add_argument("--status", help="comma-separated query statuses, e.g. success,failed")
+    parser.add_argument("--db", default=Config.DATABASE_PATH)
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args()
+    
+    from validation import validate_export_filters
+    filters, error = validate_export_filters(args.start_date, args.end_date, args.status)
+    if error:
+        parser.error(error)
+    if args.format not in available_formats():
+        parser.error("Parquet export requires pyarrow")
+    if args.format == 'parquet' and not args.output:
+        parser.error("Parquet export needs --output")
+    
+    # Keep stdout clean for the export itself
+    with contextlib.redirect_stdout(sys.stderr):
+        db = DatabaseManager(args.db)
+    if args.output:
+        with open(args.output, 'wb') as output:
+            export(db, args.format, output, *filters)
+    else:
+        export(db, args.format, sys.stdout.buffer, *filters)
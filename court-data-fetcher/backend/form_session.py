@@ -0,0 +1,30 @@
+import time
+
+
+class FormSession:
+    """Search-form page kept alive in one browser tab between searches.
+
+    Tracks when the page (and with it the CSRF _token and session cookie)
+    was last loaded, so consecutive searches can reset the form in place
+    instead of downloading the page again.
+    """
+
+    def __init__(self, court_name, token_ttl):
+        self.court_name = court_name
+        self.token_ttl = token_ttl
+        self.loaded_at = None
+        self.reuses = 0
+
+    def is_warm(self):
+        """True while the loaded page's token is still expected to be valid"""
+        return self.loaded_at is not None and time.time() - self.loaded_at < self.token_ttl
+
+    def mark_loaded(self):
+        self.loaded_at = time.time()
+        self.reuses = 0
+
+    def mark_reused(self):
+        self.reuses += 1
+
+    def expire(self):
+        self.loaded_at = None
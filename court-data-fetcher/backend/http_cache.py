@@ -0,0 +1,77 @@
+import gzip
+import hashlib
+import json
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 256
+
+
+def parse_sqlite_timestamp(value):
+    """SQLite CURRENT_TIMESTAMP text (UTC) to an aware datetime"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def choose_encoding(body):
+    """Best content coding the client accepts for this body, or None"""
+    if len(body) < MIN_COMPRESS_SIZE:
+        return None
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+@lru_cache(maxsize=512)
+def compress(body, encoding):
+    """Compressed body, memoized so repeat views of the same result cost nothing"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def cached_json_response(payload, last_modified=None, max_age=60):
+    """JSON response with a strong ETag, Last-Modified, Cache-Control and compression.
+    
+    Conditional requests (If-None-Match / If-Modified-Since) that still match
+    are answered with an empty 304.
+    """
+    body = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    encoding = choose_encoding(body)
+    
+    # Strong validators identify one exact representation, so include the coding
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    if encoding:
+        etag = f"{etag}-{encoding}"
+    
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    response.vary.add('Accept-Encoding')
+    
+    response.make_conditional(request)
+    if response.status_code == 304:
+        return response
+    
+    if encoding:
+        response.set_data(compress(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+    return response
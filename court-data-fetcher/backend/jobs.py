@@ -0,0 +1,240 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    query_id INTEGER REFERENCES queries(id),
+    case_type VARCHAR(100) NOT NULL,
+    case_number VARCHAR(100) NOT NULL,
+    filing_year INTEGER NOT NULL,
+    request_id TEXT,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    worker TEXT,
+    lease_expires_at REAL,
+    result TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(status, available_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs(status, lease_expires_at);
+"""
+
+# queued -> running -> done, or back to queued (retry) until dead (dead letter)
+JOB_STATUSES = ('queued', 'running', 'done', 'dead')
+
+
+class JobQueue:
+    """Durable scrape queue in a SQLite table, shared by the web tier and workers.
+
+    A worker claims a job by taking a lease on it and keeps the lease alive
+    with heartbeats while it scrapes. A job whose lease runs out (the worker
+    crashed or hung) is handed to the next worker that asks; failed attempts
+    are retried with exponential backoff until max_attempts, after which the
+    job is parked as 'dead' for an operator to look at or requeue.
+
+    Any process on the same host can enqueue or work, so workers scale out
+    independently of the web processes. They cannot move to other hosts:
+    SQLite's WAL mode needs shared memory and breaks on network filesystems.
+    """
+
+    def __init__(self, db_path, lease=120, max_attempts=4, retry_base=5):
+        self.db_path = os.path.normpath(db_path)
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self._local = threading.local()
+        self.connection().executescript(SCHEMA)
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        # A connection inherited across fork() must not be reused by the child
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT, so claims from different processes never interleave"""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def enqueue(self, case_type, case_number, filing_year, query_id=None, request_id=None):
+        """Add a search job; returns its id"""
+        now = time.time()
+        with self.transaction() as conn:
+            cursor = conn.execute("""
+                INSERT INTO jobs (query_id, case_type, case_number, filing_year, request_id,
+                                  max_attempts, available_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (query_id, case_type, case_number, filing_year, request_id,
+                  self.max_attempts, now, now, now))
+            return cursor.lastrowid
+
+    def claim(self, worker):
+        """Lease the next runnable job to `worker`; returns it as a dict, or None.
+
+        Jobs whose lease has expired count as runnable. One that has already
+        used up its attempts is dead-lettered instead of being run again.
+        """
+        with self.transaction() as conn:
+            now = time.time()
+            # Their lookups fail too, as when a worker dead-letters a job itself
+            conn.execute("""
+                UPDATE queries SET status = 'failed',
+                       error_message = COALESCE(error_message, 'Search abandoned after repeated worker failures')
+                WHERE id IN (
+                    SELECT query_id FROM jobs
+                    WHERE status = 'running' AND lease_expires_at <= ? AND attempts >= max_attempts
+                )
+            """, (now,))
+            conn.execute("""
+                UPDATE jobs SET status = 'dead', worker = NULL, updated_at = ?,
+                       last_error = COALESCE(last_error, 'Lease expired')
+                WHERE status = 'running' AND lease_expires_at <= ? AND attempts >= max_attempts
+            """, (now, now))
+
+            row = conn.execute("""
+                SELECT * FROM jobs
+                WHERE (status = 'queued' AND available_at <= ?)
+                   OR (status = 'running' AND lease_expires_at <= ?)
+                ORDER BY available_at, id
+                LIMIT 1
+            """, (now, now)).fetchone()
+            if row is None:
+                return None
+
+            if row['status'] == 'running':
+                logger.warning("♻ Job %s: lease of %s expired, reassigning", row['id'], row['worker'])
+            conn.execute("""
+                UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1,
+                       lease_expires_at = ?, updated_at = ?
+                WHERE id = ?
+            """, (worker, now + self.lease, now, row['id']))
+            job = dict(row)
+            job.update(status='running', worker=worker, attempts=row['attempts'] + 1)
+            return job
+
+    def heartbeat(self, job_id, worker):
+        """Extend the lease; False means the job was reassigned and must be abandoned"""
+        now = time.time()
+        with self.transaction() as conn:
+            cursor = conn.execute("""
+                UPDATE jobs SET lease_expires_at = ?, updated_at = ?
+                WHERE id = ? AND worker = ? AND status = 'running'
+            """, (now + self.lease, now, job_id, worker))
+            return cursor.rowcount == 1
+
+    def complete(self, job_id, worker, result):
+        """Store the job's result; False if this worker no longer holds the lease"""
+        with self.transaction() as conn:
+            cursor = conn.execute("""
+                UPDATE jobs SET status = 'done', result = ?, lease_expires_at = NULL, updated_at = ?
+                WHERE id = ? AND worker = ? AND status = 'running'
+            """, (json.dumps(result), time.time(), job_id, worker))
+            return cursor.rowcount == 1
+
+    def fail(self, job_id, worker, error, retry=True):
+        """Record a failed attempt: back off and requeue, or dead-letter the job.
+
+        Returns the job's new status, or None if this worker lost the lease.
+        """
+        with self.transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker = ? AND status = 'running'",
+                (job_id, worker)
+            ).fetchone()
+            if row is None:
+                return None
+
+            now = time.time()
+            if retry and row['attempts'] < row['max_attempts']:
+                status = 'queued'
+                available_at = now + self.retry_base * 2 ** (row['attempts'] - 1)
+            else:
+                status = 'dead'
+                available_at = now
+            conn.execute("""
+                UPDATE jobs SET status = ?, available_at = ?, last_error = ?, worker = NULL,
+                       lease_expires_at = NULL, updated_at = ?
+                WHERE id = ?
+            """, (status, available_at, str(error), now, job_id))
+            return status
+
+    def get(self, job_id):
+        row = self.connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def requeue_dead(self, job_id=None):
+        """Give dead-lettered jobs (one, or all) a fresh set of attempts; returns how many.
+
+        Their lookups go back to 'pending' with them, so the UI stops showing them as failed.
+        """
+        condition = "status = 'dead'" + (" AND id = ?" if job_id is not None else "")
+        params = (job_id,) if job_id is not None else ()
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(f"""
+                UPDATE queries SET status = 'pending', error_message = NULL
+                WHERE id IN (SELECT query_id FROM jobs WHERE {condition})
+            """, params)
+            cursor = conn.execute(f"""
+                UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, updated_at = ?
+                WHERE {condition}
+            """, (now, now, *params))
+            return cursor.rowcount
+
+    def prune(self, older_than_days):
+        """Delete finished jobs older than the given age; dead letters are kept"""
+        cutoff = time.time() - older_than_days * 86400
+        with self.transaction() as conn:
+            return conn.execute("DELETE FROM jobs WHERE status = 'done' AND updated_at < ?",
+                                (cutoff,)).rowcount
+
+    def stats(self):
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        for status, count in self.connection().execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            counts[status] = count
+        return counts
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue(db_path=None):
+    """Process-wide JobQueue on the main database, configured from Config"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(db_path or Config.DATABASE_PATH, lease=Config.JOB_LEASE_SECONDS,
+                              max_attempts=Config.JOB_MAX_ATTEMPTS, retry_base=Config.JOB_RETRY_BASE_SECONDS)
+        return _queue
@@ -0,0 +1,193 @@
+import hmac
+import random
+import sys
+import threading
+import time
+import zlib
+import logging
+from collections import Counter
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS query_profiles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    query_id INTEGER REFERENCES queries(id),
+    request_id TEXT,
+    method VARCHAR(10),
+    path TEXT,
+    status_code INTEGER,
+    duration REAL,
+    samples INTEGER NOT NULL,
+    interval REAL NOT NULL,
+    folded BLOB NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_query_profiles_query ON query_profiles(query_id);
+"""
+
+# Deeper stacks are cut at the leaf end; request stacks rarely get near this
+MAX_STACK_DEPTH = 200
+
+
+def frame_name(frame):
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def should_profile(header_value, token, sample_rate):
+    """Profile this request? Asked for with the admin token in X-Profile, or picked by sampling"""
+    if header_value and token and hmac.compare_digest(header_value, token):
+        return True
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+class SamplingProfiler:
+    """Statistical profiler for one thread, e.g. the thread serving a request.
+
+    A background thread reads the target thread's current stack every
+    `interval` seconds through sys._current_frames(), so the profiled code
+    runs unmodified; nothing is installed when no profiler is running.
+    """
+
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.duration = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        names = []
+        while frame is not None and len(names) < MAX_STACK_DEPTH:
+            names.append(frame_name(frame))
+            frame = frame.f_back
+        self.stacks[';'.join(reversed(names))] += 1
+        self.samples += 1
+
+    def start(self):
+        self.started_at = time.perf_counter()
+
+        def loop():
+            while not self._stop.wait(self.interval):
+                self.sample()
+
+        self._thread = threading.Thread(target=loop, name='profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def folded(self):
+        """Stacks in the folded format of flamegraph.pl / speedscope: 'a;b;c count' per line"""
+        return '\n'.join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Profiles saved next to the query they were taken for, folded stacks zlib-compressed"""
+
+    def __init__(self, db_manager, keep=1000):
+        self.db_manager = db_manager
+        self.keep = keep
+        with db_manager.get_connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def save(self, profiler, query_id=None, request_id=None, method=None, path=None, status_code=None):
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.execute("""
+                INSERT INTO query_profiles (query_id, request_id, method, path, status_code,
+                                            duration, samples, interval, folded)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (query_id, request_id, method, path, status_code, profiler.duration,
+                  profiler.samples, profiler.interval, zlib.compress(profiler.folded().encode())))
+            # Only the most recent `keep` profiles are kept
+            conn.execute("DELETE FROM query_profiles WHERE id <= ?", (cursor.lastrowid - self.keep,))
+            conn.commit()
+            return cursor.lastrowid
+
+    def recent(self, limit=50, query_id=None):
+        condition = "WHERE query_id = ?" if query_id is not None else ""
+        params = (query_id, limit) if query_id is not None else (limit,)
+        with self.db_manager.get_connection() as conn:
+            return [dict(row) for row in conn.execute(f"""
+                SELECT id, query_id, request_id, method, path, status_code, duration, samples,
+                       interval, created_at
+                FROM query_profiles {condition}
+                ORDER BY id DESC LIMIT ?
+            """, params)]
+
+    def get(self, profile_id):
+        with self.db_manager.get_connection() as conn:
+            row = conn.execute("SELECT * FROM query_profiles WHERE id = ?", (profile_id,)).fetchone()
+        if row is None:
+            return None
+        profile = dict(row)
+        profile['folded'] = zlib.decompress(profile['folded']).decode()
+        return profile
+
+
+def render_flamegraph(folded, title='', width=1200, row_height=16):
+    """SVG flame graph (root at the bottom) of folded stacks; hover a frame for its share"""
+    root = {'count': 0, 'children': {}}
+    for line in folded.splitlines():
+        stack, _, count = line.rpartition(' ')
+        if not stack:
+            continue
+        count = int(count)
+        node = root
+        node['count'] += count
+        for name in stack.split(';'):
+            node = node['children'].setdefault(name, {'count': 0, 'children': {}})
+            node['count'] += count
+
+    total = root['count'] or 1
+
+    def depth(node):
+        return 1 + max((depth(child) for child in node['children'].values()), default=0)
+
+    header = 30
+    height = header + depth(root) * row_height + 10
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="Verdana, sans-serif" font-size="11">',
+        '<rect width="100%" height="100%" fill="#f8f8f8"/>',
+        f'<text x="{width / 2}" y="20" text-anchor="middle" font-size="15">{escape(title)}</text>',
+    ]
+
+    def draw(name, node, x, level):
+        frame_width = node['count'] / total * width
+        if frame_width < 0.5:
+            return
+        y = height - 10 - (level + 1) * row_height
+        # Warm colours, stable per function so the same frame looks the same across graphs
+        hue = zlib.crc32(name.encode()) % 55
+        label = f"{name} ({node['count']} samples, {node['count'] / total:.1%})"
+        parts.append(
+            f'<g><title>{escape(label)}</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{frame_width:.1f}" height="{row_height - 1}" '
+            f'fill="hsl({hue}, 80%, 60%)" rx="2"/>'
+        )
+        if frame_width > 35:
+            chars = int(frame_width / 7)
+            text = name if len(name) <= chars else name[:chars - 2] + '..'
+            parts.append(f'<text x="{x + 3:.1f}" y="{y + row_height - 4}">{escape(text)}</text>')
+        parts.append('</g>')
+        for child_name, child in sorted(node['children'].items()):
+            draw(child_name, child, x, level + 1)
+            x += child['count'] / total * width
+
+    draw('all', root, 0.0, 0)
+    parts.append('</svg>')
+    return '\n'.join(parts)
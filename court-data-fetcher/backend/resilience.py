@@ -0,0 +1,197 @@
+import random
+import contextvars
+import threading
+import time
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when an upstream is failing and calls are being short-circuited"""
+
+
+class LatencyTracker:
+    """Rolling latency samples for one stage, used to size its timeout"""
+
+    def __init__(self, default_timeout, min_timeout=2.0, max_timeout=60.0,
+                 multiplier=2.0, window=200, min_samples=20):
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, fraction):
+        """Latency at the given fraction (0.95 = p95), or None without enough samples"""
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def timeout(self):
+        """p99 with headroom, clamped; the default until enough samples exist"""
+        p99 = self.percentile(0.99)
+        if p99 is None:
+            return self.default_timeout
+        return max(self.min_timeout, min(self.max_timeout, p99 * self.multiplier))
+
+
+class CircuitBreaker:
+    """Stops calling an unhealthy upstream, probing again after a cool-down.
+
+    Callers that were allowed through must report back with record_success,
+    record_failure or release; a probe that never reports is written off
+    after another reset_timeout so the breaker cannot stay half-open.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go upstream now (one probe is let through when half-open)"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.probe_started_at = now
+                logger.info("Circuit %s half-open, probing upstream", self.name)
+                return True
+            if self.state == self.HALF_OPEN and now - self.probe_started_at >= self.reset_timeout:
+                # The last probe never reported back; send another
+                self.probe_started_at = now
+                logger.info("Circuit %s probe timed out, probing upstream again", self.name)
+                return True
+            return False
+
+    def release(self):
+        """Give back a call that ended without telling anything about the upstream.
+
+        A half-open probe that was rejected locally (e.g. no free slot) goes
+        back to open with its cool-down spent, so the next call probes again.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic() - self.reset_timeout
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("✓ Circuit %s closed", self.name)
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("⚠ Circuit %s open after %s failures", self.name, self.failures)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class UpstreamHealth:
+    """Per-stage latency trackers plus a circuit breaker for one court website"""
+
+    def __init__(self, name, stage_defaults, failure_threshold=5, reset_timeout=60,
+                 min_timeout=2.0, max_timeout=60.0):
+        self.name = name
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.stages = {
+            stage: LatencyTracker(default, min_timeout=min_timeout, max_timeout=max_timeout)
+            for stage, default in stage_defaults.items()
+        }
+
+    def stage_timeout(self, stage):
+        return self.stages[stage].timeout()
+
+    def hedge_delay(self, stage):
+        """When to send a hedged duplicate: the stage's p95, or half its timeout"""
+        p95 = self.stages[stage].percentile(0.95)
+        return p95 if p95 is not None else self.stages[stage].timeout() / 2
+
+    @contextmanager
+    def measure(self, stage):
+        """Record how long a stage took, including failed and timed-out attempts.
+
+        Slow failures have to count, or the timeout could only ever shrink
+        and would cut off a court that has merely become slower.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.stages[stage].record(time.monotonic() - start)
+
+
+def retry_with_backoff(call, attempts=3, base_delay=0.5, max_delay=8.0,
+                       should_retry=None, should_retry_error=None):
+    """Run `call` up to `attempts` times with jittered exponential backoff.
+
+    Exceptions are retried unless `should_retry_error` rejects them; when
+    `should_retry` is given, returned values it flags are retried too. The
+    last result (or exception) is passed through.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            result = call()
+        except Exception as e:
+            if attempt == attempts or (should_retry_error and not should_retry_error(e)):
+                raise
+            logger.warning("Attempt %s/%s failed: %s", attempt, attempts, e)
+        else:
+            if should_retry is None or not should_retry(result) or attempt == attempts:
+                return result
+            logger.warning("Attempt %s/%s returned a retryable result", attempt, attempts)
+
+        delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+        time.sleep(random.uniform(delay / 2, delay))
+
+
+_hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='hedge')
+
+
+def hedged_call(call, hedge_after):
+    """Run an idempotent `call`, firing a duplicate if it is slower than `hedge_after`.
+
+    The first attempt to succeed wins; the loser is left to finish in the background.
+    """
+    # Each attempt runs in a copy of the caller's context, so its logs keep the request ID
+    futures = [_hedge_executor.submit(contextvars.copy_context().run, call)]
+    done, _ = wait(futures, timeout=hedge_after)
+    if not done:
+        logger.info("Hedging slow call after %.2fs", hedge_after)
+        futures.append(_hedge_executor.submit(contextvars.copy_context().run, call))
+
+    pending = set(futures)
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
@@ -0,0 +1,229 @@
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Old rows that retention may remove. The latest successful lookup of every
+# case is never selected; failures and superseded successes age out. A case's
+# single details row points at the lookup that last changed it, so that lookup
+# is never selected either: the row moves on only to a newer lookup.
+# case_versions is never purged: it keeps the full history compactly.
+EXPIRED_QUERIES_SQL = """
+    SELECT q.id FROM queries q
+    WHERE q.id > ?
+      AND (
+        (q.status != 'success' AND q.timestamp < ?)
+        OR (q.status = 'success' AND q.timestamp < ? AND EXISTS (
+            SELECT 1 FROM queries newer
+            WHERE newer.case_type = q.case_type
+              AND newer.case_number = q.case_number
+              AND newer.filing_year = q.filing_year
+              AND newer.status = 'success'
+              AND newer.id > q.id
+              AND (NOT EXISTS (SELECT 1 FROM case_details WHERE query_id = q.id)
+                   OR EXISTS (SELECT 1 FROM case_details WHERE query_id = newer.id))
+        ))
+      )
+    ORDER BY q.id
+    LIMIT ?
+"""
+
+
+class RetentionManager:
+    """Archives and deletes expired query history, then compacts the database.
+
+    Expired rows are appended to gzip NDJSON files partitioned by query date
+    (archive_dir/YYYY/MM/queries-YYYY-MM-DD.ndjson.gz) before being deleted in
+    small transactions, so writers are only ever blocked for one batch.
+    Every web process starts one, but a claim in the shared store lets only
+    one of them run at a time.
+    """
+
+    def __init__(self, db_manager, failed_days=30, superseded_days=90,
+                 archive_dir='database/archive', batch_size=500, vacuum_pages=200, lease=3600):
+        self.db_manager = db_manager
+        self.failed_days = failed_days
+        self.superseded_days = superseded_days
+        self.archive_dir = archive_dir
+        self.batch_size = batch_size
+        self.vacuum_pages = vacuum_pages
+        self.lease = lease
+        self._stop = threading.Event()
+        self._thread = None
+
+    def cutoffs(self, now=None):
+        """Timestamps (SQLite text, UTC) before which failures / superseded successes expire"""
+        now = now or datetime.now(timezone.utc)
+        fmt = "%Y-%m-%d %H:%M:%S"
+        return ((now - timedelta(days=self.failed_days)).strftime(fmt),
+                (now - timedelta(days=self.superseded_days)).strftime(fmt))
+
+    def archive_path(self, day):
+        year, month, _ = day.split('-')
+        return os.path.join(self.archive_dir, year, month, f"queries-{day}.ndjson.gz")
+
+    def archive(self, rows):
+        """Append rows to their day's archive file, one gzip member per write"""
+        by_day = defaultdict(list)
+        for row in rows:
+            by_day[(row['timestamp'] or '1970-01-01')[:10]].append(row)
+
+        for day, day_rows in by_day.items():
+            path = self.archive_path(day)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(path, 'at', encoding='utf-8') as f:
+                for row in day_rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+    def purge_batch(self, conn, after_id, failed_cutoff, superseded_cutoff):
+        """Archive and delete one batch of expired queries; returns their ids"""
+        # Select under the write lock, so no other process archives the same rows
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            return self._purge_batch(conn, after_id, failed_cutoff, superseded_cutoff)
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def _purge_batch(self, conn, after_id, failed_cutoff, superseded_cutoff):
+        ids = [row[0] for row in conn.execute(
+            EXPIRED_QUERIES_SQL, (after_id, failed_cutoff, superseded_cutoff, self.batch_size)
+        )]
+        if not ids:
+            conn.rollback()
+            return ids
+
+        placeholders = ', '.join('?' * len(ids))
+        queries = [dict(row) for row in conn.execute(
+            f"SELECT * FROM queries WHERE id IN ({placeholders})", ids)]
+        details = defaultdict(list)
+        for row in conn.execute(
+                f"SELECT * FROM case_details WHERE query_id IN ({placeholders})", ids):
+            details[row['query_id']].append(dict(row))
+        for query in queries:
+            query['case_details'] = details.get(query['id'], [])
+
+        # Archive first: a crash before the delete only repeats rows in the archive
+        self.archive(queries)
+        conn.execute(f"DELETE FROM case_details WHERE query_id IN ({placeholders})", ids)
+        conn.execute(f"DELETE FROM queries WHERE id IN ({placeholders})", ids)
+        conn.commit()
+        return ids
+
+    def purge(self):
+        """Archive and delete every expired query, one small transaction at a time"""
+        failed_cutoff, superseded_cutoff = self.cutoffs()
+        total = 0
+        last_id = 0
+        with self.db_manager.get_connection() as conn:
+            while not self._stop.is_set():
+                ids = self.purge_batch(conn, last_id, failed_cutoff, superseded_cutoff)
+                if not ids:
+                    break
+                total += len(ids)
+                last_id = ids[-1]
+                # Let waiting writers in between batches
+                time.sleep(0.01)
+        return total
+
+    def compact(self):
+        """Return free pages to the filesystem a few at a time (needs auto_vacuum=INCREMENTAL)"""
+        released = 0
+        with self.db_manager.get_connection() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                logger.warning("⚠ auto_vacuum is not INCREMENTAL; run 'python retention.py --convert' once")
+                return 0
+
+            while not self._stop.is_set():
+                free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if not free_pages:
+                    break
+                step = min(free_pages, self.vacuum_pages)
+                conn.execute(f"PRAGMA incremental_vacuum({step})").fetchall()
+                released += step
+                time.sleep(0.01)
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        return released
+
+    def run_once(self):
+        from shared_state import get_shared_store
+        store = get_shared_store()
+        owner = store.claim('retention', lease=self.lease) if store is not None else True
+        if owner is None:
+            logger.info("Retention already running in another process, skipping")
+            return 0, 0
+
+        start = time.time()
+        try:
+            purged = self.purge()
+            released = self.compact()
+        finally:
+            if store is not None:
+                store.unclaim('retention', owner)
+        logger.info("✓ Retention: archived %s queries, released %s pages in %.1fs",
+                    purged, released, time.time() - start)
+        return purged, released
+
+    def start(self, interval):
+        """Run retention every `interval` seconds in a daemon thread"""
+        if self._thread is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.run_once()
+                except Exception as e:
+                    logger.error("Retention run failed: %s", e)
+
+        self._thread = threading.Thread(target=loop, name='retention', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def convert_to_incremental_vacuum(db_manager):
+    """One-off switch of an existing database to auto_vacuum=INCREMENTAL (full VACUUM)"""
+    with db_manager.get_connection() as conn:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+if __name__ == "__main__":
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Archive expired query history and compact the database")
+    parser.add_argument("--db", default=Config.DATABASE_PATH)
+    parser.add_argument("--convert", action="store_true",
+                        help="switch an existing database to incremental vacuum (blocks while it runs)")
+    parser.add_argument("--backfill-versions", action="store_true",
+                        help="build case version history from existing case_details (before first use)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    db = DatabaseManager(args.db)
+    if args.convert:
+        print("✓ Converted" if convert_to_incremental_vacuum(db) else "❌ Conversion failed")
+    if args.backfill_versions:
+        print(f"✓ Recorded {db.backfill_case_versions()} case versions")
+
+    manager = RetentionManager(
+        db,
+        failed_days=Config.RETENTION_FAILED_DAYS,
+        superseded_days=Config.RETENTION_SUPERSEDED_DAYS,
+        archive_dir=Config.RETENTION_ARCHIVE_DIR,
+        batch_size=Config.RETENTION_BATCH_SIZE,
+    )
+    purged, released = manager.run_once()
+    print(f"✓ Archived {purged} queries, released {released} pages")
@@ -1,34 +1,42 @@
-import requests
 from bs4 import BeautifulSoup
-import re
-from selenium import webdriver
+import sys
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import Select, WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.webdriver.support.ui import WebDriverWait
 import time
 import logging
+import threading
+import weakref
+from contextlib import contextmanager, nullcontext
 from urllib.parse import urljoin, urlparse
 import json
 import pytesseract
 import os
-from PIL import Image, ImageEnhance, ImageFilter
+from PIL import Image, ImageEnhance
+from courts import get_court_adapter, is_transient_error, CourtBusyError
+from resilience import retry_with_backoff
+from catalog import get_catalog
+from case_parser import get_parser
+from browser_scripts import (FORM_STATE_SCRIPT, FILL_AND_SUBMIT_SCRIPT, RESET_FORM_SCRIPT,
+                             RESULTS_STATE_SCRIPT)
+from form_session import FormSession
+from captcha_solver import get_captcha_solver
+from browser_pool import create_chrome_driver, get_browser_pool, BrowserPoolBusyError
+from config import Config
 
 # Configure Tesseract path for Windows
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
-# Test configuration
-try:
-    print(f"✓ Tesseract version: {pytesseract.get_tesseract_version()}")
-except Exception as e:
-    print(f"❌ Tesseract configuration error: {e}")
-
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def is_transient_browser_error(error):
+    """Timeouts and network failures in the browser are worth retrying; page and parser bugs are not"""
+    if isinstance(error, TimeoutException):
+        return True
+    return isinstance(error, WebDriverException) and 'net::ERR_' in (error.msg or '')
+
+
 class CourtScraper:
     def __init__(self, target_court="delhi_high_court", demo_mode=False):
         self.demo_mode = demo_mode
@@ -40,50 +48,74 @@ class CourtScraper:
             return
         
         self.target_court = target_court
+        self.browser_pool = None
+        self._driver = None
+        self._local = threading.local()
+        self._form_sessions = weakref.WeakKeyDictionary()
         self.setup_court_config()
-        self.setup_selenium()
-        self.session = requests.Session()
+        if self.court.fetch_strategy == 'browser':
+            self.setup_selenium()
+        self.session = self.court.get_session()
         
     def setup_court_config(self):
-        """Configure court-specific settings with EXACT discovered structure"""
-        if self.target_court == "delhi_high_court":
-            self.base_url = "https://delhihighcourt.nic.in"
-            # Use the EXACT working URL we discovered
-            self.case_search_url = "https://delhihighcourt.nic.in/app/case-number"
-            
-            # Use the EXACT form selectors from inspection
-            self.form_selectors = {
-                'form_id': 'search1',
-                'case_type': 'select[name="case_type"]',
-                'case_number': 'input[name="case_number"]',
-                'year': 'select[name="year"]',
-                'captcha_input': 'input[name="captchaInput"]',
-                'captcha_image': 'img[src*="captcha"]',
-                'submit': 'button[id="search"]',
-                '_token': 'input[name="_token"]',
-                'randomid': 'input[name="randomid"]'
-            }
-        else:
-            raise ValueError(f"Unsupported court: {self.target_court}")
+        """Load court-specific settings from the court adapter registry"""
+        self.court = get_court_adapter(self.target_court)
+        self.catalog = get_catalog(self.target_court, ttl=Config.CATALOG_TTL)
+        if not self.catalog.is_fresh():
+            # A copy saved by the app's catalog refresher spares the live option scan
+            self.catalog.load_file(Config.CATALOG_PATH)
+        self.base_url = self.court.base_url
+        self.case_search_url = self.court.case_search_url
+        self.form_selectors = self.court.form_selectors
     
     def setup_selenium(self):
         """Setup Selenium WebDriver with optimal configurations"""
-        chrome_options = Options()
-        
-        # Essential options for stability
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+        if Config.BROWSER_MODE == 'multiplexed':
+            # Searches borrow isolated tabs from a few shared Chrome processes
+            self.browser_pool = get_browser_pool(Config.BROWSER_PROCESSES, Config.TABS_PER_BROWSER,
+                                                 Config.BROWSER_PROFILE)
+            logger.info("✓ Using shared browser pool (%s processes x %s tabs, %s profile)",
+                        Config.BROWSER_PROCESSES, Config.TABS_PER_BROWSER, Config.BROWSER_PROFILE)
+            return
         
-        # Optional: Run in headless mode (comment out for debugging)
-        # chrome_options.add_argument("--headless")
+        self._driver = create_chrome_driver(profile=Config.BROWSER_PROFILE)
+        self._driver_lock = threading.Lock()
+        logger.info("✓ Chrome WebDriver initialized successfully (%s profile)", Config.BROWSER_PROFILE)
+    
+    @property
+    def driver(self):
+        """WebDriver for the current search: a pooled tab, or the dedicated browser"""
+        return getattr(self._local, 'driver', None) or self._driver
+    
+    def stage_wait(self, stage):
+        """WebDriverWait whose timeout follows the stage's observed latency"""
+        timeout = self.court.health.stage_timeout(stage)
+        if self.browser_pool is None:
+            return WebDriverWait(self.driver, timeout)
+        # Pooled tabs do not block on page loads, so polls may land mid-navigation
+        return WebDriverWait(self.driver, timeout, poll_frequency=0.25,
+                             ignored_exceptions=(WebDriverException,))
+    
+    @contextmanager
+    def browser_session(self):
+        """Bind a browser to the calling thread for the duration of one search"""
+        if self.browser_pool is None:
+            # A dedicated browser can only run one search at a time
+            with self._driver_lock:
+                yield
+            return
         
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 15)
-        logger.info("✓ Chrome WebDriver initialized successfully")
+        with self.browser_pool.tab() as tab:
+            self._local.driver = tab.driver
+            try:
+                yield
+            finally:
+                self._local.driver = None
+    
+    def driver_focus(self):
+        """Keep a pooled tab focused across several element commands"""
+        focus = getattr(self.driver, 'focus', None)
+        return focus() if focus else nullcontext()
     
     def search_case(self, case_type, case_number, filing_year):
         """Main method to search for case details"""
@@ -91,140 +123,316 @@ class CourtScraper:
         if self.demo_mode:
             return self.demo_scraper.search_case(case_type, case_number, filing_year)
         
-        start_time = time.time()
+        health = self.court.health
+        if not health.breaker.allow():
+            # Fail fast; callers may serve cached data instead
+            logger.warning("Circuit open for %s, skipping upstream", self.court.display_name)
+            return {"error": f"{self.court.display_name} is temporarily unavailable",
+                    "upstream_unavailable": True}
+        
+        if self.court.fetch_strategy == 'http':
+            search = lambda: self.search_case_http(case_type, case_number, filing_year)
+        else:
+            search = lambda: self.search_case_in_browser_session(case_type, case_number, filing_year)
         
+        def attempt():
+            # Every attempt is a full search with its own captcha, so each takes a slot
+            with self.court.slot():
+                return search()
+        
+        result = None
         try:
-            logger.info(f"Searching case: {case_type} {case_number}/{filing_year}")
-            
-            # Navigate to the EXACT working URL
-            self.driver.get(self.case_search_url)
-            time.sleep(3)
-            
-            # Wait for form to load
-            form = self.wait.until(
-                EC.presence_of_element_located((By.ID, self.form_selectors['form_id']))
+            result = retry_with_backoff(
+                attempt,
+                attempts=Config.UPSTREAM_RETRIES + 1,
+                should_retry=lambda result: result.get('transient'),
+                should_retry_error=lambda e: False
             )
-            logger.info("✓ Form loaded successfully")
-            
-            # Fill form fields using EXACT selectors
-            success = self.fill_search_form_exact(case_type, case_number, filing_year)
-            if not success:
-                return {"error": "Failed to fill search form"}
-            
-            # Handle CAPTCHA
-            captcha_solved = self.handle_captcha_exact()
-            if not captcha_solved:
-                return {"error": "CAPTCHA solving failed or required manual intervention"}
-            
-            # Submit form and wait for results
-            submit_success = self.submit_form_and_wait_exact()
-            if not submit_success:
-                return {"error": "Form submission failed or results not loaded"}
+        except (CourtBusyError, BrowserPoolBusyError) as e:
+            logger.warning("Search rejected: %s", e)
+            return {"error": f"{str(e)}. Please try again shortly."}
+        finally:
+            if result is None:
+                # Rejected or crashed before the court answered: no verdict on its health
+                health.breaker.release()
+        
+        if result.pop('transient', False):
+            health.breaker.record_failure()
+        else:
+            health.breaker.record_success()
+        return result
+    
+    def search_case_in_browser_session(self, case_type, case_number, filing_year):
+        with self.browser_session():
+            return self.search_case_browser(case_type, case_number, filing_year)
+    
+    def search_case_browser(self, case_type, case_number, filing_year):
+        """Search using the Selenium browser session"""
+        start_time = time.time()
+        
+        try:
+            logger.info("Searching case: %s %s/%s", case_type, case_number, filing_year)
+            
+            outcome = self.submit_search(case_type, case_number, filing_year)
+            if outcome.get('state') == 'expired':
+                # A warm page's token ran out; one retry on a freshly loaded page
+                logger.info("Search session expired, retrying with a fresh page load")
+                self.form_session().expire()
+                outcome = self.submit_search(case_type, case_number, filing_year)
+            
+            if "error" in outcome:
+                return outcome
+            if outcome['state'] == 'timeout':
+                return {"error": "Form submission failed or results not loaded", "transient": True}
+            if outcome['state'] == 'alert':
+                return {"error": f"Court website rejected the search: {outcome['message']}"}
+            if outcome['state'] == 'no_records':
+                return {"error": "No records found for the given case details"}
+            if outcome['state'] == 'expired':
+                return {"error": "Court website session expired. Please try again."}
             
             # Parse results
-            result = self.parse_case_details()
+            result = get_parser(self.court.parser)(self.driver.page_source, self.base_url)
             result['search_duration'] = time.time() - start_time
             
             return result
             
         except Exception as e:
-            logger.error(f"Search failed: {str(e)}")
-            return {"error": f"Search failed: {str(e)}"}
+            logger.error("Search failed: %s", e)
+            # The tab may be mid-navigation; start the next attempt from a fresh page
+            self.form_session().expire()
+            return {"error": f"Search failed: {str(e)}", "transient": is_transient_browser_error(e)}
     
-    def fill_search_form_exact(self, case_type, case_number, filing_year):
-        """Fill form using exact discovered selectors"""
-        try:
-            # Select case type using exact selector
-            case_type_select = Select(self.wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, self.form_selectors['case_type']))
-            ))
-            
-            # Get available options for case type
-            options = [option.text for option in case_type_select.options if option.text != 'Select']
-            logger.info(f"Available case types: {options[:5]}...")
-            
-            # Try to match the case type
-            matched = False
-            for option in case_type_select.options:
-                if option.text != 'Select' and case_type.lower() in option.text.lower():
-                    case_type_select.select_by_visible_text(option.text)
-                    logger.info(f"✓ Selected case type: {option.text}")
-                    matched = True
-                    break
-            
-            if not matched:
-                # Default to first available option
-                case_type_select.select_by_index(1)
-                logger.warning(f"Case type '{case_type}' not found, using default")
-            
-            # Enter case number using exact selector
-            case_number_input = self.wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, self.form_selectors['case_number']))
+    def submit_search(self, case_type, case_number, filing_year):
+        """Run one form submission, returning the results outcome or an error dict"""
+        form_state = self.prepare_search_form()
+        
+        # Map user input to exact option values from the cached catalog
+        if not self.catalog.is_fresh():
+            self.catalog.load_from_driver(self.driver, self.form_selectors)
+        options = self.resolve_search_options(case_type, filing_year)
+        if "error" in options:
+            return options
+        
+        # Handle CAPTCHA
+        captcha_code = self.handle_captcha_exact(form_state)
+        if captcha_code is None:
+            return {"error": "CAPTCHA solving failed or required manual intervention"}
+        
+        # Fill, validate and submit the form in a single round trip
+        submission = self.fill_and_submit_form(
+            options['case_type'], case_number, options['year'], captcha_code
+        )
+        if not submission.get('submitted'):
+            return {"error": f"Failed to fill search form: {'; '.join(submission.get('errors', []))}"}
+        
+        # Wait for results
+        outcome = self.wait_for_results()
+        if outcome is None:
+            return {"state": "timeout"}
+        return outcome
+    
+    def form_session(self):
+        """Warm-form bookkeeping for the browser serving this search"""
+        driver = self.driver
+        session = self._form_sessions.get(driver)
+        if session is None:
+            session = FormSession(self.target_court, self.court.session_ttl)
+            self._form_sessions[driver] = session
+        return session
+    
+    def prepare_search_form(self):
+        """Get a blank search form: reset the warm page in place, or load it fresh"""
+        session = self.form_session()
+        
+        if session.is_warm():
+            form_state = self.driver.execute_async_script(
+                RESET_FORM_SCRIPT, self.form_selectors, self.case_search_url,
+                self.court.captcha_refresh_url
             )
-            case_number_input.clear()
-            case_number_input.send_keys(case_number)
-            logger.info(f"✓ Entered case number: {case_number}")
+            if form_state and form_state.get('form_ready'):
+                session.mark_reused()
+                logger.info("♻ Reusing warm search form (reuse #%s)", session.reuses)
+                return form_state
+            logger.info("Warm search form unusable (%s), reloading", form_state and form_state.get('reason'))
+        
+        health = self.court.health
+        with health.measure('page_load'):
+            # Navigate to the EXACT working URL
+            self.driver.set_page_load_timeout(health.stage_timeout('page_load'))
+            self.driver.get(self.case_search_url)
+            
+            # Wait for form to load; one script call reports form and captcha state
+            form_state = self.stage_wait('page_load').until(self.read_form_state)
+        session.mark_loaded()
+        logger.info("✓ Form loaded successfully")
+        return form_state
+    
+    def search_case_http(self, case_type, case_number, filing_year):
+        """Search with plain HTTP requests for courts that need no browser"""
+        start_time = time.time()
+        
+        try:
+            logger.info("Searching case over HTTP: %s %s/%s", case_type, case_number, filing_year)
+            
+            health = self.court.health
+            timeout = health.stage_timeout('http_search')
+            with health.measure('http_search'):
+                response = self.session.get(self.case_search_url, timeout=timeout)
+            response.raise_for_status()
+            soup = BeautifulSoup(response.text, 'html.parser')
+            
+            form = soup.find('form', id=self.form_selectors['form_id'])
+            if not form:
+                return {"error": "Search form not found"}
+            
+            if not self.catalog.is_fresh():
+                self.catalog.load_from_html(response.text, self.form_selectors)
+            options = self.resolve_search_options(case_type, filing_year)
+            if "error" in options:
+                return options
+            
+            # Carry over hidden fields such as _token and randomid
+            form_data = {
+                field['name']: field.get('value', '')
+                for field in form.find_all('input', type='hidden') if field.get('name')
+            }
             
-            # Select year using exact selector
-            year_select = Select(self.wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, self.form_selectors['year']))
-            ))
+            field_values = {
+                'case_type': options['case_type'],
+                'case_number': case_number,
+                'year': options['year'],
+            }
             
-            year_options = [option.text for option in year_select.options if option.text != 'Select']
-            logger.info(f"Available years: {year_options}")
+            # Text captchas can be read straight from the page
+            captcha_code = soup.select_one(self.form_selectors.get('captcha_code', '#captcha-code'))
+            if captcha_code:
+                field_values['captcha_input'] = captcha_code.get_text(strip=True)
             
-            if str(filing_year) in year_options:
-                year_select.select_by_visible_text(str(filing_year))
-                logger.info(f"✓ Selected year: {filing_year}")
-            else:
-                logger.warning(f"Year {filing_year} not available, using 2024")
-                year_select.select_by_visible_text('2024')
+            for key, value in field_values.items():
+                field = soup.select_one(self.form_selectors[key])
+                if field is None or not field.get('name'):
+                    return {"error": f"Form field '{key}' not found"}
+                form_data[field['name']] = value
             
-            return True
+            action = urljoin(self.case_search_url, form.get('action') or self.case_search_url)
+            with health.measure('http_search'):
+                response = self.session.post(action, data=form_data, timeout=timeout)
+            response.raise_for_status()
+            
+            result = get_parser(self.court.parser)(response.text, self.base_url)
+            result['search_duration'] = time.time() - start_time
+            
+            return result
             
         except Exception as e:
-            logger.error(f"Form filling failed: {str(e)}")
-            return False
+            logger.error("HTTP search failed: %s", e)
+            return {"error": f"Search failed: {str(e)}", "transient": is_transient_error(e)}
+    
+    def resolve_search_options(self, case_type, filing_year):
+        """Look up the exact case-type and year option values for a search"""
+        case_type_value = self.catalog.match_case_type(case_type)
+        if case_type_value is None:
+            logger.warning("Case type '%s' not found in catalog", case_type)
+            return {"error": f"Unknown case type '{case_type}' for {self.court.display_name}"}
+        
+        year_value = self.catalog.match_year(filing_year)
+        if year_value is None:
+            logger.warning("Year %s not available in catalog", filing_year)
+            return {"error": f"Filing year {filing_year} is not available for {self.court.display_name}"}
+        
+        logger.info("✓ Matched case type '%s' -> %s", case_type, self.catalog.label_for(case_type_value))
+        return {"case_type": case_type_value, "year": year_value}
+    
+    def read_form_state(self, driver=None):
+        """Form readiness and captcha details, or False while the form is loading"""
+        state = (driver or self.driver).execute_script(FORM_STATE_SCRIPT, self.form_selectors)
+        return state if state and state['form_ready'] else False
+    
+    def fill_and_submit_form(self, case_type_value, case_number, year_value, captcha_code):
+        """Fill, validate and submit the search form with one execute_script call"""
+        submission = self.driver.execute_script(FILL_AND_SUBMIT_SCRIPT, self.form_selectors, {
+            'case_type': case_type_value,
+            'case_number': case_number,
+            'year': year_value,
+            'captcha': captcha_code,
+        })
+        
+        if submission.get('submitted'):
+            logger.info("✓ Submitted form: %s %s/%s", case_type_value, case_number, year_value)
+        else:
+            logger.error("Form filling failed: %s", submission.get('errors'))
+        return submission
+    
+    def handle_captcha_exact(self, form_state):
+        """Work out the CAPTCHA answer.
         
-    def handle_captcha_exact(self):
-        """Handle CAPTCHA with automatic numeric solving"""
+        Returns the code to enter, '' when nothing needs entering, or None on failure.
+        """
         try:
-            captcha_input = self.driver.find_elements(By.CSS_SELECTOR, self.form_selectors.get('captcha_input', 'input[name="captchaInput"]'))
-            
-            if not captcha_input:
+            if not form_state['captcha_input']:
                 logger.info("No CAPTCHA input field found")
-                return True
+                return ''
             
             logger.info("CAPTCHA field detected")
             
-            # Check if CAPTCHA image exists
-            captcha_images = self.driver.find_elements(By.CSS_SELECTOR, 'img[src*="captcha"]')
+            # Text captchas are shown as plain page text
+            if form_state.get('captcha_code'):
+                logger.info("✓ CAPTCHA code read from page")
+                return form_state['captcha_code']
             
-            if captcha_images:
+            if form_state['captcha_image']:
                 logger.info("CAPTCHA image found - attempting automatic numeric solving")
                 
                 # Try automatic solving first
-                if self.solve_numeric_captcha(captcha_images[0], captcha_input[0]):
+                with self.driver_focus():
+                    captcha_image = self.driver.find_element(By.CSS_SELECTOR, self.form_selectors['captcha_image'])
+                    captcha_code = self.solve_numeric_captcha(captcha_image)
+                if captcha_code:
                     logger.info("✓ CAPTCHA solved automatically!")
-                    time.sleep(1)  # Wait for solution to register
-                    return True
-                else:
-                    # Fall back to manual if automatic fails
-                    logger.warning("⚠ Automatic solving failed, requiring manual intervention")
-                    return self.manual_captcha_solving()
-            else:
-                logger.info("CAPTCHA input found but no image - may not be required")
-                return True
+                    return captcha_code
+                
+                if not self.can_solve_manually():
+                    logger.warning("⚠ Automatic solving failed and no visible browser or terminal for manual entry")
+                    return None
+                
+                # Fall back to manual if automatic fails
+                logger.warning("⚠ Automatic solving failed, requiring manual intervention")
+                return '' if self.manual_captcha_solving() else None
+            
+            logger.info("CAPTCHA input found but no image - may not be required")
+            return ''
                 
         except Exception as e:
-            logger.error(f"CAPTCHA handling failed: {str(e)}")
-            return False
+            logger.error("CAPTCHA handling failed: %s", e)
+            return None
 
-    def solve_numeric_captcha(self, captcha_image, captcha_input):
-        """Automatically solve numeric CAPTCHA using enhanced OCR"""
+    def solve_captcha_with_templates(self, captcha_image):
+        """Digit templates: sub-millisecond, in-process, no Tesseract binary. None to fall back"""
+        try:
+            solver = get_captcha_solver(Config.CAPTCHA_TEMPLATES)
+            if solver is None:
+                return None
+            captcha_numbers = solver.solve(captcha_image.screenshot_as_png)
+        except Exception as e:
+            logger.warning("⚠ Template solver failed (%s), trying Tesseract", e)
+            return None
+        if captcha_numbers:
+            logger.info("✓ CAPTCHA solution (templates): %s", captcha_numbers)
+            return captcha_numbers
+        logger.warning("⚠ Template solver could not read the CAPTCHA, trying Tesseract")
+        return None
+    
+    def solve_numeric_captcha(self, captcha_image):
+        """Automatically solve numeric CAPTCHA using enhanced OCR, returning the digits"""
         try:
             logger.info("Starting automatic CAPTCHA solving...")
             
+            if Config.CAPTCHA_SOLVER == 'template':
+                captcha_numbers = self.solve_captcha_with_templates(captcha_image)
+                if captcha_numbers:
+                    return captcha_numbers
+            
             # Take screenshot of CAPTCHA
             captcha_image.screenshot("captcha_temp.png")
             
@@ -243,9 +451,6 @@ class CourtScraper:
             enhancer = ImageEnhance.Sharpness(image)
             image = enhancer.enhance(2.0)
             
-            # Apply slight blur to smooth noise
-            image = image.filter(ImageFilter.MedianFilter(size=1))
-            
             # Save processed image for debugging
             image.save("captcha_processed.png")
             logger.info("✓ Image preprocessing completed")
@@ -261,29 +466,24 @@ class CourtScraper:
             import re
             captcha_numbers = re.sub(r'[^0-9]', '', captcha_text)
             
-            logger.info(f"OCR extracted: '{captcha_text}' -> cleaned: '{captcha_numbers}'")
+            logger.info("OCR extracted: '%s' -> cleaned: '%s'", captcha_text, captcha_numbers)
             
             # Validate that we got reasonable numbers (adjust length as needed)
             if captcha_numbers and len(captcha_numbers) >= 3 and len(captcha_numbers) <= 8:
-                # Enter the solution
-                captcha_input.clear()
-                time.sleep(0.3)
-                captcha_input.send_keys(captcha_numbers)
-                time.sleep(0.5)
-                
-                logger.info(f"✓ Entered CAPTCHA solution: {captcha_numbers}")
-                return True
+                logger.info("✓ CAPTCHA solution: %s", captcha_numbers)
+                return captcha_numbers
             else:
-                logger.warning(f"❌ Invalid CAPTCHA result: '{captcha_numbers}' (length: {len(captcha_numbers) if captcha_numbers else 0})")
-                return False
+                logger.warning("❌ Invalid CAPTCHA result: '%s' (length: %s)",
+                               captcha_numbers, len(captcha_numbers) if captcha_numbers else 0)
+                return None
                 
         except ImportError as e:
-            logger.error(f"❌ Missing dependencies: {e}")
+            logger.error("❌ Missing dependencies: %s", e)
             logger.error("Install with: pip install pytesseract pillow")
-            return False
+            return None
         except Exception as e:
-            logger.error(f"❌ Numeric CAPTCHA solving failed: {str(e)}")
-            return False
+            logger.error("❌ Numeric CAPTCHA solving failed: %s", e)
+            return None
         finally:
             # Clean up temporary files
             try:
@@ -294,6 +494,10 @@ class CourtScraper:
             except:
                 pass
 
+    def can_solve_manually(self):
+        """Only a visible browser with someone at the terminal can take a manual CAPTCHA"""
+        return Config.BROWSER_PROFILE != 'lean' and sys.stdin is not None and sys.stdin.isatty()
+    
     def manual_captcha_solving(self):
         """Fallback to manual CAPTCHA solving"""
         try:
@@ -314,218 +518,29 @@ class CourtScraper:
             return True
             
         except Exception as e:
-            logger.error(f"Manual CAPTCHA fallback failed: {str(e)}")
+            logger.error("Manual CAPTCHA fallback failed: %s", e)
             return False
 
     
-    def submit_form_and_wait_exact(self):
-        """Submit form using exact selector"""
+    def wait_for_results(self):
+        """Poll the page with one script call per check until the submission has an outcome"""
         try:
-            # Find submit button using exact selector
-            submit_button = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, self.form_selectors['submit']))
-            )
-            
-            logger.info("✓ Submit button found, clicking...")
-            submit_button.click()
-            
-            # Wait for page to change or results to load
-            self.wait.until(
-                EC.any_of(
-                    EC.presence_of_element_located((By.TAG_NAME, "table")),
-                    EC.presence_of_element_located((By.CLASS_NAME, "result")),
-                    EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'result')]")),
-                    EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'No record')]"))
+            with self.court.health.measure('results'):
+                outcome = self.stage_wait('results').until(
+                    lambda driver: driver.execute_script(RESULTS_STATE_SCRIPT)
                 )
-            )
-            
-            time.sleep(3)  # Additional wait for content to load
-            logger.info("✓ Results page loaded")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Form submission failed: {str(e)}")
-            return False
-    
-    def parse_case_details(self):
-        """Enhanced parsing for Delhi High Court structure"""
-        try:
-            page_source = self.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            # Save HTML for analysis
-            with open('delhi_court_response.html', 'w', encoding='utf-8') as f:
-                f.write(page_source)
-            
-            # Check for SweetAlert popup (common in court websites)
-            sweetalert = soup.find('div', class_='swal2-popup')
-            if sweetalert:
-                alert_text = sweetalert.get_text(strip=True)
-                if 'no record' in alert_text.lower() or 'not found' in alert_text.lower():
-                    return {"error": "No records found for the given case details"}
-            
-            # Enhanced extraction strategies...
-            case_details = {
-                "parties_names": self.extract_parties_names(soup),
-                "filing_date": self.extract_filing_date(soup),
-                "next_hearing_date": self.extract_next_hearing_date(soup),
-                "case_status": self.extract_case_status(soup),
-                "pdf_links": self.extract_pdf_links(soup),
-                "additional_info": self.extract_additional_info(soup)
-            }
-
-    
-
-            return case_details
+            logger.info("✓ Submission outcome: %s", outcome['state'])
+            return outcome
             
         except Exception as e:
-            logger.error(f"Enhanced parsing failed: {str(e)}")
-            return {"error": f"Parsing failed: {str(e)}"}
-
-    
-    def check_no_results(self, soup):
-        """Check if no results were found"""
-        no_result_indicators = [
-            "no record found", "no records found", "no data found",
-            "record not found", "case not found", "not available",
-            "no results", "invalid case"
-        ]
-        
-        page_text = soup.get_text().lower()
-        return any(indicator in page_text for indicator in no_result_indicators)
-    
-    def extract_parties_names(self, soup):
-        """Extract parties' names"""
-        strategies = [
-            lambda: self.extract_by_label(soup, ["parties", "petitioner", "appellant", "vs", "respondent"]),
-            lambda: self.extract_from_table_header(soup, "parties"),
-            lambda: self.extract_by_pattern(soup, r"([A-Z][a-zA-Z\s]+)\s+(?:vs?\.?|v\.?)\s+([A-Z][a-zA-Z\s]+)")
-        ]
-        
-        for strategy in strategies:
-            try:
-                result = strategy()
-                if result and result != "Not found" and len(result) > 5:
-                    return result
-            except:
-                continue
-        
-        return "Not found"
-    
-    def extract_filing_date(self, soup):
-        """Extract filing date"""
-        return self.extract_by_label(soup, ["filing date", "date of filing", "registered on", "filed on"])
-    
-    def extract_next_hearing_date(self, soup):
-        """Extract next hearing date"""
-        return self.extract_by_label(soup, ["next hearing", "next date", "hearing date", "next listing"])
-    
-    def extract_case_status(self, soup):
-        """Extract case status"""
-        return self.extract_by_label(soup, ["status", "case status", "stage", "current status"])
-    
-    def extract_by_label(self, soup, labels):
-        """Generic extraction by label text"""
-        for label in labels:
-            # Try table-based extraction
-            label_cell = soup.find("td", string=re.compile(label, re.I))
-            if label_cell:
-                next_cell = label_cell.find_next_sibling("td")
-                if next_cell:
-                    text = next_cell.get_text(strip=True)
-                    if text and len(text) > 1:
-                        return text
-            
-            # Try other HTML structures
-            for tag in ["span", "div", "p", "strong"]:
-                element = soup.find(tag, string=re.compile(label, re.I))
-                if element:
-                    next_element = element.find_next_sibling()
-                    if next_element:
-                        text = next_element.get_text(strip=True)
-                        if text and len(text) > 1:
-                            return text
-        
-        return "Not found"
-    
-    def extract_from_table_header(self, soup, header_text):
-        """Extract data from table with specific header"""
-        try:
-            header = soup.find("th", string=re.compile(header_text, re.I))
-            if header:
-                headers = header.parent.find_all("th")
-                col_index = headers.index(header)
-                
-                table = header.find_parent("table")
-                data_rows = table.find_all("tr")[1:]
-                if data_rows:
-                    data_cells = data_rows[0].find_all("td")
-                    if len(data_cells) > col_index:
-                        return data_cells[col_index].get_text(strip=True)
-        except:
-            pass
-        
-        return "Not found"
-    
-    def extract_by_pattern(self, soup, pattern):
-        """Extract using regex pattern"""
-        try:
-            text = soup.get_text()
-            match = re.search(pattern, text)
-            if match:
-                return match.group(0)
-        except:
-            pass
-        
-        return "Not found"
-    
-    def extract_pdf_links(self, soup):
-        """Extract PDF download links"""
-        pdf_links = []
-        try:
-            # Find all PDF links
-            pdf_anchors = soup.find_all("a", href=re.compile(r"\.pdf", re.I))
-            
-            for anchor in pdf_anchors:
-                pdf_url = anchor.get("href")
-                if pdf_url:
-                    if not pdf_url.startswith("http"):
-                        pdf_url = urljoin(self.base_url, pdf_url)
-                    
-                    pdf_links.append({
-                        "title": anchor.get_text(strip=True) or "Court Document",
-                        "url": pdf_url
-                    })
-            
-        except Exception as e:
-            logger.error(f"PDF extraction failed: {str(e)}")
-        
-        return pdf_links
-    
-    def extract_additional_info(self, soup):
-        """Extract additional case information"""
-        additional_info = {}
-        try:
-            tables = soup.find_all("table")
-            for table in tables:
-                rows = table.find_all("tr")
-                for row in rows:
-                    cells = row.find_all(["td", "th"])
-                    if len(cells) >= 2:
-                        key = cells[0].get_text(strip=True)
-                        value = cells[1].get_text(strip=True)
-                        if key and value and len(key) < 50 and len(value) > 1:
-                            additional_info[key.lower().replace(" ", "_")] = value
-        except:
-            pass
-        
-        return additional_info
+            logger.error("Form submission failed: %s", e)
+            return None
     
     def __del__(self):
         """Cleanup WebDriver"""
         try:
-            if hasattr(self, 'driver'):
-                self.driver.quit()
+            if getattr(self, '_driver', None):
+                self._driver.quit()
                 logger.info("✓ WebDriver cleaned up")
         except:
             pass
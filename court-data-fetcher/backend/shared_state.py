@@ -0,0 +1,273 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+
+from config import Config
+from courts import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS result_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS inflight (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS slots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_slots_name ON slots(name);
+"""
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        pass
+    return True
+
+
+class SharedStore:
+    """Coordination state shared by every worker process on this host.
+
+    A small SQLite database in WAL mode: each thread keeps its own connection
+    and every read-modify-write runs in a BEGIN IMMEDIATE transaction, so
+    updates from different processes are serialized without a separate service.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.normpath(path)
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._local = threading.local()
+        self.connection().executescript(SCHEMA)
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        # A connection inherited across fork() must not be reused by the child
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def transaction(self):
+        return _Transaction(self.connection())
+
+    # Result cache
+
+    def cache_get(self, key):
+        row = self.connection().execute(
+            "SELECT value FROM result_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def cache_set(self, key, value, ttl):
+        with self.transaction() as conn:
+            now = time.time()
+            conn.execute("INSERT OR REPLACE INTO result_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                         (key, json.dumps(value), now + ttl))
+            # Drop a few expired entries on every write so the table stays small
+            conn.execute("""
+                DELETE FROM result_cache WHERE key IN (
+                    SELECT key FROM result_cache WHERE expires_at <= ? LIMIT 20
+                )
+            """, (now,))
+
+    # In-flight deduplication
+
+    def claim(self, key, lease):
+        """Become the one process computing `key`; returns an owner token or None"""
+        owner = uuid.uuid4().hex
+        with self.transaction() as conn:
+            now = time.time()
+            conn.execute("DELETE FROM inflight WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = conn.execute("INSERT OR IGNORE INTO inflight (key, owner, expires_at) VALUES (?, ?, ?)",
+                                  (key, owner, now + lease))
+            return owner if cursor.rowcount else None
+
+    def unclaim(self, key, owner):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM inflight WHERE key = ? AND owner = ?", (key, owner))
+
+    def is_claimed(self, key):
+        return self.connection().execute(
+            "SELECT 1 FROM inflight WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone() is not None
+
+    def single_flight(self, key, compute, ttl, lease=300, wait_timeout=120, cacheable=None):
+        """Return the cached value for `key`, computing it in at most one process.
+
+        Other callers asking for the same key meanwhile poll until the owner
+        publishes the result (or gives up) instead of repeating the work.
+        Values `cacheable` rejects are returned to the owner only.
+        """
+        deadline = time.monotonic() + wait_timeout
+        while True:
+            value = self.cache_get(key)
+            if value is not None:
+                return value
+
+            owner = self.claim(key, lease)
+            if owner is not None:
+                try:
+                    value = compute()
+                    if cacheable is None or cacheable(value):
+                        self.cache_set(key, value, ttl)
+                    return value
+                finally:
+                    self.unclaim(key, owner)
+
+            if time.monotonic() >= deadline:
+                logger.warning("Gave up waiting for in-flight %s, computing it here", key)
+                return compute()
+            while self.is_claimed(key) and time.monotonic() < deadline:
+                time.sleep(0.1)
+
+    # Token buckets
+
+    def take_token(self, name, rate, capacity):
+        """Take one token from a shared bucket; 0.0 on success, else seconds to wait"""
+        with self.transaction() as conn:
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE name = ?",
+                               (name,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            conn.execute("INSERT OR REPLACE INTO rate_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                         (name, tokens, now))
+            return wait
+
+    # Counting semaphores
+
+    def take_slot(self, name, limit, lease=None):
+        """Hold one of `limit` slots for this process; returns the slot's id, or None if none was free.
+        
+        Without a lease the slot is held until released or the process dies.
+        """
+        with self.transaction() as conn:
+            now = time.time()
+            conn.execute("DELETE FROM slots WHERE name = ? AND expires_at <= ?", (name, now))
+            held = conn.execute("SELECT COUNT(*) FROM slots WHERE name = ?", (name,)).fetchone()[0]
+            if held >= limit:
+                # Slots held by crashed workers are reclaimed before giving up
+                dead = [pid for (pid,) in conn.execute(
+                    "SELECT DISTINCT pid FROM slots WHERE name = ? AND pid != ?", (name, os.getpid())
+                ) if not _pid_alive(pid)]
+                for pid in dead:
+                    conn.execute("DELETE FROM slots WHERE name = ? AND pid = ?", (name, pid))
+                if not dead:
+                    return None
+                held = conn.execute("SELECT COUNT(*) FROM slots WHERE name = ?", (name,)).fetchone()[0]
+                if held >= limit:
+                    return None
+            cursor = conn.execute("INSERT INTO slots (name, pid, expires_at) VALUES (?, ?, ?)",
+                                  (name, os.getpid(), now + lease if lease else float('inf')))
+            return cursor.lastrowid
+
+    def give_slot(self, slot_id):
+        """Release the slot take_slot() returned; other threads' slots stay held"""
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM slots WHERE id = ?", (slot_id,))
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error) around a connection"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+class SharedRateLimiter(RateLimiter):
+    """RateLimiter whose bucket is shared by every worker process"""
+
+    def __init__(self, store, name, requests_per_minute, burst=None):
+        super().__init__(requests_per_minute, burst)
+        self.store = store
+        self.name = name
+
+    def try_acquire(self):
+        return self.store.take_token(self.name, self.rate, self.capacity)
+
+
+class SharedSemaphore:
+    """Counting semaphore across processes.
+
+    acquire() returns a slot handle (falsy when none was free) that must be
+    passed back to release(), so concurrent holders in one process each
+    free their own slot. A slot held by a crashed worker frees up when its
+    lease (if any) runs out or its process is found to be gone.
+    """
+
+    def __init__(self, store, name, limit, lease=600, poll_interval=0.05):
+        self.store = store
+        self.name = name
+        self.limit = limit
+        self.lease = lease
+        self.poll_interval = poll_interval
+
+    def acquire(self, blocking=True, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            slot = self.store.take_slot(self.name, self.limit, self.lease)
+            if slot is not None:
+                return slot
+            if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                return False
+            time.sleep(self.poll_interval)
+
+    def release(self, slot):
+        self.store.give_slot(slot)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_shared_store(path=None):
+    """Host-wide shared store, or None when SHARED_STATE_PATH is unset"""
+    global _store
+    path = path or Config.SHARED_STATE_PATH
+    if not path:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = SharedStore(path)
+        return _store
@@ -0,0 +1,74 @@
+import re
+import time
+from datetime import datetime
+
+
+def validate_search_input(case_type, case_number, filing_year):
+    """Validate and normalize search form input.
+    
+    Returns ((case_type, case_number, filing_year), None) on success,
+    or (None, error_message) when the input is rejected.
+    """
+    case_type = (case_type or '').strip()
+    case_number = (case_number or '').strip()
+    filing_year = str(filing_year or '').strip()
+    
+    # Input validation
+    if not all([case_type, case_number, filing_year]):
+        return None, "All fields are required"
+    
+    try:
+        filing_year = int(filing_year)
+        current_year = time.gmtime().tm_year
+        if filing_year < 1950 or filing_year > current_year:
+            return None, "Invalid filing year"
+    except ValueError:
+        return None, "Filing year must be a number"
+    
+    # Sanitize case number
+    if not re.match(r'^[0-9A-Za-z/-]+$', case_number):
+        return None, "Invalid case number format"
+    
+    return (case_type, case_number, filing_year), None
+
+
+def validate_case_type(case_type, catalog):
+    """Check a case type against the court's catalog of case types.
+    
+    Returns (label, None) with the court's own label for the type, or
+    (None, error_message) when the court does not list it. Until the
+    catalog is loaded every case type is passed through unchanged.
+    """
+    if not catalog.case_types:
+        return case_type, None
+    
+    case_type_value = catalog.match_case_type(case_type)
+    if case_type_value is None:
+        return None, f"Unknown case type: {case_type}"
+    return catalog.label_for(case_type_value), None
+
+
+def validate_export_filters(start_date, end_date, status):
+    """Validate /export filters.
+    
+    Returns ((start_date, end_date, statuses), None) with dates as
+    'YYYY-MM-DD' strings or None, or (None, error_message).
+    """
+    dates = []
+    for label, value in (("from", start_date), ("to", end_date)):
+        value = (value or '').strip()
+        if value:
+            try:
+                value = datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+            except ValueError:
+                return None, f"Invalid '{label}' date, expected YYYY-MM-DD"
+        dates.append(value or None)
+    
+    if dates[0] and dates[1] and dates[0] > dates[1]:
+        return None, "'from' date is after 'to' date"
+    
+    statuses = [part.strip() for part in (status or '').split(',') if part.strip()]
+    if any(not re.match(r'^[a-z_]+$', part) for part in statuses):
+        return None, "Invalid status filter"
+    
+    return (dates[0], dates[1], statuses or None), None
@@ -0,0 +1,210 @@
+"""Standalone scrape worker: claims search jobs from the queue and runs CourtScraper.
+
+Run as many as the court's rate budget allows:  python worker.py --concurrency 4
+Workers must run on the same host as the web app: the queue is a SQLite
+database in WAL mode, which needs shared memory and is unsafe on network
+filesystems. The web tier only enqueues jobs when SCRAPE_MODE=queue.
+"""
+import argparse
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+import logging
+
+from config import Config
+from database import DatabaseManager
+from jobs import get_job_queue
+from logging_setup import setup_logging, request_id_var
+from scraper import CourtScraper
+
+logger = logging.getLogger(__name__)
+
+
+class TransientJobError(Exception):
+    """The attempt failed for reasons worth retrying (court down, crash mid-scrape)"""
+
+
+class LeaseLostError(Exception):
+    """The job was handed to another worker; this attempt's result must not be saved"""
+
+
+def run_search(db_manager, scraper, job, holds_lease=None):
+    """Scrape one job's case and record it like an inline search; returns the job result.
+
+    Lookups the court answers with an error (e.g. case not found) are final;
+    an unavailable court raises TransientJobError so the job is retried.
+    `holds_lease` is checked before anything is written, so a worker whose
+    lease ran out cannot overwrite what the job's new owner has saved.
+    """
+    query_id = job['query_id']
+    result = scraper.search_case(job['case_type'], job['case_number'], job['filing_year'])
+
+    if result.get("upstream_unavailable"):
+        raise TransientJobError(result["error"])
+
+    if holds_lease is not None and not holds_lease():
+        raise LeaseLostError(f"Job {job['id']} was reassigned before its result was saved")
+
+    if "error" in result:
+        if query_id:
+            db_manager.update_query_status(query_id, 'failed', error_message=result["error"])
+        return {"error": result["error"]}
+
+    if query_id:
+        db_manager.save_case_details(
+            query_id,
+            result.get("parties_names"),
+            result.get("filing_date"),
+            result.get("next_hearing_date"),
+            result.get("case_status"),
+            result.get("pdf_links", []),
+            result.get("additional_info", {})
+        )
+        db_manager.update_query_status(query_id, 'success')
+
+    return {
+        "parties_names": result.get("parties_names"),
+        "filing_date": result.get("filing_date"),
+        "next_hearing_date": result.get("next_hearing_date"),
+        "case_status": result.get("case_status"),
+        "pdf_links": result.get("pdf_links", []),
+        "search_duration": result.get("search_duration", 0)
+    }
+
+
+class Worker:
+    """Runs `concurrency` claim loops over one scraper, heartbeating each job's lease"""
+
+    def __init__(self, queue, db_manager, scraper, concurrency=1, poll_interval=1.0, prune_days=7):
+        self.queue = queue
+        self.db_manager = db_manager
+        self.scraper = scraper
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.prune_days = prune_days
+        self.name = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.processed = 0
+        self._processed_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._last_prune = 0
+
+    def process(self, job):
+        """Run one claimed job to completion, retry or dead letter"""
+        token = request_id_var.set(job['request_id'] or f"job-{job['id']}")
+        lost_lease = threading.Event()
+        done = threading.Event()
+
+        def heartbeat():
+            # Renew well before the lease runs out; stop if another worker took over
+            while not done.wait(self.queue.lease / 3):
+                if not self.queue.heartbeat(job['id'], self.name):
+                    logger.warning("⚠ Job %s: lease lost, result will be discarded", job['id'])
+                    lost_lease.set()
+                    return
+
+        beat = threading.Thread(target=heartbeat, name=f"heartbeat-{job['id']}", daemon=True)
+        beat.start()
+        start = time.time()
+        try:
+            logger.info("Job %s attempt %s/%s: %s %s/%s", job['id'], job['attempts'], job['max_attempts'],
+                        job['case_type'], job['case_number'], job['filing_year'])
+            # Renewing the lease right before saving proves this worker still owns the job
+            result = run_search(self.db_manager, self.scraper, job,
+                                holds_lease=lambda: not lost_lease.is_set()
+                                and self.queue.heartbeat(job['id'], self.name))
+            done.set()
+            if self.queue.complete(job['id'], self.name, result):
+                logger.info("✓ Job %s done in %.2fs", job['id'], time.time() - start)
+        except LeaseLostError as e:
+            done.set()
+            logger.warning("⚠ %s; result discarded", e)
+        except Exception as e:
+            done.set()
+            status = self.queue.fail(job['id'], self.name, e)
+            if status == 'dead':
+                logger.error("❌ Job %s dead-lettered after %s attempts: %s", job['id'], job['attempts'], e)
+                if job['query_id']:
+                    self.db_manager.update_query_status(job['query_id'], 'failed', error_message=str(e))
+            elif status == 'queued':
+                logger.warning("⚠ Job %s attempt %s failed, will retry: %s", job['id'], job['attempts'], e)
+        finally:
+            done.set()
+            beat.join()
+            request_id_var.reset(token)
+            with self._processed_lock:
+                self.processed += 1
+
+    def loop(self, max_jobs=None):
+        """One slot's claim loop; max_jobs counts this slot's jobs only"""
+        handled = 0
+        while not self._stop.is_set():
+            if max_jobs is not None and handled >= max_jobs:
+                return
+            try:
+                job = self.queue.claim(self.name)
+            except Exception as e:
+                logger.error("Claiming a job failed: %s", e)
+                job = None
+            if job is None:
+                self.maybe_prune()
+                self._stop.wait(self.poll_interval)
+                continue
+            self.process(job)
+            handled += 1
+
+    def maybe_prune(self):
+        """Drop old finished jobs at most once an hour, while idle"""
+        if time.time() - self._last_prune < 3600:
+            return
+        self._last_prune = time.time()
+        try:
+            pruned = self.queue.prune(self.prune_days)
+            if pruned:
+                logger.info("Pruned %s finished jobs", pruned)
+        except Exception as e:
+            logger.error("Pruning jobs failed: %s", e)
+
+    def run(self, max_jobs=None):
+        """Work until stop() (or max_jobs processed); in-flight jobs are finished first"""
+        logger.info("🚀 Worker %s started with %s slots", self.name, self.concurrency)
+        threads = [threading.Thread(target=self.loop, args=(max_jobs,), name=f"worker-{i}")
+                   for i in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        logger.info("Worker %s stopped after %s jobs", self.name, self.processed)
+
+    def stop(self, *_):
+        self._stop.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Claim and run queued case searches")
+    parser.add_argument("--concurrency", type=int, default=Config.WORKER_CONCURRENCY)
+    parser.add_argument("--db", default=Config.DATABASE_PATH)
+    parser.add_argument("--max-jobs", type=int, help="exit after this many jobs (per slot)")
+    parser.add_argument("--stats", action="store_true", help="print job counts by status and exit")
+    parser.add_argument("--requeue-dead", nargs="?", const="all", metavar="JOB_ID",
+                        help="give dead-lettered jobs (all, or one id) a fresh set of attempts and exit")
+    args = parser.parse_args()
+    setup_logging(Config.LOG_LEVEL, Config.LOG_FORMAT, Config.LOG_DEBUG_SAMPLE_RATE)
+
+    queue = get_job_queue(args.db)
+    if args.stats:
+        print(queue.stats())
+    elif args.requeue_dead:
+        count = queue.requeue_dead(None if args.requeue_dead == "all" else int(args.requeue_dead))
+        print(f"♻ Requeued {count} dead jobs")
+    else:
+        # Same scraper setup as the web app's inline searches
+        worker = Worker(queue, DatabaseManager(args.db),
+                        CourtScraper(target_court=Config.TARGET_COURT, demo_mode=True),
+                        concurrency=args.concurrency, poll_interval=Config.JOB_POLL_SECONDS,
+                        prune_days=Config.JOB_RETENTION_DAYS)
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        worker.run(args.max_jobs)
@@ -24,6 +24,23 @@ CREATE TABLE IF NOT EXISTS case_details (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Case history: a full snapshot every few versions, field-level deltas in between
+CREATE TABLE IF NOT EXISTS case_versions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_type VARCHAR(100) NOT NULL,
+    case_number VARCHAR(100) NOT NULL,
+    filing_year INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    query_id INTEGER,
+    content_hash TEXT NOT NULL, -- SHA-256 of the version's full state
+    snapshot TEXT, -- JSON state, on base versions
+    delta TEXT, -- JSON {"set": {...}, "unset": [...]} from the previous version
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    last_seen_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    seen_count INTEGER NOT NULL DEFAULT 1,
+    UNIQUE (case_type, case_number, filing_year, version)
+);
+
 -- Index for better query performance
 CREATE INDEX IF NOT EXISTS idx_queries_case ON queries(case_type, case_number, filing_year);
 CREATE INDEX IF NOT EXISTS idx_case_details_query ON case_details(query_id);
@@ -1,11 +1,15 @@
 // Global state
 let isSearching = false;
+let knownCaseTypes = new Set();
+const suggestionCache = new Map();
+let suggestTimer = null;
 
 document.addEventListener('DOMContentLoaded', function() {
     console.log('Court Data Fetcher initialized');
     
     // Initialize form
     populateYears();
+    loadCaseTypes();
     
     // Add event listeners
     const searchForm = document.getElementById('searchForm');
@@ -15,20 +19,80 @@ document.addEventListener('DOMContentLoaded', function() {
     addInputValidation();
 });
 
-function populateYears() {
+function populateYears(years) {
     const yearSelect = document.getElementById('filing_year');
     const currentYear = new Date().getFullYear();
     
     // Clear existing options except the first one
     yearSelect.innerHTML = '<option value="">Select Year</option>';
     
-    // Add years from current year back to 1950
-    for (let year = currentYear; year >= 1950; year--) {
+    // Years the court lists, or from current year back to 1950
+    if (!years || years.length === 0) {
+        years = [];
+        for (let year = currentYear; year >= 1950; year--) {
+            years.push(String(year));
+        }
+    }
+    
+    years.forEach(year => {
         const option = document.createElement('option');
         option.value = year;
         option.textContent = year;
         yearSelect.appendChild(option);
+    });
+}
+
+async function loadCaseTypes() {
+    // Full case-type and year lists from the server's cached catalog
+    try {
+        const response = await fetch('/api/case-types');
+        if (!response.ok) {
+            return;
+        }
+        const catalog = await response.json();
+        knownCaseTypes = new Set(catalog.case_types.map(option => option.label));
+        fillCaseTypeOptions(catalog.case_types);
+        if (catalog.years && catalog.years.length) {
+            populateYears(catalog.years);
+        }
+    } catch (error) {
+        console.error('Case type catalog unavailable:', error);
+    }
+    
+    const caseTypeInput = document.getElementById('case_type');
+    caseTypeInput.addEventListener('input', function(e) {
+        clearTimeout(suggestTimer);
+        suggestTimer = setTimeout(() => suggestCaseTypes(e.target.value.trim()), 150);
+    });
+}
+
+async function suggestCaseTypes(query) {
+    if (!query) {
+        return;
     }
+    
+    if (!suggestionCache.has(query)) {
+        try {
+            const response = await fetch(`/api/case-types?q=${encodeURIComponent(query)}`);
+            if (!response.ok) {
+                return;
+            }
+            suggestionCache.set(query, (await response.json()).case_types);
+        } catch (error) {
+            return;
+        }
+    }
+    fillCaseTypeOptions(suggestionCache.get(query));
+}
+
+function fillCaseTypeOptions(options) {
+    const datalist = document.getElementById('case_type_options');
+    datalist.innerHTML = '';
+    options.forEach(option => {
+        const element = document.createElement('option');
+        element.value = option.label;
+        datalist.appendChild(element);
+    });
 }
 
 function addInputValidation() {
@@ -71,7 +135,12 @@ async function handleFormSubmit(event) {
             body: formData
         });
         
-        const result = await response.json();
+        let result = await response.json();
+        
+        if (response.status === 202) {
+            // Queued for a worker: wait for the job to finish
+            result = await pollJob(result.status_url);
+        }
         
         if (response.ok && result.success) {
             displayResults(result.data);
@@ -89,6 +158,24 @@ async function handleFormSubmit(event) {
     }
 }
 
+async function pollJob(statusUrl) {
+    // Back off from 0.5s to 3s between checks, for up to about five minutes
+    let delay = 500;
+    const deadline = Date.now() + 5 * 60 * 1000;
+    
+    while (Date.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, delay));
+        delay = Math.min(delay * 1.5, 3000);
+        
+        const response = await fetch(statusUrl);
+        const job = await response.json();
+        if (!response.ok || !['queued', 'running'].includes(job.status)) {
+            return job;
+        }
+    }
+    return { error: 'The search is taking longer than expected. Please try again later.' };
+}
+
 function validateFormData(formData) {
     const case_type = formData.get('case_type');
     const case_number = formData.get('case_number');
@@ -98,6 +185,10 @@ function validateFormData(formData) {
         return { valid: false, message: 'Please select a case type' };
     }
     
+    if (knownCaseTypes.size && !knownCaseTypes.has(case_type)) {
+        return { valid: false, message: 'Please pick a case type from the list' };
+    }
+    
     if (!case_number) {
         return { valid: false, message: 'Please enter a case number' };
     }
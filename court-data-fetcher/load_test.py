@@ -0,0 +1,384 @@
+"""In-process load and soak test for the Flask API.
+
+Drives /search, / and /download_pdf through Flask test clients, against the
+synthetic demo engine and a local HTTP server standing in for court PDFs, and
+reports throughput, latency percentiles, error rates and memory growth.
+
+    python load_test.py --concurrency 16 --duration 60
+    python load_test.py --rate 40 --duration 1800 --save-baseline baselines/soak.json
+    python load_test.py --concurrency 16 --duration 60 --baseline baselines/ci.json
+
+With --rate, requests arrive on a Poisson schedule and latency is measured
+from each request's scheduled start, so queueing delay is not hidden when
+the app falls behind. Without it, --concurrency clients send back to back.
+Comparing against a baseline exits with status 1 when a regression is found.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+
+ENDPOINTS = ('search', 'index', 'pdf')
+PDF_BODY = b'%PDF-1.4\n' + b'0' * 50_000 + b'\n%%EOF\n'
+
+
+class PdfHandler(BaseHTTPRequestHandler):
+    """Serves the same small PDF for every path, like the court's document store"""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(len(PDF_BODY)))
+        self.end_headers()
+        self.wfile.write(PDF_BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_pdf_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PdfHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='pdf-server', daemon=True).start()
+    return server
+
+
+def rss_mb():
+    """Current resident set size of this process in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        import resource
+        # Peak rather than current outside Linux; still shows growth
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(p / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def parse_mix(value):
+    """'search=6,index=3,pdf=1' -> {'search': 6.0, 'index': 3.0, 'pdf': 1.0}"""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}', use {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class LoadTest:
+    """Runs one load pattern against the app and collects per-request samples"""
+
+    def __init__(self, app, generator, mix, keys=10000, seed=1):
+        self.app = app
+        self.generator = generator
+        self.endpoints = list(mix)
+        self.weights = [mix[name] for name in self.endpoints]
+        self.keys = min(keys, generator.case_count)
+        self.seed = seed
+        self.samples = []
+        self.memory = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def client(self):
+        # One test client per thread; they share the app and its state
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+            self._local.rng = random.Random(f"{self.seed}:{threading.get_ident()}")
+        return client
+
+    def send(self, endpoint):
+        """Issue one request; returns whether it succeeded"""
+        client = self.client()
+        rng = self._local.rng
+        case = self.generator.generate(rng.randrange(self.keys))
+
+        if endpoint == 'search':
+            response = client.post('/search', data={
+                'case_type': case['case_type'],
+                'case_number': case['case_number'],
+                'filing_year': str(case['filing_year']),
+            })
+        elif endpoint == 'index':
+            response = client.get('/')
+        else:
+            url = f"{self.generator.pdf_base_url}/{case['filing_year']}/{rng.randrange(self.keys)}-0.pdf"
+            response = client.get(f"/download_pdf?url={quote(url, safe='')}")
+        status = response.status_code
+        response.close()
+        return status < 400, status
+
+    def timed(self, endpoint, scheduled_at=None):
+        start = scheduled_at if scheduled_at is not None else time.perf_counter()
+        try:
+            ok, status = self.send(endpoint)
+        except Exception as e:
+            ok, status = False, type(e).__name__
+        sample = (endpoint, time.perf_counter() - start, ok, status, time.perf_counter())
+        with self._lock:
+            self.samples.append(sample)
+
+    def pick(self, rng):
+        return rng.choices(self.endpoints, self.weights)[0]
+
+    def run_closed(self, concurrency, duration):
+        """`concurrency` clients, each sending its next request as soon as the last returns"""
+        deadline = time.perf_counter() + duration
+
+        def loop(number):
+            rng = random.Random(f"{self.seed}:closed:{number}")
+            while time.perf_counter() < deadline:
+                self.timed(self.pick(rng))
+
+        threads = [threading.Thread(target=loop, args=(i,), name=f'load-{i}') for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run_open(self, rate, concurrency, duration):
+        """Poisson arrivals at `rate` per second, served by up to `concurrency` threads"""
+        rng = random.Random(f"{self.seed}:open")
+        start = time.perf_counter()
+        next_at = start
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='load') as pool:
+            while True:
+                next_at += rng.expovariate(rate)
+                if next_at - start >= duration:
+                    break
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self.timed, self.pick(rng), next_at)
+
+    def sample_memory(self, interval, stop):
+        start = time.perf_counter()
+        while not stop.wait(interval):
+            self.memory.append((round(time.perf_counter() - start, 1), round(rss_mb(), 1)))
+
+    def run(self, args):
+        stop = threading.Event()
+        self.memory.append((0.0, round(rss_mb(), 1)))
+        sampler = threading.Thread(target=self.sample_memory, args=(args.sample_interval, stop),
+                                   name='memory', daemon=True)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            if args.rate:
+                self.run_open(args.rate, args.concurrency, args.duration)
+            else:
+                self.run_closed(args.concurrency, args.duration)
+        finally:
+            elapsed = time.perf_counter() - start
+            stop.set()
+            sampler.join()
+            self.memory.append((round(elapsed, 1), round(rss_mb(), 1)))
+        return elapsed
+
+
+def latency_summary(samples, elapsed):
+    latencies = sorted(latency for _, latency, _, _, _ in samples)
+    errors = sum(1 for _, _, ok, _, _ in samples if not ok)
+    statuses = {}
+    for _, _, _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    to_ms = lambda value: None if value is None else round(value * 1000, 2)
+    return {
+        'requests': len(samples),
+        'throughput': round(len(samples) / elapsed, 2) if elapsed else 0,
+        'error_rate': round(errors / len(samples), 4) if samples else 0,
+        'p50_ms': to_ms(percentile(latencies, 50)),
+        'p95_ms': to_ms(percentile(latencies, 95)),
+        'p99_ms': to_ms(percentile(latencies, 99)),
+        'max_ms': to_ms(latencies[-1] if latencies else None),
+        'statuses': statuses,
+    }
+
+
+def memory_summary(memory):
+    """Growth over the run and its trend (least-squares slope, MB per minute)"""
+    times = [t for t, _ in memory]
+    values = [mb for _, mb in memory]
+    slope = 0.0
+    if len(memory) > 2 and max(times) > min(times):
+        mean_t = sum(times) / len(times)
+        mean_v = sum(values) / len(values)
+        slope = (sum((t - mean_t) * (v - mean_v) for t, v in memory)
+                 / sum((t - mean_t) ** 2 for t in times)) * 60
+    return {
+        'start_mb': values[0],
+        'end_mb': values[-1],
+        'peak_mb': max(values),
+        'growth_mb': round(values[-1] - values[0], 1),
+        'growth_mb_per_min': round(slope, 2),
+        'samples': memory,
+    }
+
+
+def summarize(test, elapsed, args):
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'config': {
+            'mode': 'open' if args.rate else 'closed',
+            'rate': args.rate,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'mix': dict(zip(test.endpoints, test.weights)),
+            'keys': test.keys,
+            'demo_latency': args.demo_latency,
+            'demo_error_rate': args.demo_error_rate,
+        },
+        'elapsed': round(elapsed, 2),
+        'overall': latency_summary(test.samples, elapsed),
+        'endpoints': {
+            endpoint: latency_summary([s for s in test.samples if s[0] == endpoint], elapsed)
+            for endpoint in test.endpoints
+        },
+        'memory': memory_summary(test.memory),
+    }
+
+
+def compare(result, baseline, tolerance, latency_slack_ms=5, memory_slack_mb=20):
+    """Regressions of `result` against `baseline`, as human-readable lines.
+
+    Latency and memory get a small absolute slack on top of `tolerance`, so
+    millisecond jitter on fast endpoints is not reported.
+    """
+    regressions = []
+    if result['overall']['throughput'] < baseline['overall']['throughput'] * (1 - tolerance):
+        regressions.append(f"throughput {result['overall']['throughput']:.1f}/s "
+                           f"vs {baseline['overall']['throughput']:.1f}/s")
+
+    endpoints = [('overall', result['overall'], baseline['overall'])]
+    endpoints += [(name, summary, baseline['endpoints'].get(name)) for name, summary in result['endpoints'].items()]
+    for name, current, previous in endpoints:
+        if not previous or not current['requests']:
+            continue
+        for key in ('p95_ms', 'p99_ms'):
+            limit = previous.get(key)
+            if limit is not None and current[key] > limit * (1 + tolerance) + latency_slack_ms:
+                regressions.append(f"{name} {key[:-3]} {current[key]:.1f} ms vs {previous[key]:.1f} ms")
+        if current['error_rate'] > previous['error_rate'] + max(0.01, previous['error_rate'] * tolerance):
+            regressions.append(f"{name} error rate {current['error_rate']:.2%} vs {previous['error_rate']:.2%}")
+
+    growth, previous_growth = result['memory']['growth_mb'], baseline['memory']['growth_mb']
+    if growth > max(previous_growth, 0) * (1 + tolerance) + memory_slack_mb:
+        regressions.append(f"memory growth {growth:.1f} MB vs {previous_growth:.1f} MB")
+    return regressions
+
+
+def print_report(result):
+    config = result['config']
+    pattern = (f"{config['rate']}/s open loop" if config['mode'] == 'open'
+               else f"{config['concurrency']} clients closed loop")
+    print(f"\n{pattern}, {result['elapsed']:.0f}s")
+    print(f"{'endpoint':<10}{'requests':>10}{'req/s':>10}{'errors':>9}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'max ms':>10}")
+    for name, summary in [*result['endpoints'].items(), ('overall', result['overall'])]:
+        cells = [summary[key] if summary[key] is not None else float('nan')
+                 for key in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms')]
+        print(f"{name:<10}{summary['requests']:>10}{summary['throughput']:>10.1f}{summary['error_rate']:>9.2%}"
+              + ''.join(f"{cell:>10.1f}" for cell in cells))
+    memory = result['memory']
+    print(f"memory    {memory['start_mb']:.1f} -> {memory['end_mb']:.1f} MB "
+          f"(peak {memory['peak_mb']:.1f}, {memory['growth_mb_per_min']:+.2f} MB/min)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and soak test the Flask API in-process")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="clients (closed loop) or maximum requests in flight (with --rate)")
+    parser.add_argument("--rate", type=float, help="open loop: mean arrivals per second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of unmeasured load first")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("search=6,index=3,pdf=1"),
+                        help="endpoint weights, e.g. search=6,index=3,pdf=1")
+    parser.add_argument("--keys", type=int, default=10000, help="distinct cases searched")
+    parser.add_argument("--demo-latency", type=float, default=0.05, help="median simulated court latency (s)")
+    parser.add_argument("--demo-error-rate", type=float, default=0.02)
+    parser.add_argument("--sample-interval", type=float, default=5, help="seconds between memory samples")
+    parser.add_argument("--workdir", help="directory for the test database (default: a temporary one)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--save-baseline", metavar="FILE", help="store the results as a baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="relative change that counts as a regression (default 0.15)")
+    args = parser.parse_args()
+
+    pdf_server = start_pdf_server()
+    workdir = args.workdir or tempfile.mkdtemp(prefix='court-load-')
+    # Config reads the environment on import, so this has to come first
+    os.environ.update({
+        'DATABASE_PATH': os.path.join(workdir, 'court_data.db'),
+        'SHARED_STATE_PATH': os.path.join(workdir, 'shared_state.db'),
+        'DEMO_SYNTHETIC': 'True',
+        'DEMO_LATENCY_MEDIAN': str(args.demo_latency),
+        'DEMO_ERROR_RATE': str(args.demo_error_rate),
+        'DEMO_PDF_BASE_URL': f"http://127.0.0.1:{pdf_server.server_port}/documents",
+        'RETENTION_INTERVAL': '0',
+        'LOG_LEVEL': os.environ.get('LOG_LEVEL', 'WARNING'),
+    })
+    sys.path.insert(0, BACKEND_DIR)
+    from app import app
+    from config import Config
+    from demo_scraper import SyntheticCaseGenerator
+
+    generator = SyntheticCaseGenerator(seed=Config.DEMO_SEED, case_count=Config.DEMO_CASE_COUNT,
+                                       pdf_base_url=Config.DEMO_PDF_BASE_URL)
+
+    if args.warmup > 0:
+        warmup = LoadTest(app, generator, args.mix, keys=args.keys, seed='warmup')
+        if args.rate:
+            warmup.run_open(args.rate, args.concurrency, args.warmup)
+        else:
+            warmup.run_closed(args.concurrency, args.warmup)
+
+    test = LoadTest(app, generator, args.mix, keys=args.keys)
+    elapsed = test.run(args)
+    result = summarize(test, elapsed, args)
+    print_report(result)
+    pdf_server.shutdown()
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"✓ Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline['config'] != result['config']:
+            print(f"\n⚠ {args.baseline} was recorded with a different load pattern: {baseline['config']}")
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ Regressions against {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\n✓ No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import io
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from captcha_solver import CaptchaSolver, DigitTemplates, binarize, glyph_features, segment  # noqa: E402
+
+# Blocky stand-ins for three digits, 12 rows x 7 columns each
+GLYPHS = {
+    '1': [(0, 12, 3, 5)],
+    '0': [(0, 2, 0, 7), (10, 12, 0, 7), (0, 12, 0, 2), (0, 12, 5, 7)],
+    '7': [(0, 2, 0, 7), (0, 12, 5, 7)],
+}
+
+
+def draw(digits, left=2, right=2, gap=4, height=20, top=4):
+    """Ink mask with `digits` drawn left to right; left=0 / right=0 make them touch the edges"""
+    width = left + len(digits) * 7 + (len(digits) - 1) * gap + right
+    ink = np.zeros((height, width), dtype=bool)
+    x = left
+    for digit in digits:
+        for y0, y1, x0, x1 in GLYPHS[digit]:
+            ink[top + y0:top + y1, x + x0:x + x1] = True
+        x += 7 + gap
+    return ink
+
+
+def png(ink):
+    buffer = io.BytesIO()
+    Image.fromarray(np.where(ink, 0, 255).astype(np.uint8)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def templates():
+    labels = sorted(GLYPHS)
+    features = [glyph_features(draw(label), segment(draw(label)))[0] for label in labels]
+    return DigitTemplates(labels, features)
+
+
+def test_segment_finds_each_digit():
+    boxes = segment(draw('107'))
+    assert len(boxes) == 3
+    assert [box[2] for box in boxes] == sorted(box[2] for box in boxes)
+
+
+def test_segment_glyph_touching_right_edge():
+    ink = draw('70', right=0)
+    assert ink[:, -1].any()
+    boxes = segment(ink)
+    assert len(boxes) == 2
+    assert boxes[-1][3] == ink.shape[1]
+
+
+def test_segment_glyph_touching_left_edge():
+    ink = draw('07', left=0)
+    assert ink[:, 0].any()
+    assert segment(ink)[0][2] == 0
+
+
+def test_segment_blank_and_empty_images():
+    assert segment(np.zeros((20, 30), dtype=bool)) == []
+    assert segment(np.zeros((20, 0), dtype=bool)) == []
+
+
+def test_segment_splits_touching_digits_to_expected_count():
+    assert len(segment(draw('00', gap=0), expected=2)) == 2
+
+
+def test_classify_matches_templates():
+    ink = draw('7101', left=0, right=0)
+    labels = templates().classify(glyph_features(ink, segment(ink)))
+    assert ''.join(labels) == '7101'
+
+
+def test_solve_reads_edge_touching_captcha():
+    solver = CaptchaSolver(templates())
+    assert solver.solve(png(draw('1077', right=0))) == '1077'
+
+
+def test_solve_blank_image_returns_none():
+    solver = CaptchaSolver(templates())
+    assert solver.solve(png(np.zeros((20, 40), dtype=bool))) is None
+    assert binarize(np.full((20, 40), 255, dtype=np.uint8)).sum() == 0